@@ -16,7 +16,8 @@ from jAGUI.components.utilities import getIcon, processMarker
 from ..contracts import iDeviceMonitor
 from ..scrcpy import mapCode
 from ..scrcpy.const import *
-from ..services import SCRCPYStreamService
+from ..services import DeploymentManager, DeviceHub, DeviceInventory, SCRCPYStreamService, SessionManager
+from ..services.frames import eFrameFormat
 from ..utilities.runnables import DeviceMonitor
 from .__sideNavigation import Navigation
 from .mwHelper import *
@@ -76,9 +77,10 @@ class MainWindow(FormBasic):
 
     # region [DEVICE EVENTS]
     def _onDeviceAdded(self, device: AdbDevice):
-        # lProduct: str = device.shell(["getprop", "ro.product.model"])
+        DeviceInventory().Register(device)
+        DeploymentManager().Deploy(device)
 
-        lStreamer: SCRCPYStreamService = SCRCPYStreamService(device.serial, 1250, 5000)  ## passing adb serial
+        lStreamer: SCRCPYStreamService = SCRCPYStreamService(device.serial, 1250, 5000, eFrameFormat.NATIVE, hub=DeviceHub(), frameMeta=True)  ## passing adb serial
 
         lClient: StreamerClient = StreamerClient(lStreamer, lStreamer.DeviceName)
 
@@ -86,6 +88,7 @@ class MainWindow(FormBasic):
         lDevicePage = StreamerPage(f"{lStreamer.ADBSerial.upper()}", lClient, lStreamer.ADBSerial.upper(), lFunc)
         self._devicePage(lStreamer.ADBSerial, getIcon("smartphone.png"), lStreamer.ADBSerial, lDevicePage, "DEVICES")
         self._streamers[lStreamer.ADBSerial] = lClient
+        SessionManager().Attach(lStreamer.ADBSerial, lStreamer)
 
         lClient.mousePressEvent = self._mouseEvent(lClient.Streamer, ACTION_DOWN)
         lClient.mouseMoveEvent = self._mouseEvent(lClient.Streamer, ACTION_MOVE)
@@ -98,6 +101,9 @@ class MainWindow(FormBasic):
         lClient.OnResolutionChanged.connect(_resize)
 
     def _onDeviceRemoved(self, device: AdbDevice):
+        DeploymentManager().Invalidate(device.serial)
+        DeviceInventory().Invalidate(device.serial)
+        SessionManager().Detach(device.serial)
         try:
             lBtn: Button = self._devices.pop(device.serial)
             lBtn.setParent(None)
@@ -139,11 +145,13 @@ class MainWindow(FormBasic):
             def _onClicked(btn):
                 self._switchPage(self.PageStack[btn.buttonId])
                 QApplication.instance().processEvents()
+                lShown: str = None
                 for strmr in self._streamers.values():
                     strmr.setVisible(strmr.Streamer.ADBSerial.upper() == btn.buttonId.upper())
                     if strmr.isVisible():
-                        if not strmr.Streamer.isAlive:
-                            strmr.Start()
+                        lShown = strmr.Streamer.ADBSerial
+
+                SessionManager().Show(lShown)
 
             return _onClicked
 
@@ -153,7 +161,12 @@ class MainWindow(FormBasic):
     def _navigationPage(self, title: str, icon: QIcon, key: str, page: QWidget, parentMenuKey: str = ""):
         lBtn: Button = self.NavigationBar.AddMenu(title, icon, key, parentId=parentMenuKey)
         lBtn.setCheckable(True)
-        lBtn.OnClicked.connect(lambda btn: self._switchPage(self.PageStack[btn.buttonId]))
+
+        def _onClicked(btn):
+            self._switchPage(self.PageStack[btn.buttonId])
+            SessionManager().Show(None)
+
+        lBtn.OnClicked.connect(_onClicked)
         self.PageStack[lBtn.buttonId] = page
 
     def _createMenu(self):
@@ -189,6 +202,7 @@ class MainWindow(FormBasic):
 
     def closeEvent(self, event):
         for strmr in self._streamers.values():
+            strmr.Streamer.StopRecording()
             strmr.Stop()
         super().closeEvent(event)
 
@@ -203,8 +217,7 @@ class MainWindow(FormBasic):
                         lTimeStamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         filename: str = f"{lTimeStamp}.mp4"
                         os.makedirs(lVideoPath, exist_ok=True)
-                        lLocalPath = f"{lVideoPath}\\{filename}"
-                        strmr.Device.start_recording(lLocalPath)
+                        strmr.StartRecording(os.path.join(lVideoPath, filename))
                         btn.setText("Stop Recording")
 
                     except Exception as ex:
@@ -216,7 +229,7 @@ class MainWindow(FormBasic):
 
                 else:
                     try:
-                        strmr.Device.stop_recording()
+                        strmr.StopRecording()
                         btn.setText("Record Video")
 
                     except Exception as ex:
@@ -23,7 +23,7 @@ def StreamerPage(title: str, streamer: AndroidClient, name: str = None, recorder
 
     if recorderFunction:
         lStrmr: AndroidStreamer = streamer.Streamer
-        lDefLamda = lambda btn: print(lStrmr.Control.back_or_turn_screen_on())
+        lDefLamda = lambda btn: lStrmr.Control.back_or_turn_screen_on()
         lCommandBar: CommandBar = CommandBar()
         lCommandBar.AddCommand("Record Video", recorderFunction(streamer), pos=eCommandPosition.LEFT)
         lCommandBar.AddCommand("Enable Object Detection", lDefLamda, pos=eCommandPosition.LEFT)
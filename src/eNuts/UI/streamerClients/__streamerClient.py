@@ -12,6 +12,7 @@ from jAGUI.components.bases import Component
 from jAGUI.components.utilities import processMarker
 
 from ...services import StreamService
+from ...services.frames import StreamFrame, eFrameFormat
 
 
 @processMarker(True, True)
@@ -29,6 +30,7 @@ class StreamerClient(Component, QLabel):
 
             self._streamer.OnStarted.connect(lambda th: debug(f"Streamer {self._streamer.Name} started"))
             self._streamer.OnFrame.connect(self._showImage)
+            self._streamer.OnVideoFrame.connect(self._showFrame)
 
         def _end():
             self.Stop()
@@ -55,7 +57,12 @@ class StreamerClient(Component, QLabel):
         with self._streamerLock:
             self._streamer.stop()
 
-    def _showImage(self, frame: np.ndarray):
+    def _showFrame(self, frame: StreamFrame):
+        if self.IsVisible and frame is not None and self.Streamer.FrameFormat == eFrameFormat.NATIVE:
+            if self._showImage(frame.ToBGR()):
+                self.Streamer.MarkDisplayed(frame)
+
+    def _showImage(self, frame: np.ndarray) -> bool:
         if self.IsVisible:
             if frame is not None:
                 try:
@@ -70,6 +77,9 @@ class StreamerClient(Component, QLabel):
                     lPix.setDevicePixelRatio(1 / self.Streamer.SizeRatio)
                     self.setPixmap(lPix)
                     self.OnResolutionChanged.emit(lPix.width(), lPix.height())
+                    return True
 
                 except Exception as ex:
                     error("Error converting image...", ex)
+
+        return False
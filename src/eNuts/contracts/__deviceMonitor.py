@@ -8,6 +8,8 @@ class iDeviceMonitor(QObject):
     def OnDeviceRemoved(self) -> SignalInstance: ...
     @property
     def Ender(self) -> object: ...
+    @property
+    def Devices(self) -> list: ...
 
     def _run(self): ...
     def start(self): ...
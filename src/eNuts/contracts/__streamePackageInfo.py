@@ -1,5 +1,7 @@
 from socket import socket
 
+from typing import Any
+
 from adbutils import AdbDevice
 
 
@@ -18,3 +20,6 @@ class iPakageInfo:
 
     @property
     def Device(self) -> AdbDevice: ...
+
+    @property
+    def MessageReader(self) -> Any: ...
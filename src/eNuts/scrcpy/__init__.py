@@ -1,5 +1,28 @@
 from .control import ControlSender
 from .core import Client
+from .group import ControlGroup
+from .macro import KeyEvent, MacroEvent, MacroPlayer, MacroTimeline, ScrollEvent, TouchEvent
+from .messages import AckClipboardMessage, ClipboardMessage, DeviceMessageReader, UhidOutputMessage
+from .stream import FramePacketReader, MediaPacket
 from .utilities import mapCode
+from .writer import ControlWriter
 
-__all__ = ["ControlSender", "Client", "mapCode"]
+__all__ = [
+    "AckClipboardMessage",
+    "ClipboardMessage",
+    "ControlGroup",
+    "ControlSender",
+    "ControlWriter",
+    "Client",
+    "DeviceMessageReader",
+    "FramePacketReader",
+    "KeyEvent",
+    "MacroEvent",
+    "MacroPlayer",
+    "MacroTimeline",
+    "MediaPacket",
+    "ScrollEvent",
+    "TouchEvent",
+    "UhidOutputMessage",
+    "mapCode",
+]
@@ -312,6 +312,39 @@ TYPE_GET_CLIPBOARD = 8
 TYPE_SET_CLIPBOARD = 9
 TYPE_SET_SCREEN_POWER_MODE = 10
 TYPE_ROTATE_DEVICE = 11
+TYPE_UHID_CREATE = 12
+TYPE_UHID_INPUT = 13
+TYPE_OPEN_HARD_KEYBOARD_SETTINGS = 14
+
+# Control message sizes of the scrcpy 2.4 wire format, type byte included (text messages: header only)
+MESSAGE_SIZE_INJECT_KEYCODE = 14
+MESSAGE_SIZE_INJECT_TEXT = 5
+MESSAGE_SIZE_INJECT_TOUCH_EVENT = 32
+MESSAGE_SIZE_INJECT_SCROLL_EVENT = 21
+MESSAGE_SIZE_BACK_OR_SCREEN_ON = 2
+MESSAGE_SIZE_GET_CLIPBOARD = 2
+MESSAGE_SIZE_SET_CLIPBOARD = 14
+MESSAGE_SIZE_SET_SCREEN_POWER_MODE = 2
+MESSAGE_SIZE_EMPTY = 1
+MESSAGE_MAX_SIZE = 1 << 18
+INJECT_TEXT_MAX_LENGTH = 300
+CLIPBOARD_TEXT_MAX_LENGTH = MESSAGE_MAX_SIZE - MESSAGE_SIZE_SET_CLIPBOARD
+
+# Device message type
+DEVICE_MSG_TYPE_CLIPBOARD = 0
+DEVICE_MSG_TYPE_ACK_CLIPBOARD = 1
+DEVICE_MSG_TYPE_UHID_OUTPUT = 2
+
+# Copy key of get clipboard
+COPY_KEY_NONE = 0
+COPY_KEY_COPY = 1
+COPY_KEY_CUT = 2
+
+# Touch
+POINTER_ID_MOUSE = -1
+POINTER_ID_GENERIC_FINGER = -2
+PRESSURE_MAX = 0xFFFF
+BUTTON_PRIMARY = 1
 
 # Lock screen orientation
 LOCK_SCREEN_ORIENTATION_UNLOCKED = -1
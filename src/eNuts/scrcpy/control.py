@@ -1,142 +1,149 @@
 import socket
-import struct
-from time import sleep
+from collections.abc import Hashable
+from concurrent.futures import Future
+from math import ceil, hypot
+from threading import Lock
 
 from ..contracts import iPakageInfo
 from ..scrcpy import const
+from .macro import MacroPlayer, MacroTimeline
+from .protocol import ControlMessageBuilder
+from .writer import ControlWriter
 
 
 class ControlSender:
+    """
+    Every method returns a view of the message it queued, valid until the next control call.
+
+    ``touch``, ``scroll`` and ``keycode`` take ``immediate`` for timed input: the message is neither
+    coalesced nor held for the writer's tick, and the method returns the ``ControlWriter`` future
+    resolving to the time it was written instead, like ``ControlGroup`` does.
+    """
+
     def __init__(self, parent: iPakageInfo):
         self._parent: iPakageInfo = parent
+        self._builder: ControlMessageBuilder = ControlMessageBuilder()
+        self._builderLock: Lock = Lock()
 
     @property
     def Parent(self) -> iPakageInfo:
         return self._parent
 
-    def _send_package(self, control_type: int, package: bytes) -> None:
-        package = struct.pack(">B", control_type) + package
-        if self.Parent.ControlSocket is not None:
-            self.Parent.ControlSocket.send(package)
-
-    def keycode(self, keycode: int, action: int = const.ACTION_DOWN, repeat: int = 0) -> bytes:
-        package = struct.pack(">Biii", action, keycode, repeat, 0)
-        self._send_package(const.TYPE_INJECT_KEYCODE, package)
-        return package
-
-    def text(self, text: str) -> bytes:
-        buffer = text.encode("utf-8")
-        package = struct.pack(">i", len(buffer)) + buffer
-        self._send_package(const.TYPE_INJECT_TEXT, package)
-        return package
-
-    def touch(self, x: int, y: int, action: int = const.ACTION_DOWN, touch_id: int = 0x1234567887654321) -> bytes:
-        x, y = max(x, 0), max(y, 0)
-        package = struct.pack(
-            ">BqiiHHHii",
-            action,
-            touch_id,
-            int(x),
-            int(y),
-            int(self.Parent.Resolution.width()),
-            int(self.Parent.Resolution.height()),
-            0xFFFF,
-            1,
-            1,
-        )
-        self._send_package(const.TYPE_INJECT_TOUCH_EVENT, package)
-        return package
-
-    def scroll(self, x: int, y: int, h: int, v: int) -> bytes:
-        x, y = max(x, 0), max(y, 0)
-        package = struct.pack(
-            ">iiHHii",
-            int(x),
-            int(y),
-            int(self.Parent.Resolution[0]),
-            int(self.Parent.Resolution[1]),
-            int(h),
-            int(v),
-        )
-        self._send_package(const.TYPE_INJECT_SCROLL_EVENT, package)
-        return package
+    def _send_package(self, package: memoryview, coalesce_key: Hashable = None) -> memoryview:
+        lSocket: socket.socket = self.Parent.ControlSocket
+        if lSocket is not None:
+            ControlWriter().Send(lSocket, package, coalesce_key)
 
-    def back_or_turn_screen_on(self, action: int = const.ACTION_DOWN) -> bytes:
-        package = struct.pack(">B", action)
-        self._send_package(const.TYPE_BACK_OR_SCREEN_ON, package)
         return package
 
-    def expand_notification_panel(self) -> bytes:
-        package = b""
-        self._send_package(const.TYPE_EXPAND_NOTIFICATION_PANEL, package)
-        return package
+    def _send_now(self, package: memoryview) -> Future:
+        lSocket: socket.socket = self.Parent.ControlSocket
+        if lSocket is None:
+            lFuture: Future = Future()
+            lFuture.set_result({})
+            return lFuture
 
-    def expand_settings_panel(self) -> bytes:
-        package = b""
-        self._send_package(const.TYPE_EXPAND_SETTINGS_PANEL, package)
-        return package
-
-    def collapse_panels(self) -> bytes:
-        package = b""
-        self._send_package(const.TYPE_COLLAPSE_PANELS, package)
-        return package
+        return ControlWriter().Send(lSocket, package, immediate=True)
 
-    def get_clipboard(self) -> str:
-        s: socket.socket = self.Parent.ControlSocket
-
-        with self.Parent._csocketLock:
-            s.setblocking(False)
-            while True:
-                try:
-                    s.recv(1024)
-                except BlockingIOError:
-                    break
-            s.setblocking(True)
-
-            package = struct.pack(">B", const.TYPE_GET_CLIPBOARD)
-            s.send(package)
-            (code,) = struct.unpack(">B", s.recv(1))
-            assert code == 0
-            (length,) = struct.unpack(">i", s.recv(4))
-
-            return s.recv(length).decode("utf-8")
-
-    def set_clipboard(self, text: str, paste: bool = False) -> bytes:
-        buffer = text.encode("utf-8")
-        package = struct.pack(">?i", paste, len(buffer)) + buffer
-        self._send_package(const.TYPE_SET_CLIPBOARD, package)
-        return package
-
-    def set_screen_power_mode(self, mode: int = const.POWER_MODE_NORMAL) -> bytes:
-        package = struct.pack(">b", mode)
-        self._send_package(const.TYPE_SET_SCREEN_POWER_MODE, package)
-        return package
-
-    def rotate_device(self) -> bytes:
-        package = b""
-        self._send_package(const.TYPE_ROTATE_DEVICE, package)
-        return package
-
-    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, move_step_length: int = 5, move_steps_delay: float = 0.005, touch_id: int = 0x1234567887654321) -> None:
-        self.touch(start_x, start_y, const.ACTION_DOWN)
-        next_x, next_y = start_x, start_y
-
-        end_x = min(end_x, self.Parent.Resolution[0])
-        end_y = min(end_y, self.Parent.Resolution[1])
-
-        decrease_x = start_x > end_x
-        decrease_y = start_y > end_y
-
-        while True:
-            next_x = next_x - move_step_length if decrease_x else next_x + move_step_length
-            next_y = next_y - move_step_length if decrease_y else next_y + move_step_length
-
-            next_x = max(min(next_x, end_x), end_x)
-            next_y = max(min(next_y, end_y), end_y)
-
-            self.touch(next_x, next_y, const.ACTION_MOVE, touch_id)
-
-            if next_x == end_x and next_y == end_y:
-                self.touch(next_x, next_y, const.ACTION_UP, touch_id)
-                break
-            sleep(move_steps_delay)
+    @property
+    def ScreenSize(self) -> tuple[int, int]:
+        lResolution = self.Parent.Resolution
+        return int(lResolution.width()), int(lResolution.height())
+
+    def keycode(self, keycode: int, action: int = const.ACTION_DOWN, repeat: int = 0, immediate: bool = False) -> memoryview | Future:
+        with self._builderLock:
+            lPackage: memoryview = self._builder.Keycode(action, keycode, repeat)
+            return self._send_now(lPackage) if immediate else self._send_package(lPackage)
+
+    def text(self, text: str) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.Text(text))
+
+    def touch(self, x: int, y: int, action: int = const.ACTION_DOWN, touch_id: int = 0x1234567887654321, immediate: bool = False) -> memoryview | Future:
+        lWidth, lHeight = self.ScreenSize
+        lCoalesceKey: Hashable = (const.TYPE_INJECT_TOUCH_EVENT, touch_id) if action == const.ACTION_MOVE else None
+        with self._builderLock:
+            lPackage: memoryview = self._builder.Touch(action, touch_id, int(max(x, 0)), int(max(y, 0)), lWidth, lHeight)
+            return self._send_now(lPackage) if immediate else self._send_package(lPackage, lCoalesceKey)
+
+    def scroll(self, x: int, y: int, h: float, v: float, immediate: bool = False) -> memoryview | Future:
+        lWidth, lHeight = self.ScreenSize
+        with self._builderLock:
+            lPackage: memoryview = self._builder.Scroll(int(max(x, 0)), int(max(y, 0)), lWidth, lHeight, h, v)
+            return self._send_now(lPackage) if immediate else self._send_package(lPackage)
+
+    def back_or_turn_screen_on(self, action: int = const.ACTION_DOWN) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.BackOrScreenOn(action))
+
+    def expand_notification_panel(self) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.Empty(const.TYPE_EXPAND_NOTIFICATION_PANEL))
+
+    def expand_settings_panel(self) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.Empty(const.TYPE_EXPAND_SETTINGS_PANEL))
+
+    def collapse_panels(self) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.Empty(const.TYPE_COLLAPSE_PANELS))
+
+    def get_clipboard(self, copy_key: int = const.COPY_KEY_NONE) -> Future:
+        """Resolves to the device clipboard text once the device answers, never blocks the caller."""
+        lReader = getattr(self.Parent, "MessageReader", None)
+        with self._builderLock:
+            if lReader is None or self.Parent.ControlSocket is None:
+                return self._failed(ConnectionError("Control channel is not connected"))
+
+            lFuture: Future = lReader.RequestClipboard()
+            self._send_package(self._builder.GetClipboard(copy_key))
+            return lFuture
+
+    def set_clipboard(self, text: str, paste: bool = False, sequence: int = 0) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.SetClipboard(text, paste, sequence))
+
+    def set_clipboard_acknowledged(self, text: str, paste: bool = False) -> Future:
+        """Resolves to the sequence number once the device acknowledged the new clipboard."""
+        lReader = getattr(self.Parent, "MessageReader", None)
+        with self._builderLock:
+            if lReader is None or self.Parent.ControlSocket is None:
+                return self._failed(ConnectionError("Control channel is not connected"))
+
+            lSequence, lFuture = lReader.ExpectAck()
+            self._send_package(self._builder.SetClipboard(text, paste, lSequence))
+            return lFuture
+
+    @staticmethod
+    def _failed(ex: Exception) -> Future:
+        lFuture: Future = Future()
+        lFuture.set_exception(ex)
+        return lFuture
+
+    def set_screen_power_mode(self, mode: int = const.POWER_MODE_NORMAL) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.SetScreenPowerMode(mode))
+
+    def rotate_device(self) -> memoryview:
+        with self._builderLock:
+            return self._send_package(self._builder.Empty(const.TYPE_ROTATE_DEVICE))
+
+    def swipe(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        move_step_length: int = 5,
+        move_steps_delay: float = 0.005,
+        touch_id: int = 0x1234567887654321,
+    ) -> Future:
+        """Plays the swipe in the background, the future resolves once the pointer is released."""
+        lWidth, lHeight = self.ScreenSize
+        end_x = max(0, min(end_x, lWidth - 1))
+        end_y = max(0, min(end_y, lHeight - 1))
+
+        lSteps: int = max(1, ceil(hypot(end_x - start_x, end_y - start_y) / max(move_step_length, 1)))
+        lDuration: float = lSteps * move_steps_delay
+        lTimeline: MacroTimeline = MacroTimeline().Swipe(0.0, (start_x, start_y), (end_x, end_y), lDuration, lSteps / lDuration if lDuration else 1.0, touchId=touch_id)
+        return MacroPlayer(lTimeline, [self]).Start()
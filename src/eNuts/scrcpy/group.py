@@ -0,0 +1,232 @@
+"""
+This module mirrors control messages to a group of devices
+"""
+
+# ==================================================================================
+import socket
+from collections import deque
+from collections.abc import Hashable, Sequence
+from concurrent.futures import Future
+from threading import Lock
+
+# ==================================================================================
+from numpy import array, clip, float64, ndarray, percentile, rint, zeros
+
+# ==================================================================================
+from ..contracts import iPakageInfo
+from . import const
+from .macro import MacroPlayer, MacroTimeline
+from .protocol import C_SCROLL_NORMALISER, SCROLL_DTYPE, TOUCH_DTYPE, ControlMessageBuilder, toI16FixedPoint
+from .writer import ControlWriter
+
+C_SPREAD_WINDOW: int = 1024
+C_DEFAULT_PERCENTILES: tuple[int, ...] = (50, 90, 99)
+
+
+class ControlGroup:
+    """
+    Sends every control message to all member devices with one encode.
+
+    Coordinates are given in the ``reference`` resolution, the first member's when not set. Touch
+    and scroll messages are packed as rows of a big-endian structured array with the coordinates
+    rescaled to each member's resolution in one vectorised pass; other messages are packed once and
+    the same bytes go to every member. All packets are handed to the ``ControlWriter`` together, so
+    they leave in the same flush, and the spread between the first and the last socket write is
+    kept for ``Spread``. The methods follow ``ControlSender``, a group can be given to a ``MacroPlayer``;
+    with ``immediate`` the packets skip coalescing and the writer's tick.
+    """
+
+    def __init__(self, members: Sequence[iPakageInfo] = (), reference: tuple[int, int] = None) -> None:
+        self._members: list[iPakageInfo] = []
+        self._reference: tuple[int, int] = reference
+        self._builder: ControlMessageBuilder = ControlMessageBuilder()
+        self._builderLock: Lock = Lock()
+        self._spreads: deque[float] = deque(maxlen=C_SPREAD_WINDOW)
+
+        # per-member layout, rebuilt when the members, their sockets or their resolutions change
+        self._sockets: list[socket.socket] = None
+        self._targets: list[socket.socket] = []
+        self._layoutSize: tuple[int, int] = (1, 1)
+        self._scale: ndarray = zeros((0, 2), dtype=float64)
+        self._limit: ndarray = zeros((0, 2), dtype=float64)
+        self._touchRows: ndarray = zeros(0, dtype=TOUCH_DTYPE)
+        self._scrollRows: ndarray = zeros(0, dtype=SCROLL_DTYPE)
+
+        for lMember in members:
+            self.Add(lMember)
+
+    def Add(self, member: iPakageInfo) -> None:
+        if member in self._members:
+            return
+
+        self._members.append(member)
+        lSignal = getattr(member, "OnResolutionChanged", None)
+        if lSignal is not None:
+            lSignal.connect(self._onResolutionChanged)
+
+        self.Invalidate()
+
+    def Remove(self, member: iPakageInfo) -> None:
+        if member not in self._members:
+            return
+
+        self._members.remove(member)
+        lSignal = getattr(member, "OnResolutionChanged", None)
+        if lSignal is not None:
+            lSignal.disconnect(self._onResolutionChanged)
+
+        self.Invalidate()
+
+    def Invalidate(self) -> None:
+        self._sockets = None
+
+    def Spread(self, percentiles: tuple[int, ...] = C_DEFAULT_PERCENTILES) -> dict[int, float]:
+        """Time between the first and the last member write of a group send, in milliseconds."""
+        if not self._spreads:
+            return {}
+
+        lSamples = array(self._spreads, dtype=float64)
+        return dict(zip(percentiles, (percentile(lSamples, percentiles) * 1000.0).tolist()))
+
+    # region [LAYOUT]
+    def _onResolutionChanged(self, *_) -> None:
+        self.Invalidate()
+
+    def _layout(self) -> None:
+        # sockets are replaced when a member restarts, comparing them is cheaper than reading every resolution
+        lSockets: list[socket.socket] = [lMember.ControlSocket for lMember in self._members]
+        if lSockets == self._sockets:
+            return
+
+        lTargets: list[socket.socket] = []
+        lSizes: list[tuple[int, int]] = []
+        for lMember, lSocket in zip(self._members, lSockets):
+            lResolution = lMember.Resolution
+            if lSocket is None or lResolution is None or lResolution.isEmpty():
+                continue
+
+            lTargets.append(lSocket)
+            lSizes.append((lResolution.width(), lResolution.height()))
+
+        lSize: ndarray = array(lSizes, dtype=float64).reshape(-1, 2)
+        self._layoutSize = self._reference or (tuple(int(lValue) for lValue in lSize[0]) if len(lSize) else (1, 1))
+        self._scale = lSize / array(self._layoutSize, dtype=float64)
+        self._limit = lSize - 1
+
+        self._touchRows = zeros(len(lTargets), dtype=TOUCH_DTYPE)
+        self._touchRows["type"] = const.TYPE_INJECT_TOUCH_EVENT
+        self._touchRows["width"] = lSize[:, 0]
+        self._touchRows["height"] = lSize[:, 1]
+        self._touchRows["pressure"] = const.PRESSURE_MAX
+        self._touchRows["actionButton"] = const.BUTTON_PRIMARY
+        self._touchRows["buttons"] = const.BUTTON_PRIMARY
+
+        self._scrollRows = zeros(len(lTargets), dtype=SCROLL_DTYPE)
+        self._scrollRows["type"] = const.TYPE_INJECT_SCROLL_EVENT
+        self._scrollRows["width"] = lSize[:, 0]
+        self._scrollRows["height"] = lSize[:, 1]
+
+        self._targets = lTargets
+        self._sockets = lSockets
+
+    def _screen_size(self) -> tuple[int, int]:
+        with self._builderLock:
+            self._layout()
+            return self._layoutSize
+
+    def _position(self, rows: ndarray, x: float, y: float) -> None:
+        lPosition: ndarray = clip(rint(array((max(x, 0), max(y, 0))) * self._scale), 0, self._limit)
+        rows["x"] = lPosition[:, 0]
+        rows["y"] = lPosition[:, 1]
+
+    def _sendRows(self, rows: ndarray, coalesceKey: Hashable = None, immediate: bool = False) -> Future:
+        lData: memoryview = memoryview(rows.tobytes())
+        lSize: int = rows.dtype.itemsize
+        return self._track(ControlWriter().SendMany([(lSocket, lData[lIndex * lSize : (lIndex + 1) * lSize]) for lIndex, lSocket in enumerate(self._targets)], coalesceKey, immediate))
+
+    def _sendSame(self, package: memoryview, immediate: bool = False) -> Future:
+        self._layout()
+        lData: bytes = bytes(package)
+        return self._track(ControlWriter().SendMany([(lSocket, lData) for lSocket in self._targets], immediate=immediate))
+
+    def _track(self, future: Future) -> Future:
+        future.add_done_callback(self._recordSpread)
+        return future
+
+    def _recordSpread(self, future: Future) -> None:
+        lFlushedAt: dict = future.result()
+        if len(lFlushedAt) > 1:
+            self._spreads.append(max(lFlushedAt.values()) - min(lFlushedAt.values()))
+
+    # endregion
+
+    # region [CONTROLS]
+    def touch(self, x: float, y: float, action: int = const.ACTION_DOWN, touch_id: int = 0x1234567887654321, immediate: bool = False) -> Future:
+        lCoalesceKey: Hashable = (const.TYPE_INJECT_TOUCH_EVENT, touch_id) if action == const.ACTION_MOVE else None
+        with self._builderLock:
+            self._layout()
+            lRows: ndarray = self._touchRows
+            lRows["action"] = action
+            lRows["pointerId"] = touch_id
+            self._position(lRows, x, y)
+            return self._sendRows(lRows, lCoalesceKey, immediate)
+
+    def scroll(self, x: float, y: float, h: float, v: float, immediate: bool = False) -> Future:
+        with self._builderLock:
+            self._layout()
+            lRows: ndarray = self._scrollRows
+            lRows["hScroll"] = toI16FixedPoint(h / C_SCROLL_NORMALISER)
+            lRows["vScroll"] = toI16FixedPoint(v / C_SCROLL_NORMALISER)
+            self._position(lRows, x, y)
+            return self._sendRows(lRows, immediate=immediate)
+
+    def keycode(self, keycode: int, action: int = const.ACTION_DOWN, repeat: int = 0, immediate: bool = False) -> Future:
+        with self._builderLock:
+            return self._sendSame(self._builder.Keycode(action, keycode, repeat), immediate)
+
+    def text(self, text: str) -> Future:
+        with self._builderLock:
+            return self._sendSame(self._builder.Text(text))
+
+    def back_or_turn_screen_on(self, action: int = const.ACTION_DOWN) -> Future:
+        with self._builderLock:
+            return self._sendSame(self._builder.BackOrScreenOn(action))
+
+    def set_screen_power_mode(self, mode: int = const.POWER_MODE_NORMAL) -> Future:
+        with self._builderLock:
+            return self._sendSame(self._builder.SetScreenPowerMode(mode))
+
+    def swipe(self, start_x: float, start_y: float, end_x: float, end_y: float, duration: float = 0.25, touch_id: int = 0x1234567887654321) -> Future:
+        lTimeline: MacroTimeline = MacroTimeline().Swipe(0.0, (start_x, start_y), (end_x, end_y), duration, touchId=touch_id)
+        return MacroPlayer(lTimeline, [self]).Start()
+
+    # endregion
+
+    # region [PROPERTIES]
+    @property
+    def Members(self) -> list[iPakageInfo]:
+        return self._members
+
+    @property
+    def ScreenSize(self) -> tuple[int, int]:
+        """Resolution the coordinates are given in, as ``ControlSender.ScreenSize``."""
+        return self._screen_size()
+
+    @property
+    def Reference(self) -> tuple[int, int]:
+        return self._screen_size()
+
+    @Reference.setter
+    def Reference(self, value: tuple[int, int]):
+        self._reference = value
+        self.Invalidate()
+
+    @property
+    def Targets(self) -> int:
+        return len(self._targets)
+
+    @property
+    def LastSpread(self) -> float:
+        return self._spreads[-1] * 1000.0 if self._spreads else 0.0
+
+    # endregion
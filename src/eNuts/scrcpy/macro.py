@@ -0,0 +1,359 @@
+"""
+This module replays timelines of input events against one or many devices
+"""
+
+# ==================================================================================
+from bisect import insort
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass
+from math import ceil, hypot
+from threading import Event, Thread
+from time import monotonic, perf_counter, sleep
+
+# ==================================================================================
+from numpy import abs as npabs
+from numpy import array, float64, percentile
+
+# ==================================================================================
+from jAGFx.logger import error
+
+# ==================================================================================
+from . import const
+
+C_DEFAULT_SPIN: float = 0.002
+C_DEFAULT_GESTURE_RATE: float = 120.0
+C_DEFAULT_PERCENTILES: tuple[int, ...] = (50, 90, 99)
+C_DEFAULT_TOUCH_ID: int = 0x1234567887654321
+C_FLUSH_TIMEOUT: float = 1.0
+
+
+def linear(progress: float) -> float:
+    return progress
+
+
+def easeInOut(progress: float) -> float:
+    return progress * progress * (3.0 - 2.0 * progress)
+
+
+@dataclass
+class MacroEvent:
+    At: float
+    Order: int = 0
+
+    def Apply(self, sender, scale: tuple[float, float]) -> Future:
+        """Sends the event right away, the future resolves to the time each socket was written at."""
+        raise NotImplementedError()
+
+    def Release(self, sender, scale: tuple[float, float]) -> None:
+        pass
+
+
+@dataclass
+class TouchEvent(MacroEvent):
+    X: float = 0
+    Y: float = 0
+    Action: int = const.ACTION_DOWN
+    TouchId: int = C_DEFAULT_TOUCH_ID
+
+    def Apply(self, sender, scale: tuple[float, float]) -> Future:
+        return sender.touch(self.X * scale[0], self.Y * scale[1], self.Action, self.TouchId, immediate=True)
+
+    def Release(self, sender, scale: tuple[float, float]) -> None:
+        sender.touch(self.X * scale[0], self.Y * scale[1], const.ACTION_UP, self.TouchId, immediate=True)
+
+
+@dataclass
+class KeyEvent(MacroEvent):
+    KeyCode: int = const.KEYCODE_UNKNOWN
+    Action: int = const.ACTION_DOWN
+    Repeat: int = 0
+
+    def Apply(self, sender, scale: tuple[float, float]) -> Future:
+        return sender.keycode(self.KeyCode, self.Action, self.Repeat, immediate=True)
+
+    def Release(self, sender, scale: tuple[float, float]) -> None:
+        sender.keycode(self.KeyCode, const.ACTION_UP, immediate=True)
+
+
+@dataclass
+class ScrollEvent(MacroEvent):
+    X: float = 0
+    Y: float = 0
+    H: float = 0.0
+    V: float = 0.0
+
+    def Apply(self, sender, scale: tuple[float, float]) -> Future:
+        return sender.scroll(self.X * scale[0], self.Y * scale[1], self.H, self.V, immediate=True)
+
+
+class MacroTimeline:
+    """
+    Time ordered input events, ``At`` is in seconds from the start of the playback.
+
+    With ``normalized`` the coordinates are fractions of the screen and every device gets
+    them scaled to its own resolution, otherwise they are device pixels.
+    """
+
+    def __init__(self, normalized: bool = False) -> None:
+        self._normalized: bool = normalized
+        self._events: list[MacroEvent] = []
+        self._order: int = 0
+
+    def Add(self, event: MacroEvent) -> MacroEvent:
+        # the order keeps events of the same instant in insertion order
+        event.Order = self._order
+        self._order += 1
+        insort(self._events, event, key=self._sortKey)
+        return event
+
+    @staticmethod
+    def _sortKey(event: MacroEvent) -> tuple[float, int]:
+        return event.At, event.Order
+
+    def Touch(self, at: float, x: float, y: float, action: int = const.ACTION_DOWN, touchId: int = C_DEFAULT_TOUCH_ID) -> "MacroTimeline":
+        self.Add(TouchEvent(at, X=x, Y=y, Action=action, TouchId=touchId))
+        return self
+
+    def Key(self, at: float, keyCode: int, action: int = const.ACTION_DOWN, repeat: int = 0) -> "MacroTimeline":
+        self.Add(KeyEvent(at, KeyCode=keyCode, Action=action, Repeat=repeat))
+        return self
+
+    def Scroll(self, at: float, x: float, y: float, h: float, v: float) -> "MacroTimeline":
+        self.Add(ScrollEvent(at, X=x, Y=y, H=h, V=v))
+        return self
+
+    def Press(self, at: float, keyCode: int, hold: float = 0.05) -> "MacroTimeline":
+        return self.Key(at, keyCode, const.ACTION_DOWN).Key(at + hold, keyCode, const.ACTION_UP)
+
+    def Tap(self, at: float, x: float, y: float, hold: float = 0.05, touchId: int = C_DEFAULT_TOUCH_ID) -> "MacroTimeline":
+        return self.Touch(at, x, y, const.ACTION_DOWN, touchId).Touch(at + hold, x, y, const.ACTION_UP, touchId)
+
+    def Swipe(
+        self,
+        at: float,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        duration: float,
+        rate: float = C_DEFAULT_GESTURE_RATE,
+        easing: Callable[[float], float] = linear,
+        touchId: int = C_DEFAULT_TOUCH_ID,
+    ) -> "MacroTimeline":
+        """Press at ``start``, move to ``end`` over ``duration`` seconds at ``rate`` moves per second and release."""
+        return self.Path(at, [start, end], duration, rate, easing, touchId)
+
+    def Path(
+        self,
+        at: float,
+        points: Sequence[tuple[float, float]],
+        duration: float,
+        rate: float = C_DEFAULT_GESTURE_RATE,
+        easing: Callable[[float], float] = linear,
+        touchId: int = C_DEFAULT_TOUCH_ID,
+    ) -> "MacroTimeline":
+        """Like ``Swipe`` through every point of a polyline, the pointer keeps a constant speed along it."""
+        if len(points) < 2:
+            raise ValueError("A path needs at least two points")
+
+        lLengths: list[float] = [hypot(lB[0] - lA[0], lB[1] - lA[1]) for lA, lB in zip(points, points[1:])]
+        lTotal: float = sum(lLengths) or 1.0
+        lSteps: int = max(1, ceil(duration * rate))
+
+        self.Touch(at, points[0][0], points[0][1], const.ACTION_DOWN, touchId)
+        for lStep in range(1, lSteps + 1):
+            lX, lY = self._pointAt(points, lLengths, easing(lStep / lSteps) * lTotal)
+            self.Touch(at + duration * lStep / lSteps, lX, lY, const.ACTION_MOVE, touchId)
+
+        return self.Touch(at + duration, points[-1][0], points[-1][1], const.ACTION_UP, touchId)
+
+    @staticmethod
+    def _pointAt(points: Sequence[tuple[float, float]], lengths: list[float], distance: float) -> tuple[float, float]:
+        for lIndex, lLength in enumerate(lengths):
+            if distance <= lLength or lIndex == len(lengths) - 1:
+                lRatio: float = min(distance / lLength, 1.0) if lLength else 1.0
+                lStart, lEnd = points[lIndex], points[lIndex + 1]
+                return lStart[0] + (lEnd[0] - lStart[0]) * lRatio, lStart[1] + (lEnd[1] - lStart[1]) * lRatio
+
+            distance -= lLength
+
+        return points[-1]
+
+    def Clear(self) -> None:
+        self._events.clear()
+
+    # region [PROPERTIES]
+    @property
+    def Events(self) -> list[MacroEvent]:
+        return self._events
+
+    @property
+    def Duration(self) -> float:
+        return self._events[-1].At if self._events else 0.0
+
+    @property
+    def Normalized(self) -> bool:
+        return self._normalized
+
+    # endregion
+
+
+class MacroPlayer:
+    """
+    Replays a ``MacroTimeline`` on its own thread against one or more ``ControlSender``.
+
+    Each event is due at ``start + At`` on ``perf_counter``. The player sleeps until ``spin``
+    seconds before that and busy-waits the rest, since ``sleep`` alone overshoots by up to a
+    scheduler quantum. Events go to the ``ControlWriter`` as immediate packets, so no point of a
+    gesture is coalesced away or held for the writer's tick. ``Jitter`` reports, for every event and
+    device, the difference between the due time and the time the packet was written to the socket.
+    """
+
+    def __init__(self, timeline: MacroTimeline, senders: Sequence, spin: float = C_DEFAULT_SPIN) -> None:
+        self._timeline: MacroTimeline = timeline
+        self._senders: list = list(senders)
+        self._spin: float = spin
+        self._stop: Event = Event()
+        self._thread: Thread = None
+        self._future: Future = None
+        self._jitter: list[float] = []
+        self._played: int = 0
+
+    def Start(self) -> Future:
+        """Plays in the background, the future resolves to the number of events dispatched."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._future
+
+        self._stop.clear()
+        self._future = Future()
+        self._thread = Thread(target=self._run, daemon=True, name="MacroPlayer")
+        self._thread.start()
+        return self._future
+
+    def Play(self) -> int:
+        """Plays on the calling thread."""
+        self._stop.clear()
+        return self._play()
+
+    def Stop(self, timeout: float = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def Jitter(self, percentiles: tuple[int, ...] = C_DEFAULT_PERCENTILES) -> dict[int, float]:
+        """Absolute error between due and socket write time of the last playback in milliseconds."""
+        if not self._jitter:
+            return {}
+
+        lSamples = npabs(array(self._jitter, dtype=float64))
+        return dict(zip(percentiles, (percentile(lSamples, percentiles) * 1000.0).tolist()))
+
+    def _run(self) -> None:
+        try:
+            self._future.set_result(self._play())
+
+        except Exception as ex:
+            error("Macro playback failed", ex)
+            self._future.set_exception(ex)
+
+    def _play(self) -> int:
+        lScales: list[tuple[float, float]] = [self._scale(lSender) for lSender in self._senders]
+        lTargets: list[tuple] = list(zip(self._senders, lScales))
+        lHeld: dict[tuple, MacroEvent] = {}
+        lSent: list[tuple[float, Future]] = []
+        self._jitter = []
+        self._played = 0
+
+        lStart: float = perf_counter()
+        # the writer stamps its flushes with monotonic, the due times are converted once
+        lStartedAt: float = monotonic()
+        try:
+            for lEvent in self._timeline.Events:
+                lDue: float = lStart + lEvent.At
+                if not self._waitUntil(lDue):
+                    break
+
+                for lSender, lScale in lTargets:
+                    lSent.append((lStartedAt + lEvent.At, lEvent.Apply(lSender, lScale)))
+
+                self._played += 1
+                self._track(lHeld, lEvent)
+
+        finally:
+            # never leave a pointer or key pressed on the devices when interrupted
+            for lEvent in lHeld.values():
+                for lSender, lScale in lTargets:
+                    lEvent.Release(lSender, lScale)
+
+        self._jitter = self._flushErrors(lSent)
+        return self._played
+
+    @staticmethod
+    def _flushErrors(sent: list[tuple[float, Future]]) -> list[float]:
+        lErrors: list[float] = []
+        for lDue, lFuture in sent:
+            try:
+                lFlushedAt: dict = lFuture.result(C_FLUSH_TIMEOUT)
+
+            except Exception:
+                continue
+
+            lErrors.extend(lTime - lDue for lTime in lFlushedAt.values())
+
+        return lErrors
+
+    def _waitUntil(self, due: float) -> bool:
+        lRemaining: float = due - perf_counter()
+        if lRemaining > self._spin and self._stop.wait(lRemaining - self._spin):
+            return False
+
+        while perf_counter() < due:
+            if self._stop.is_set():
+                return False
+
+            # yields the GIL so the writer and decoder threads keep running while spinning
+            sleep(0)
+
+        return not self._stop.is_set()
+
+    @staticmethod
+    def _track(held: dict[tuple, MacroEvent], event: MacroEvent) -> None:
+        if isinstance(event, TouchEvent):
+            lKey: tuple = (TouchEvent, event.TouchId)
+        elif isinstance(event, KeyEvent):
+            lKey = (KeyEvent, event.KeyCode)
+        else:
+            return
+
+        if event.Action == const.ACTION_UP:
+            held.pop(lKey, None)
+        else:
+            held[lKey] = event
+
+    def _scale(self, sender) -> tuple[float, float]:
+        if not self._timeline.Normalized:
+            return 1.0, 1.0
+
+        return tuple(float(lSize) for lSize in sender.ScreenSize)
+
+    # region [PROPERTIES]
+    @property
+    def Timeline(self) -> MacroTimeline:
+        return self._timeline
+
+    @property
+    def Senders(self) -> list:
+        return self._senders
+
+    @property
+    def Played(self) -> int:
+        return self._played
+
+    @property
+    def MaxJitter(self) -> float:
+        return max((abs(lValue) for lValue in self._jitter), default=0.0) * 1000.0
+
+    @property
+    def IsPlaying(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # endregion
@@ -0,0 +1,191 @@
+"""
+This module parses the device messages scrcpy 2.4 sends back on the control socket
+"""
+
+# ==================================================================================
+import socket
+import struct
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from itertools import count
+from threading import Lock
+from typing import Any
+
+# ==================================================================================
+from jAGFx.logger import error, warning
+
+# ==================================================================================
+from . import const
+
+CLIPBOARD_HEADER: struct.Struct = struct.Struct(">BI")
+ACK_CLIPBOARD: struct.Struct = struct.Struct(">BQ")
+UHID_OUTPUT_HEADER: struct.Struct = struct.Struct(">BHH")
+C_MAX_MESSAGE_RECEIVE: int = 0x10000
+
+
+@dataclass(slots=True)
+class ClipboardMessage:
+    Text: str
+
+
+@dataclass(slots=True)
+class AckClipboardMessage:
+    Sequence: int
+
+
+@dataclass(slots=True)
+class UhidOutputMessage:
+    Id: int
+    Data: bytes
+
+
+class DeviceMessageReader:
+    """
+    Incremental parser for the device-to-host side of the control socket.
+
+    ``Feed`` turns received bytes into typed messages, hands each one to ``onMessage`` and resolves
+    the futures waiting for it: clipboard requests in the order they were sent and clipboard
+    acknowledgements by sequence number. ``OnReadable`` is the selector callback that reads the
+    socket without ever blocking, so it never holds up the messages going the other way.
+    """
+
+    def __init__(self, onMessage: Callable[[Any], None] = None) -> None:
+        self._onMessage: Callable[[Any], None] = onMessage
+        self._buffer: bytearray = bytearray()
+        self._clipboardRequests: deque[Future] = deque()
+        self._acks: dict[int, Future] = {}
+        self._sequences = count(1)
+        self._lock: Lock = Lock()
+
+    def RequestClipboard(self) -> Future:
+        lFuture: Future = Future()
+        with self._lock:
+            self._clipboardRequests.append(lFuture)
+
+        return lFuture
+
+    def ExpectAck(self) -> tuple[int, Future]:
+        lFuture: Future = Future()
+        with self._lock:
+            lSequence: int = next(self._sequences)
+            self._acks[lSequence] = lFuture
+
+        return lSequence, lFuture
+
+    def OnReadable(self, sock: socket.socket) -> bool:
+        """Reads what is available, False once the socket reached end of stream."""
+        try:
+            lData: bytes = sock.recv(C_MAX_MESSAGE_RECEIVE)
+
+        except BlockingIOError:
+            return True
+
+        except OSError as ex:
+            self.Close(ex)
+            return False
+
+        if not lData:
+            self.Close(ConnectionError("Control socket is disconnected"))
+            return False
+
+        self.Feed(lData)
+        return True
+
+    def Feed(self, data: bytes) -> list[Any]:
+        self._buffer += data
+        lMessages: list[Any] = []
+        lOffset: int = 0
+        while lOffset < len(self._buffer):
+            lMessage, lConsumed = self._parse(lOffset)
+            if lConsumed == 0:
+                break
+
+            lOffset += lConsumed
+            if lMessage is not None:
+                lMessages.append(lMessage)
+
+        del self._buffer[:lOffset]
+        for lMessage in lMessages:
+            self._dispatch(lMessage)
+
+        return lMessages
+
+    def Reset(self) -> None:
+        self.Close(ConnectionError("Control channel was reset"))
+        self._buffer.clear()
+
+    def Close(self, reason: Exception = None) -> None:
+        with self._lock:
+            lPending: list[Future] = [*self._clipboardRequests, *self._acks.values()]
+            self._clipboardRequests.clear()
+            self._acks.clear()
+
+        for lFuture in lPending:
+            if not lFuture.done():
+                lFuture.set_exception(reason or ConnectionError("Control socket is closed"))
+
+    def _parse(self, offset: int) -> tuple[Any, int]:
+        lAvailable: int = len(self._buffer) - offset
+        lType: int = self._buffer[offset]
+        if lType == const.DEVICE_MSG_TYPE_CLIPBOARD:
+            if lAvailable < CLIPBOARD_HEADER.size:
+                return None, 0
+
+            _, lLength = CLIPBOARD_HEADER.unpack_from(self._buffer, offset)
+            lEnd: int = CLIPBOARD_HEADER.size + lLength
+            if lAvailable < lEnd:
+                return None, 0
+
+            lText: str = bytes(self._buffer[offset + CLIPBOARD_HEADER.size : offset + lEnd]).decode("utf-8", "replace")
+            return ClipboardMessage(lText), lEnd
+
+        if lType == const.DEVICE_MSG_TYPE_ACK_CLIPBOARD:
+            if lAvailable < ACK_CLIPBOARD.size:
+                return None, 0
+
+            _, lSequence = ACK_CLIPBOARD.unpack_from(self._buffer, offset)
+            return AckClipboardMessage(lSequence), ACK_CLIPBOARD.size
+
+        if lType == const.DEVICE_MSG_TYPE_UHID_OUTPUT:
+            if lAvailable < UHID_OUTPUT_HEADER.size:
+                return None, 0
+
+            _, lId, lSize = UHID_OUTPUT_HEADER.unpack_from(self._buffer, offset)
+            lEnd = UHID_OUTPUT_HEADER.size + lSize
+            if lAvailable < lEnd:
+                return None, 0
+
+            return UhidOutputMessage(lId, bytes(self._buffer[offset + UHID_OUTPUT_HEADER.size : offset + lEnd])), lEnd
+
+        # the stream can not be resynchronised after an unknown type, drop what is buffered
+        warning(f"Unknown device message type {lType}, discarding {lAvailable} bytes")
+        return None, lAvailable
+
+    def _dispatch(self, message: Any) -> None:
+        lFuture: Future = None
+        with self._lock:
+            if isinstance(message, ClipboardMessage) and self._clipboardRequests:
+                lFuture = self._clipboardRequests.popleft()
+
+            elif isinstance(message, AckClipboardMessage):
+                lFuture = self._acks.pop(message.Sequence, None)
+
+        if lFuture is not None and not lFuture.done():
+            lFuture.set_result(message.Text if isinstance(message, ClipboardMessage) else message.Sequence)
+
+        if self._onMessage is not None:
+            try:
+                self._onMessage(message)
+
+            except Exception as ex:
+                error("Error handling device message", ex)
+
+    # region [PROPERTIES]
+    @property
+    def PendingRequests(self) -> int:
+        with self._lock:
+            return len(self._clipboardRequests) + len(self._acks)
+
+    # endregion
@@ -0,0 +1,201 @@
+"""
+This module packs scrcpy 2.4 control messages into a reusable buffer
+"""
+
+# ==================================================================================
+import struct
+
+# ==================================================================================
+from numpy import dtype
+
+# ==================================================================================
+from . import const
+
+KEYCODE: struct.Struct = struct.Struct(">BBIII")
+TEXT_HEADER: struct.Struct = struct.Struct(">BI")
+TOUCH: struct.Struct = struct.Struct(">BBqiiHHHII")
+SCROLL: struct.Struct = struct.Struct(">BiiHHhhI")
+BACK_OR_SCREEN_ON: struct.Struct = struct.Struct(">BB")
+GET_CLIPBOARD: struct.Struct = struct.Struct(">BB")
+SET_CLIPBOARD_HEADER: struct.Struct = struct.Struct(">BQ?I")
+SET_SCREEN_POWER_MODE: struct.Struct = struct.Struct(">BB")
+EMPTY: struct.Struct = struct.Struct(">B")
+
+C_WIRE_FORMAT: dict[str, tuple[struct.Struct, int]] = {
+    "INJECT_KEYCODE": (KEYCODE, const.MESSAGE_SIZE_INJECT_KEYCODE),
+    "INJECT_TEXT": (TEXT_HEADER, const.MESSAGE_SIZE_INJECT_TEXT),
+    "INJECT_TOUCH_EVENT": (TOUCH, const.MESSAGE_SIZE_INJECT_TOUCH_EVENT),
+    "INJECT_SCROLL_EVENT": (SCROLL, const.MESSAGE_SIZE_INJECT_SCROLL_EVENT),
+    "BACK_OR_SCREEN_ON": (BACK_OR_SCREEN_ON, const.MESSAGE_SIZE_BACK_OR_SCREEN_ON),
+    "GET_CLIPBOARD": (GET_CLIPBOARD, const.MESSAGE_SIZE_GET_CLIPBOARD),
+    "SET_CLIPBOARD": (SET_CLIPBOARD_HEADER, const.MESSAGE_SIZE_SET_CLIPBOARD),
+    "SET_SCREEN_POWER_MODE": (SET_SCREEN_POWER_MODE, const.MESSAGE_SIZE_SET_SCREEN_POWER_MODE),
+    "EMPTY": (EMPTY, const.MESSAGE_SIZE_EMPTY),
+}
+# structured big-endian layouts of the same messages, one row per device for group sends
+TOUCH_DTYPE: dtype = dtype(
+    [
+        ("type", "u1"),
+        ("action", "u1"),
+        ("pointerId", ">i8"),
+        ("x", ">i4"),
+        ("y", ">i4"),
+        ("width", ">u2"),
+        ("height", ">u2"),
+        ("pressure", ">u2"),
+        ("actionButton", ">u4"),
+        ("buttons", ">u4"),
+    ]
+)
+SCROLL_DTYPE: dtype = dtype(
+    [
+        ("type", "u1"),
+        ("x", ">i4"),
+        ("y", ">i4"),
+        ("width", ">u2"),
+        ("height", ">u2"),
+        ("hScroll", ">i2"),
+        ("vScroll", ">i2"),
+        ("buttons", ">u4"),
+    ]
+)
+C_STRUCTURED_FORMAT: dict[str, tuple[dtype, int]] = {
+    "INJECT_TOUCH_EVENT": (TOUCH_DTYPE, const.MESSAGE_SIZE_INJECT_TOUCH_EVENT),
+    "INJECT_SCROLL_EVENT": (SCROLL_DTYPE, const.MESSAGE_SIZE_INJECT_SCROLL_EVENT),
+}
+C_FIXED_CAPACITY: int = max(lStruct.size for lStruct, _ in C_WIRE_FORMAT.values())
+C_I16_FIXED_POINT: int = 0x8000
+C_SCROLL_NORMALISER: float = 16.0
+
+
+def validateWireFormat() -> None:
+    for lName, (lStruct, lExpected) in C_WIRE_FORMAT.items():
+        if lStruct.size != lExpected:
+            raise ValueError(f"{lName} packs {lStruct.size} bytes, scrcpy 2.4 expects {lExpected}")
+
+    for lName, (lType, lExpected) in C_STRUCTURED_FORMAT.items():
+        if lType.itemsize != lExpected:
+            raise ValueError(f"{lName} rows are {lType.itemsize} bytes, scrcpy 2.4 expects {lExpected}")
+
+
+validateWireFormat()
+
+
+def toI16FixedPoint(value: float) -> int:
+    lValue: float = min(max(value, -1.0), 1.0)
+    return min(int(lValue * C_I16_FIXED_POINT), C_I16_FIXED_POINT - 1)
+
+
+def truncateUTF8(text: str, maxLength: int) -> bytes:
+    lData: bytes = text.encode("utf-8")
+    if len(lData) <= maxLength:
+        return lData
+
+    return lData[:maxLength].decode("utf-8", "ignore").encode("utf-8")
+
+
+class ControlMessageBuilder:
+    """
+    Packs control messages with precompiled ``struct.Struct`` objects into buffers it reuses.
+
+    Every method returns a ``memoryview`` of the packed message, type byte included. The view is
+    only valid until the next call on the same builder, consume or copy it before building again.
+    Text messages reuse a second buffer that is only reallocated when a longer text comes along.
+    """
+
+    def __init__(self) -> None:
+        self._fixed: bytearray = bytearray(C_FIXED_CAPACITY)
+        lView: memoryview = memoryview(self._fixed)
+        self._keycodeView: memoryview = lView[: KEYCODE.size]
+        self._touchView: memoryview = lView[: TOUCH.size]
+        self._scrollView: memoryview = lView[: SCROLL.size]
+        self._twoByteView: memoryview = lView[:2]
+        self._emptyView: memoryview = lView[: EMPTY.size]
+
+        self._packKeycode = KEYCODE.pack_into
+        self._packTouch = TOUCH.pack_into
+        self._packScroll = SCROLL.pack_into
+        self._packTwoBytes = BACK_OR_SCREEN_ON.pack_into
+        self._packEmpty = EMPTY.pack_into
+
+        self._variable: bytearray = bytearray(C_FIXED_CAPACITY)
+        self._variableView: memoryview = memoryview(self._variable)
+
+    def Keycode(self, action: int, keycode: int, repeat: int = 0, metaState: int = 0) -> memoryview:
+        self._packKeycode(self._fixed, 0, const.TYPE_INJECT_KEYCODE, action, keycode, repeat, metaState)
+        return self._keycodeView
+
+    def Touch(
+        self,
+        action: int,
+        pointerId: int,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        pressure: int = const.PRESSURE_MAX,
+        actionButton: int = const.BUTTON_PRIMARY,
+        buttons: int = const.BUTTON_PRIMARY,
+    ) -> memoryview:
+        self._packTouch(self._fixed, 0, const.TYPE_INJECT_TOUCH_EVENT, action, pointerId, x, y, width, height, pressure, actionButton, buttons)
+        return self._touchView
+
+    def Scroll(self, x: int, y: int, width: int, height: int, hScroll: float, vScroll: float, buttons: int = 0) -> memoryview:
+        """``hScroll`` and ``vScroll`` are scroll steps, clamped to +/-16 like the scrcpy client does."""
+        self._packScroll(
+            self._fixed,
+            0,
+            const.TYPE_INJECT_SCROLL_EVENT,
+            x,
+            y,
+            width,
+            height,
+            toI16FixedPoint(hScroll / C_SCROLL_NORMALISER),
+            toI16FixedPoint(vScroll / C_SCROLL_NORMALISER),
+            buttons,
+        )
+        return self._scrollView
+
+    def BackOrScreenOn(self, action: int) -> memoryview:
+        self._packTwoBytes(self._fixed, 0, const.TYPE_BACK_OR_SCREEN_ON, action)
+        return self._twoByteView
+
+    def GetClipboard(self, copyKey: int = const.COPY_KEY_NONE) -> memoryview:
+        self._packTwoBytes(self._fixed, 0, const.TYPE_GET_CLIPBOARD, copyKey)
+        return self._twoByteView
+
+    def SetScreenPowerMode(self, mode: int) -> memoryview:
+        self._packTwoBytes(self._fixed, 0, const.TYPE_SET_SCREEN_POWER_MODE, mode)
+        return self._twoByteView
+
+    def Empty(self, controlType: int) -> memoryview:
+        self._packEmpty(self._fixed, 0, controlType)
+        return self._emptyView
+
+    def Text(self, text: str) -> memoryview:
+        lData: bytes = text.encode("utf-8")
+        if len(lData) > const.INJECT_TEXT_MAX_LENGTH:
+            lData = truncateUTF8(text, const.INJECT_TEXT_MAX_LENGTH)
+
+        lEnd: int = TEXT_HEADER.size + len(lData)
+        self._reserve(lEnd)
+        TEXT_HEADER.pack_into(self._variable, 0, const.TYPE_INJECT_TEXT, len(lData))
+        self._variable[TEXT_HEADER.size : lEnd] = lData
+        return self._variableView[:lEnd]
+
+    def SetClipboard(self, text: str, paste: bool = False, sequence: int = 0) -> memoryview:
+        lData: bytes = text.encode("utf-8")
+        if len(lData) > const.CLIPBOARD_TEXT_MAX_LENGTH:
+            lData = truncateUTF8(text, const.CLIPBOARD_TEXT_MAX_LENGTH)
+
+        lEnd: int = SET_CLIPBOARD_HEADER.size + len(lData)
+        self._reserve(lEnd)
+        SET_CLIPBOARD_HEADER.pack_into(self._variable, 0, const.TYPE_SET_CLIPBOARD, sequence, paste, len(lData))
+        self._variable[SET_CLIPBOARD_HEADER.size : lEnd] = lData
+        return self._variableView[:lEnd]
+
+    def _reserve(self, size: int) -> None:
+        if len(self._variable) < size:
+            # a view of the old buffer may still be alive, so replace it instead of resizing
+            self._variable = bytearray(max(size, len(self._variable) * 2))
+            self._variableView = memoryview(self._variable)
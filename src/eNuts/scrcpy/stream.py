@@ -0,0 +1,100 @@
+"""
+This module parses the scrcpy 2.4 video stream when the server runs with send_frame_meta=true
+"""
+
+# ==================================================================================
+import struct
+from dataclasses import dataclass
+from fractions import Fraction
+from time import monotonic
+
+# ==================================================================================
+from av import Packet
+
+C_FRAME_HEADER: struct.Struct = struct.Struct(">QI")
+C_CODEC_HEADER: struct.Struct = struct.Struct(">III")
+C_PACKET_FLAG_CONFIG: int = 1 << 63
+C_PACKET_FLAG_KEY_FRAME: int = 1 << 62
+C_PTS_MASK: int = C_PACKET_FLAG_KEY_FRAME - 1
+C_PTS_TIME_BASE: Fraction = Fraction(1, 1_000_000)
+
+
+@dataclass(slots=True)
+class MediaPacket:
+    Data: bytes
+    Pts: int
+    IsKeyFrame: bool
+    IsConfig: bool
+    ReceivedAt: float
+
+    def ToPacket(self) -> Packet:
+        lPacket: Packet = Packet(self.Data)
+        lPacket.pts = self.Pts
+        lPacket.time_base = C_PTS_TIME_BASE
+        lPacket.is_keyframe = self.IsKeyFrame
+        return lPacket
+
+
+class FramePacketReader:
+    """
+    Incremental parser for the framed scrcpy video stream.
+
+    Every packet is preceded by a 12-byte header carrying the PTS (microseconds), the config and
+    key-frame flags and the payload size. Config packets (SPS/PPS) are kept in ``Config`` and, as the
+    scrcpy client does, prepended to the next media packet so the decoder gets a self-contained unit.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: bytearray = bytearray()
+        self._config: bytes = b""
+        self._pendingConfig: bytes = b""
+
+    def Feed(self, data: bytes, receivedAt: float = None) -> list[MediaPacket]:
+        lReceivedAt: float = monotonic() if receivedAt is None else receivedAt
+        self._buffer += data
+        lPackets: list[MediaPacket] = []
+        lOffset: int = 0
+        lAvailable: int = len(self._buffer)
+        while lAvailable - lOffset >= C_FRAME_HEADER.size:
+            lPtsAndFlags, lSize = C_FRAME_HEADER.unpack_from(self._buffer, lOffset)
+            lEnd: int = lOffset + C_FRAME_HEADER.size + lSize
+            if lEnd > lAvailable:
+                break
+
+            lPayload: bytes = bytes(self._buffer[lOffset + C_FRAME_HEADER.size : lEnd])
+            lOffset = lEnd
+
+            if lPtsAndFlags & C_PACKET_FLAG_CONFIG:
+                self._config = lPayload
+                self._pendingConfig += lPayload
+                continue
+
+            if self._pendingConfig:
+                lPayload = self._pendingConfig + lPayload
+                self._pendingConfig = b""
+
+            lPackets.append(
+                MediaPacket(
+                    Data=lPayload,
+                    Pts=lPtsAndFlags & C_PTS_MASK,
+                    IsKeyFrame=bool(lPtsAndFlags & C_PACKET_FLAG_KEY_FRAME),
+                    IsConfig=False,
+                    ReceivedAt=lReceivedAt,
+                )
+            )
+
+        del self._buffer[:lOffset]
+        return lPackets
+
+    def Reset(self) -> None:
+        self._buffer.clear()
+        self._config = b""
+        self._pendingConfig = b""
+
+    @property
+    def Config(self) -> bytes:
+        return self._config
+
+    @property
+    def Buffered(self) -> int:
+        return len(self._buffer)
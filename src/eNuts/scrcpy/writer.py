@@ -0,0 +1,258 @@
+"""
+This module batches control messages of every device on one writer thread
+"""
+
+# ==================================================================================
+import socket
+from collections import deque
+from collections.abc import Callable, Hashable, Sequence
+from concurrent.futures import Future
+from select import select
+from threading import Condition, Lock, Thread
+from time import monotonic
+
+# ==================================================================================
+from numpy import array, float64, percentile
+
+# ==================================================================================
+from jAGFx.logger import warning
+from jAGFx.singleton import SingletonF
+
+C_DEFAULT_TICK: float = 0.004
+C_WRITE_TIMEOUT: float = 1.0
+C_LATENCY_WINDOW: int = 1024
+C_DEFAULT_PERCENTILES: tuple[int, ...] = (50, 90, 99)
+
+
+class _Outbox:
+    def __init__(self) -> None:
+        self.Buffer: bytearray = bytearray()
+        self.Stamps: list[float] = []
+        self.LastKey: Hashable = None
+        self.LastOffset: int = 0
+        self.Tickets: list["_Ticket"] = []
+
+
+class _Ticket:
+    """Resolves to the per-socket flush times once every socket of a group send was written."""
+
+    def __init__(self, count: int) -> None:
+        self.Remaining: int = count
+        self.FlushedAt: dict[socket.socket, float] = {}
+        self.Future: Future = Future()
+        self.Lock: Lock = Lock()
+
+    def Done(self, sock: socket.socket, flushedAt: float) -> None:
+        with self.Lock:
+            if flushedAt is not None:
+                self.FlushedAt[sock] = flushedAt
+
+            self.Remaining -= 1
+            if self.Remaining:
+                return
+
+        self.Future.set_result(self.FlushedAt)
+
+
+@SingletonF
+class ControlWriter:
+    """
+    Outbound queue for the control sockets of all devices.
+
+    ``Send`` only appends to the socket's buffer, the writer thread flushes each buffer in one
+    write at most once per ``tick``. A packet sent with a ``coalesceKey`` equal to the
+    one of the packet queued right before it overwrites that packet in place, which is how
+    consecutive ``ACTION_MOVE`` events of one pointer collapse into the latest position. An
+    ``immediate`` packet is never coalesced and wakes the writer without waiting for the tick, for
+    timed input such as macros, where every point and its timing matter.
+    """
+
+    def __init__(self, tick: float = C_DEFAULT_TICK) -> None:
+        self._tick: float = tick
+        self._outboxes: dict[socket.socket, _Outbox] = {}
+        self._dirty: set[socket.socket] = set()
+        self._urgent: bool = False
+        self._condition: Condition = Condition()
+        self._thread: Thread = None
+        self._observers: dict[socket.socket, Callable[[bytes, float], None]] = {}
+
+        self._latencies: deque[float] = deque(maxlen=C_LATENCY_WINDOW)
+        self._packets: int = 0
+        self._coalesced: int = 0
+        self._flushes: int = 0
+        self._bytes: int = 0
+
+    def Send(self, sock: socket.socket, packet: bytes, coalesceKey: Hashable = None, immediate: bool = False) -> Future:
+        """Queues the packet, with ``immediate`` the future resolves like the one of ``SendMany``, otherwise None."""
+        lNow: float = monotonic()
+        lTicket: _Ticket = _Ticket(1) if immediate else None
+        with self._condition:
+            self._ensureRunning()
+            lOutbox: _Outbox = self._enqueue(sock, packet, None if immediate else coalesceKey, lNow, immediate)
+            if lTicket is not None:
+                lOutbox.Tickets.append(lTicket)
+
+            lObserver: Callable[[bytes, float], None] = self._observers.get(sock)
+
+        if lObserver is not None:
+            lObserver(packet, lNow)
+
+        return lTicket.Future if lTicket is not None else None
+
+    def SendMany(self, packets: Sequence[tuple[socket.socket, bytes]], coalesceKey: Hashable = None, immediate: bool = False) -> Future:
+        """
+        Queues one packet per socket under a single lock so they all go out in the same flush.
+
+        The future resolves to the ``monotonic`` time each socket was written at, sockets that
+        failed are left out.
+        """
+        lNow: float = monotonic()
+        lTicket: _Ticket = _Ticket(len(packets))
+        if not packets:
+            lTicket.Future.set_result({})
+            return lTicket.Future
+
+        with self._condition:
+            self._ensureRunning()
+            for lSocket, lPacket in packets:
+                self._enqueue(lSocket, lPacket, None if immediate else coalesceKey, lNow, immediate).Tickets.append(lTicket)
+
+            lObservers: list = [(self._observers[lSocket], lPacket) for lSocket, lPacket in packets if lSocket in self._observers]
+
+        for lObserver, lPacket in lObservers:
+            lObserver(lPacket, lNow)
+
+        return lTicket.Future
+
+    def Observe(self, sock: socket.socket, observer: Callable[[bytes, float], None]) -> None:
+        """Calls ``observer(packet, sentAt)`` for every packet sent to ``sock``, on the sending thread."""
+        with self._condition:
+            self._observers[sock] = observer
+
+    def Unobserve(self, sock: socket.socket) -> None:
+        with self._condition:
+            self._observers.pop(sock, None)
+
+    def _enqueue(self, sock: socket.socket, packet: bytes, coalesceKey: Hashable, now: float, immediate: bool = False) -> _Outbox:
+        lOutbox: _Outbox = self._outboxes.get(sock)
+        if lOutbox is None:
+            lOutbox = self._outboxes[sock] = _Outbox()
+
+        lLength: int = len(packet)
+        if (
+            coalesceKey is not None
+            and coalesceKey == lOutbox.LastKey
+            and len(lOutbox.Buffer) - lOutbox.LastOffset == lLength
+        ):
+            lOutbox.Buffer[lOutbox.LastOffset :] = packet
+            lOutbox.Stamps[-1] = now
+            self._coalesced += 1
+            return lOutbox
+
+        lOutbox.LastKey = coalesceKey
+        lOutbox.LastOffset = len(lOutbox.Buffer)
+        lOutbox.Buffer += packet
+        lOutbox.Stamps.append(now)
+        self._packets += 1
+        self._dirty.add(sock)
+        self._urgent = self._urgent or immediate
+        self._condition.notify()
+        return lOutbox
+
+    def Discard(self, sock: socket.socket) -> None:
+        with self._condition:
+            self._observers.pop(sock, None)
+            lOutbox: _Outbox = self._outboxes.pop(sock, None)
+            self._dirty.discard(sock)
+
+        if lOutbox is not None:
+            for lTicket in lOutbox.Tickets:
+                lTicket.Done(sock, None)
+
+    def QueueLatency(self, percentiles: tuple[int, ...] = C_DEFAULT_PERCENTILES) -> dict[int, float]:
+        """Time packets spent queued before their flush, in milliseconds."""
+        with self._condition:
+            if not self._latencies:
+                return {}
+
+            lSamples = array(self._latencies, dtype=float64)
+
+        return dict(zip(percentiles, (percentile(lSamples, percentiles) * 1000.0).tolist()))
+
+    def _ensureRunning(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(target=self._run, daemon=True, name="ControlWriter")
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._dirty:
+                    self._condition.wait()
+
+                lBatch: list[tuple[socket.socket, _Outbox]] = [(lSocket, self._outboxes.pop(lSocket)) for lSocket in self._dirty]
+                self._dirty.clear()
+                self._urgent = False
+
+            for lSocket, lOutbox in lBatch:
+                try:
+                    self._sendAll(lSocket, lOutbox.Buffer)
+
+                except OSError as ex:
+                    warning("Dropping control messages for a closed socket", ex)
+                    for lTicket in lOutbox.Tickets:
+                        lTicket.Done(lSocket, None)
+
+                    continue
+
+                lNow: float = monotonic()
+                for lTicket in lOutbox.Tickets:
+                    lTicket.Done(lSocket, lNow)
+
+                with self._condition:
+                    self._latencies.extend(lNow - lStamp for lStamp in lOutbox.Stamps)
+                    self._flushes += 1
+                    self._bytes += len(lOutbox.Buffer)
+
+            # waits out the tick so the next packets batch up, an immediate one cuts it short
+            with self._condition:
+                self._condition.wait_for(lambda: self._urgent, self._tick)
+
+    @staticmethod
+    def _sendAll(sock: socket.socket, data: bytearray) -> None:
+        # control sockets may be non-blocking since the device message reader shares them
+        lView: memoryview = memoryview(data)
+        while lView:
+            try:
+                lView = lView[sock.send(lView) :]
+
+            except BlockingIOError:
+                if not select([], [sock], [], C_WRITE_TIMEOUT)[1]:
+                    raise TimeoutError("Control socket is not draining")
+
+    # region [PROPERTIES]
+    @property
+    def Tick(self) -> float:
+        return self._tick
+
+    @Tick.setter
+    def Tick(self, value: float):
+        self._tick = value
+
+    @property
+    def Packets(self) -> int:
+        return self._packets
+
+    @property
+    def Coalesced(self) -> int:
+        return self._coalesced
+
+    @property
+    def Flushes(self) -> int:
+        return self._flushes
+
+    @property
+    def Bytes(self) -> int:
+        return self._bytes
+
+    # endregion
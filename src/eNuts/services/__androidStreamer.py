@@ -2,24 +2,26 @@ import os
 import socket
 import struct
 from queue import Queue
+from selectors import EVENT_READ, DefaultSelector
 from threading import Lock
 from time import sleep
 from types import FunctionType
 
-from adbutils import AdbConnection, AdbDevice, AdbError, Network, adb
+from adbutils import AdbConnection, AdbDevice, AdbError, Network
 from av import CodecContext, Packet, VideoFrame
 from av.error import InvalidDataError
 from numpy import ndarray
 
-from jAGFx.logger import debug, error, warning
+from jAGFx.logger import debug
 from jAGFx.service import Service
 
 from ..scrcpy.controls import BaseAppControl
+from .__deviceInventory import DeviceInventory
+from .policies import EncoderSettings
 
 JAR_NAME: str = "scrcpy-server.jar"
-FPS: int = 120
-BITRATE: int = 1000000000
 MAX_PACKET_RECIEVE: int = 0x10000
+POLL_TIMEOUT: float = 0.1
 
 
 class AndroidStreamer(Service):
@@ -32,6 +34,7 @@ class AndroidStreamer(Service):
         self._imageQueue: Queue = Queue(128)
 
         self._maxwidth: int = maxwidth
+        self._encoderSettings: EncoderSettings = EncoderSettings(maxwidth)
 
         self._serverStream: AdbConnection = None
         self._vsocket: socket.socket = None
@@ -75,6 +78,14 @@ class AndroidStreamer(Service):
     def MaxWidth(self) -> int:
         return self._maxwidth
 
+    @property
+    def EncoderSettings(self) -> EncoderSettings:
+        return self._encoderSettings
+
+    @EncoderSettings.setter
+    def EncoderSettings(self, value: EncoderSettings):
+        self._encoderSettings = value
+
     @property
     def Resolution(self) -> tuple[int, int]:
         return self._resolution
@@ -93,18 +104,8 @@ class AndroidStreamer(Service):
     @property
     def Device(self) -> AdbDevice:
         if self._device is None:
-            lDevices: dict[str, AdbDevice] = {device.serial.upper(): device for device in adb.device_list()}
-
-            if len(lDevices) == 0:
-                error("No device found!!!")
-
-            lDevice: AdbDevice = lDevices.get(self.Serial.upper(), None)
+            self._device = DeviceInventory().Device(self.Serial)
 
-            if lDevice is None:
-                warning(f"Device {self.Serial} not found. Getting default")
-                lDevice = next(iter(lDevices.values()), None)
-
-            self._device = lDevice
         return self._device
 
     def _initServerConnection(self) -> None:
@@ -154,9 +155,7 @@ class AndroidStreamer(Service):
                 "com.genymobile.scrcpy.Server",
                 "2.4",
                 "log_level=info",
-                f"max_size={self.MaxWidth}",
-                f"max_fps={FPS}",
-                f"video_bit_rate={BITRATE}",
+                *self._encoderSettings.ServerArguments(),
                 "tunnel_forward=true",
                 "send_frame_meta=false",
                 "control=true",
@@ -194,27 +193,34 @@ class AndroidStreamer(Service):
 
     def service(self):
         lCodec = CodecContext.create("h264", "r")
-        while self.isAlive:
-            try:
-                lRAWh264: bytes = self._vsocket.recv(MAX_PACKET_RECIEVE)
-                if lRAWh264 == b"":
-                    self.stop()
-                    raise ConnectionError("Video stream is disconnected")
-
-                lPackets: list[Packet] = lCodec.parse(lRAWh264)
-                for lPacket in lPackets:
-                    lFrames: list[VideoFrame] = lCodec.decode(lPacket)
-                    for lFrame in lFrames:
-                        self._resolution = (lFrame.shape[1], lFrame.shape[0])
-                        self._onFrame(lFrame)
-
-            except (BlockingIOError, InvalidDataError):
-                sleep(0.01)
-                self._onFrame(None)
-                pass
-
-            except Exception as ex:
-                debug("Error in service thread", ex)
+        lSelector: DefaultSelector = DefaultSelector()
+        lSelector.register(self._vsocket, EVENT_READ)
+        try:
+            while self.isAlive:
+                try:
+                    if not lSelector.select(POLL_TIMEOUT):
+                        continue
+
+                    lRAWh264: bytes = self._vsocket.recv(MAX_PACKET_RECIEVE)
+                    if lRAWh264 == b"":
+                        self.stop()
+                        raise ConnectionError("Video stream is disconnected")
+
+                    lPackets: list[Packet] = lCodec.parse(lRAWh264)
+                    for lPacket in lPackets:
+                        lFrames: list[VideoFrame] = lCodec.decode(lPacket)
+                        for lFrame in lFrames:
+                            self._resolution = (lFrame.width, lFrame.height)
+                            self._onFrame(lFrame)
+
+                except (BlockingIOError, InvalidDataError):
+                    continue
+
+                except Exception as ex:
+                    debug("Error in service thread", ex)
+
+        finally:
+            lSelector.close()
 
     @property
     def ImageQueue(self) -> Queue:
@@ -0,0 +1,193 @@
+# ==================================================================================
+from collections.abc import Callable
+from multiprocessing import get_context
+from multiprocessing.context import SpawnProcess
+from multiprocessing.queues import Queue
+from os import cpu_count
+from threading import Lock, Thread
+
+# ==================================================================================
+from av import CodecContext, Packet, VideoFrame
+from av.error import InvalidDataError
+
+# ==================================================================================
+from jAGFx.logger import debug, error, warning
+from jAGFx.singleton import SingletonF
+
+# ==================================================================================
+from ..scrcpy.stream import MediaPacket
+from .frames import SharedFrameRing, SharedStreamFrame
+from .frames.__sharedFrameRing import C_DEFAULT_SHARED_SLOTS
+
+C_DEFAULT_DECODE_PROCESSES: int = max(1, (cpu_count() or 2) - 1)
+C_CMD_OPEN: int = 0
+C_CMD_DATA: int = 1
+C_CMD_CLOSE: int = 2
+C_CMD_PACKET: int = 3
+
+
+def _decodeWorkerMain(commands: Queue, results: Queue) -> None:
+    lDecoders: dict[str, tuple[CodecContext, SharedFrameRing]] = {}
+    lSequences: dict[str, int] = {}
+
+    while (lCommand := commands.get()) is not None:
+        lKind, lKey, *lArgs = lCommand
+        try:
+            if lKind == C_CMD_OPEN:
+                lName, lSlots, lSlotSize = lArgs
+                lDecoders[lKey] = (CodecContext.create("h264", "r"), SharedFrameRing(lSlots, lSlotSize, lName))
+                lSequences[lKey] = 0
+
+            elif lKind == C_CMD_CLOSE:
+                _, lRing = lDecoders.pop(lKey, (None, None))
+                lSequences.pop(lKey, None)
+                if lRing is not None:
+                    lRing.Close()
+
+            elif lKind == C_CMD_DATA and lKey in lDecoders:
+                lCodec, lRing = lDecoders[lKey]
+                lData, lReceivedAt = lArgs
+                lPackets: list[Packet] = lCodec.parse(lData)
+                for lPacket in lPackets:
+                    lFrames: list[VideoFrame] = lCodec.decode(lPacket)
+                    for lFrame in lFrames:
+                        lSequences[lKey] += 1
+                        lRing.Write(lSequences[lKey], lFrame, lReceivedAt)
+                        results.put((lKey, lSequences[lKey]))
+
+            elif lKind == C_CMD_PACKET and lKey in lDecoders:
+                lCodec, lRing = lDecoders[lKey]
+                lMediaPacket: MediaPacket = lArgs[0]
+                lFrames: list[VideoFrame] = lCodec.decode(lMediaPacket.ToPacket())
+                for lFrame in lFrames:
+                    lSequences[lKey] += 1
+                    lRing.Write(lSequences[lKey], lFrame, lMediaPacket.ReceivedAt, lMediaPacket.Pts, lMediaPacket.IsKeyFrame)
+                    results.put((lKey, lSequences[lKey]))
+
+        except InvalidDataError:
+            continue
+
+        except Exception as ex:
+            results.put((lKey, ex))
+
+    for _, lRing in lDecoders.values():
+        lRing.Close()
+
+
+class _DecodeChannel:
+    def __init__(self, worker: int, ring: SharedFrameRing, onFrame: Callable[[SharedStreamFrame], None]) -> None:
+        self.Worker: int = worker
+        self.Ring: SharedFrameRing = ring
+        self.OnFrame: Callable[[SharedStreamFrame], None] = onFrame
+
+
+@SingletonF
+class DecodeProcessPool:
+    """
+    Bounded set of decoder processes shared by all devices.
+
+    Each device opened on the pool gets a ``CodecContext`` inside one worker process and a
+    ``SharedFrameRing`` the worker decodes into. Only the ring sequence number crosses the process
+    boundary, the frame itself is read back from shared memory by the ``SharedStreamFrame``.
+    """
+
+    def __init__(self, processes: int = C_DEFAULT_DECODE_PROCESSES) -> None:
+        self._context = get_context("spawn")
+        self._processCount: int = max(1, processes)
+        self._processes: list[SpawnProcess] = []
+        self._commands: list[Queue] = []
+        self._results: Queue = None
+        self._collector: Thread = None
+
+        self._channels: dict[str, _DecodeChannel] = {}
+        self._lock: Lock = Lock()
+
+    def Open(self, key: str, slotSize: int, onFrame: Callable[[SharedStreamFrame], None], slots: int = C_DEFAULT_SHARED_SLOTS) -> None:
+        with self._lock:
+            self._ensureStarted()
+            if key in self._channels:
+                self._close(key)
+
+            lLoads: list[int] = [0] * self._processCount
+            for lChannel in self._channels.values():
+                lLoads[lChannel.Worker] += 1
+
+            lWorker: int = lLoads.index(min(lLoads))
+            lRing: SharedFrameRing = SharedFrameRing(slots, slotSize)
+            self._channels[key] = _DecodeChannel(lWorker, lRing, onFrame)
+            self._commands[lWorker].put((C_CMD_OPEN, key, lRing.Name, slots, slotSize))
+            debug(f"Decoder for {key} assigned to process {lWorker}")
+
+    def Feed(self, key: str, data: bytes, receivedAt: float = None) -> None:
+        lChannel: _DecodeChannel = self._channels.get(key)
+        if lChannel is not None:
+            self._commands[lChannel.Worker].put((C_CMD_DATA, key, data, receivedAt))
+
+    def FeedPacket(self, key: str, packet: MediaPacket) -> None:
+        lChannel: _DecodeChannel = self._channels.get(key)
+        if lChannel is not None:
+            self._commands[lChannel.Worker].put((C_CMD_PACKET, key, packet))
+
+    def Close(self, key: str) -> None:
+        with self._lock:
+            self._close(key)
+
+    def _close(self, key: str) -> None:
+        lChannel: _DecodeChannel = self._channels.pop(key, None)
+        if lChannel is not None:
+            self._commands[lChannel.Worker].put((C_CMD_CLOSE, key))
+            lChannel.Ring.Close()
+
+    def Shutdown(self) -> None:
+        with self._lock:
+            for lKey in list(self._channels):
+                self._close(lKey)
+
+            for lCommands in self._commands:
+                lCommands.put(None)
+
+            for lProcess in self._processes:
+                lProcess.join(1.0)
+
+            self._processes.clear()
+            self._commands.clear()
+            if self._results is not None:
+                self._results.put(None)
+
+    def _ensureStarted(self) -> None:
+        if self._processes:
+            return
+
+        self._results = self._context.Queue()
+        for lIndex in range(self._processCount):
+            lCommands: Queue = self._context.Queue()
+            lProcess: SpawnProcess = self._context.Process(
+                target=_decodeWorkerMain, args=(lCommands, self._results), daemon=True, name=f"DecodeProcess-{lIndex}"
+            )
+            lProcess.start()
+            self._commands.append(lCommands)
+            self._processes.append(lProcess)
+
+        self._collector = Thread(target=self._collect, args=(self._results,), daemon=True, name="DecodeProcessPool-collector")
+        self._collector.start()
+
+    def _collect(self, results: Queue) -> None:
+        while (lResult := results.get()) is not None:
+            lKey, lSequence = lResult
+            lChannel: _DecodeChannel = self._channels.get(lKey)
+            if lChannel is None:
+                continue
+
+            if isinstance(lSequence, Exception):
+                warning(f"Decoder process failed for {lKey}", lSequence)
+                continue
+
+            try:
+                lChannel.OnFrame(lChannel.Ring.Frame(lSequence))
+
+            except Exception as ex:
+                error(f"Error delivering decoded frame for {lKey}", ex)
+
+    @property
+    def ProcessCount(self) -> int:
+        return self._processCount
@@ -0,0 +1,147 @@
+# ==================================================================================
+import os
+import socket
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import md5
+from threading import Lock
+from time import monotonic, sleep
+
+# ==================================================================================
+from adbutils import AdbDevice, AdbError, Network
+
+# ==================================================================================
+from jAGFx.logger import debug, info
+from jAGFx.singleton import SingletonF
+
+JAR_NAME: str = "scrcpy-server.jar"
+C_LOCAL_SERVER_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), JAR_NAME)
+C_REMOTE_SERVER_PATH: str = f"/data/local/tmp/{JAR_NAME}"
+C_DEFAULT_DEPLOY_WORKERS: int = 4
+C_BACKOFF_INITIAL: float = 0.01
+C_BACKOFF_MAXIMUM: float = 0.4
+C_BACKOFF_FACTOR: float = 2.0
+C_HASH_CHUNK: int = 0x100000
+
+
+@SingletonF
+class DeploymentManager:
+    """
+    Pushes the scrcpy server to devices and opens the tunnel sockets once it listens.
+
+    Pushes run on a bounded pool so a burst of devices is deployed side by side, and a push is
+    skipped when the md5 of the jar on the device already matches the local one. ``ReadyTimes``
+    holds, per serial, the seconds between the deployment request and the stream being ready.
+    ``Invalidate`` bumps the serial's generation, a deployment still running for the old connection
+    then finishes without marking the device verified.
+    """
+
+    def __init__(self, workers: int = C_DEFAULT_DEPLOY_WORKERS, serverPath: str = C_LOCAL_SERVER_PATH) -> None:
+        self._serverPath: str = serverPath
+        self._localHash: str = None
+        self._localHashStamp: float = None
+        self._verified: set[str] = set()
+        self._generations: dict[str, int] = {}
+        self._pending: dict[str, Future] = {}
+        self._requestedAt: dict[str, float] = {}
+        self._readyTimes: dict[str, float] = {}
+        self._lock: Lock = Lock()
+        self._workers: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="Deployment")
+
+    def Deploy(self, device: AdbDevice) -> Future:
+        """Makes sure the server jar is on the device, the future resolves to True when it had to be pushed."""
+        lSerial: str = device.serial
+        with self._lock:
+            self._requestedAt.setdefault(lSerial, monotonic())
+            lFuture: Future = self._pending.get(lSerial)
+            if lFuture is None or lFuture.done():
+                lFuture = self._workers.submit(self._deploy, device, self._generations.get(lSerial, 0))
+                self._pending[lSerial] = lFuture
+
+        return lFuture
+
+    def Connect(self, device: AdbDevice, timeout: float, name: str = "scrcpy") -> socket.socket:
+        lDeadline: float = monotonic() + timeout
+        lDelay: float = C_BACKOFF_INITIAL
+        while True:
+            try:
+                return device.create_connection(Network.LOCAL_ABSTRACT, name)
+
+            except AdbError:
+                lRemaining: float = lDeadline - monotonic()
+                if lRemaining <= 0:
+                    raise ConnectionError(f"Failed to connect scrcpy-server after {timeout} seconds")
+
+                sleep(min(lDelay, lRemaining))
+                lDelay = min(lDelay * C_BACKOFF_FACTOR, C_BACKOFF_MAXIMUM)
+
+    def MarkReady(self, serial: str) -> float:
+        with self._lock:
+            lRequestedAt: float = self._requestedAt.pop(serial, None)
+            if lRequestedAt is None:
+                return None
+
+            lElapsed: float = monotonic() - lRequestedAt
+            self._readyTimes[serial] = lElapsed
+
+        info(f"{serial} ready in {lElapsed:.2f}s")
+        return lElapsed
+
+    def Invalidate(self, serial: str) -> None:
+        with self._lock:
+            self._generations[serial] = self._generations.get(serial, 0) + 1
+            self._verified.discard(serial)
+            self._pending.pop(serial, None)
+            self._requestedAt.pop(serial, None)
+
+    def _deploy(self, device: AdbDevice, generation: int) -> bool:
+        lLocalHash: str = self.LocalHash
+        with self._lock:
+            if device.serial in self._verified:
+                return False
+
+        lRemote: str = device.shell(["md5sum", C_REMOTE_SERVER_PATH], timeout=10)
+        if lRemote.split(" ", 1)[0].lower() == lLocalHash:
+            debug(f"{JAR_NAME} on {device.serial} is up to date")
+            self._markVerified(device.serial, generation)
+            return False
+
+        debug(f"Deploying {JAR_NAME} to {device.serial}...")
+        device.sync.push(self._serverPath, C_REMOTE_SERVER_PATH)
+        self._markVerified(device.serial, generation)
+        return True
+
+    def _markVerified(self, serial: str, generation: int) -> None:
+        with self._lock:
+            if self._generations.get(serial, 0) == generation:
+                self._verified.add(serial)
+
+    # region [PROPERTIES]
+    @property
+    def ServerPath(self) -> str:
+        return self._serverPath
+
+    @property
+    def RemotePath(self) -> str:
+        return C_REMOTE_SERVER_PATH
+
+    @property
+    def LocalHash(self) -> str:
+        lStamp: float = os.path.getmtime(self._serverPath)
+        if self._localHash is None or lStamp != self._localHashStamp:
+            lHash = md5()
+            with open(self._serverPath, "rb") as lFile:
+                while lChunk := lFile.read(C_HASH_CHUNK):
+                    lHash.update(lChunk)
+
+            with self._lock:
+                self._localHash, self._localHashStamp = lHash.hexdigest(), lStamp
+                self._verified.clear()
+
+        return self._localHash
+
+    @property
+    def ReadyTimes(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._readyTimes)
+
+    # endregion
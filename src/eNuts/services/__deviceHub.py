@@ -0,0 +1,170 @@
+# ==================================================================================
+import socket
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from queue import Empty, SimpleQueue
+from selectors import EVENT_READ, DefaultSelector
+from threading import Lock, Thread, current_thread
+from typing import Any, Hashable
+
+# ==================================================================================
+from jAGFx.logger import debug, error
+from jAGFx.singleton import SingletonF
+
+C_DEFAULT_DECODE_WORKERS: int = max(2, (cpu_count() or 4) // 2)
+C_SELECT_TIMEOUT: float = 0.5
+C_LANE_BATCH: int = 32
+
+
+@SingletonF
+class DeviceHub:
+    """
+    Single I/O loop shared by every connected device.
+
+    One selector thread waits on all registered sockets and hands readable ones to their callback,
+    heavy work is pushed to a bounded pool through ``Submit``. Work submitted under the same key
+    runs in submission order and never concurrently, so per-device decoders need no locking.
+    """
+
+    def __init__(self, decodeWorkers: int = C_DEFAULT_DECODE_WORKERS) -> None:
+        self._selector: DefaultSelector = DefaultSelector()
+        self._pending: SimpleQueue = SimpleQueue()
+        self._wakeReader, self._wakeWriter = socket.socketpair()
+        self._wakeReader.setblocking(False)
+        self._wakeWriter.setblocking(False)
+        self._selector.register(self._wakeReader, EVENT_READ, None)
+
+        self._decodeWorkers: int = max(1, decodeWorkers)
+        self._workers: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self._decodeWorkers, thread_name_prefix="DeviceHub-decode")
+        self._lanes: dict[Hashable, deque] = {}
+        self._lanesLock: Lock = Lock()
+
+        self._threadLock: Lock = Lock()
+        self._thread: Thread = None
+
+    # region [REGISTRATION]
+    def Register(self, sock: socket.socket, onReadable: Callable[[socket.socket], None]) -> None:
+        self._ensureRunning()
+        self._schedule(self._register, sock, onReadable)
+
+    def Unregister(self, sock: socket.socket) -> None:
+        if current_thread() is self._thread:
+            self._unregister(sock)
+            return
+
+        self._schedule(self._unregister, sock)
+
+    def _register(self, sock: socket.socket, onReadable: Callable[[socket.socket], None]) -> None:
+        sock.setblocking(False)
+        self._selector.register(sock, EVENT_READ, onReadable)
+
+    def _unregister(self, sock: socket.socket) -> None:
+        try:
+            self._selector.unregister(sock)
+
+        except (KeyError, ValueError):
+            pass
+
+    def _schedule(self, func: Callable[..., Any], *args) -> None:
+        self._pending.put((func, args))
+        try:
+            self._wakeWriter.send(b"\x00")
+
+        except BlockingIOError:
+            pass
+
+    # endregion
+
+    # region [WORK LANES]
+    def Submit(self, key: Hashable, func: Callable[..., Any], *args) -> None:
+        with self._lanesLock:
+            lLane: deque = self._lanes.get(key)
+            if lLane is not None:
+                lLane.append((func, args))
+                return
+
+            self._lanes[key] = deque([(func, args)])
+
+        self._workers.submit(self._drainLane, key)
+
+    def _drainLane(self, key: Hashable) -> None:
+        for _ in range(C_LANE_BATCH):
+            with self._lanesLock:
+                lLane: deque = self._lanes[key]
+                if not lLane:
+                    self._lanes.pop(key)
+                    return
+
+                lFunc, lArgs = lLane.popleft()
+
+            try:
+                lFunc(*lArgs)
+
+            except Exception as ex:
+                error(f"Error in device hub work for {key}", ex)
+
+        self._workers.submit(self._drainLane, key)
+
+    # endregion
+
+    # region [I/O LOOP]
+    def _ensureRunning(self) -> None:
+        with self._threadLock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, daemon=True, name="DeviceHub-io")
+                self._thread.start()
+                debug("Device hub I/O loop started")
+
+    def _run(self) -> None:
+        while True:
+            try:
+                for lKey, _ in self._selector.select(C_SELECT_TIMEOUT):
+                    if lKey.fileobj is self._wakeReader:
+                        self._drainWakeups()
+                        continue
+
+                    if self._selector.get_map().get(lKey.fd) is not lKey:
+                        continue
+
+                    try:
+                        lKey.data(lKey.fileobj)
+
+                    except Exception as ex:
+                        error("Error in device hub read callback", ex)
+                        self._unregister(lKey.fileobj)
+
+            except Exception as ex:
+                error("Error in device hub I/O loop", ex)
+
+    def _drainWakeups(self) -> None:
+        try:
+            while self._wakeReader.recv(4096):
+                pass
+
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                lFunc, lArgs = self._pending.get_nowait()
+
+            except Empty:
+                return
+
+            try:
+                lFunc(*lArgs)
+
+            except Exception as ex:
+                error("Error applying device hub registration", ex)
+
+    # endregion
+
+    @property
+    def RegisteredCount(self) -> int:
+        return len(self._selector.get_map()) - 1
+
+    @property
+    def WorkerCount(self) -> int:
+        return self._decodeWorkers
@@ -0,0 +1,222 @@
+# ==================================================================================
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+
+# ==================================================================================
+from adbutils import AdbClient, AdbDevice, adb
+
+# ==================================================================================
+from jAGFx.logger import debug, error, warning
+from jAGFx.singleton import SingletonF
+
+C_DEFAULT_INVENTORY_WORKERS: int = 4
+C_SHELL_TIMEOUT: float = 10.0
+C_RETRY_AFTER: float = 30.0
+C_SECTION: str = "--eNuts-section--"
+C_CODEC_FILES: str = "/vendor/etc/media_codecs*.xml /odm/etc/media_codecs*.xml /system/etc/media_codecs*.xml"
+C_INVENTORY_SCRIPT: str = (
+    f"getprop; echo {C_SECTION}; wm size; echo {C_SECTION}; wm density; echo {C_SECTION}; "
+    f"cat {C_CODEC_FILES} 2>/dev/null | "
+    "awk '/<Encoders>/{e=1} /<\\/Encoders>/{e=0} e && /<MediaCodec /'"
+)
+
+C_PROPERTY_PATTERN: re.Pattern = re.compile(r"^\[(.+?)\]: \[(.*)\]$", re.MULTILINE)
+C_SIZE_PATTERN: re.Pattern = re.compile(r"(Physical|Override) size: (\d+)x(\d+)")
+C_DENSITY_PATTERN: re.Pattern = re.compile(r"(Physical|Override) density: (\d+)")
+C_CODEC_PATTERN: re.Pattern = re.compile(r'name="([^"]+)"\s+type="(video/[^"]+)"')
+
+
+@dataclass
+class DeviceProfile:
+    Serial: str
+    Properties: dict[str, str] = field(default_factory=dict)
+    PhysicalSize: tuple[int, int] = None
+    OverrideSize: tuple[int, int] = None
+    Density: int = None
+    Encoders: dict[str, list[str]] = field(default_factory=dict)
+    FetchedAt: float = 0.0
+
+    @property
+    def HardwareSerial(self) -> str:
+        return self.Properties.get("ro.serialno") or self.Properties.get("ro.boot.serialno")
+
+    @property
+    def Model(self) -> str:
+        return self.Properties.get("ro.product.model")
+
+    @property
+    def Manufacturer(self) -> str:
+        return self.Properties.get("ro.product.manufacturer")
+
+    @property
+    def Release(self) -> str:
+        return self.Properties.get("ro.build.version.release")
+
+    @property
+    def SdkLevel(self) -> int:
+        lValue: str = self.Properties.get("ro.build.version.sdk", "")
+        return int(lValue) if lValue.isdigit() else None
+
+    @property
+    def Abi(self) -> str:
+        return self.Properties.get("ro.product.cpu.abi")
+
+    @property
+    def DisplaySize(self) -> tuple[int, int]:
+        """Size the screen is rendered at, the override of ``wm size`` when one is set."""
+        return self.OverrideSize or self.PhysicalSize
+
+    def EncodersFor(self, mimeType: str = "video/avc") -> list[str]:
+        return self.Encoders.get(mimeType, [])
+
+
+@SingletonF
+class DeviceInventory:
+    """
+    Properties and capabilities of the connected devices, fetched once per connection.
+
+    A profile is gathered with a single ``shell`` round-trip running ``getprop``, ``wm size``,
+    ``wm density`` and a scan of the media codec lists, and kept until ``Invalidate`` is called for
+    the serial, which the device monitor does when the device goes away. Concurrent requests for the
+    same serial share one fetch, and a failed fetch is not retried by ``Get`` for ``C_RETRY_AFTER``
+    seconds. ``Device`` hands out the ``AdbDevice`` of a serial without listing
+    the devices again.
+    """
+
+    def __init__(self, client: AdbClient = None, workers: int = C_DEFAULT_INVENTORY_WORKERS) -> None:
+        self._client: AdbClient = client or adb
+        self._devices: dict[str, AdbDevice] = {}
+        self._profiles: dict[str, DeviceProfile] = {}
+        self._pending: dict[str, Future] = {}
+        self._failures: dict[str, float] = {}
+        self._lock: Lock = Lock()
+        self._workers: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="Inventory")
+
+    def Register(self, device: AdbDevice) -> Future:
+        """Remembers the device and starts fetching its profile in the background."""
+        with self._lock:
+            self._devices[device.serial.upper()] = device
+            self._failures.pop(device.serial.upper(), None)
+
+        return self.Fetch(device.serial)
+
+    def Invalidate(self, serial: str) -> None:
+        lKey: str = serial.upper()
+        with self._lock:
+            self._devices.pop(lKey, None)
+            self._profiles.pop(lKey, None)
+            self._pending.pop(lKey, None)
+            self._failures.pop(lKey, None)
+
+    def Fetch(self, serial: str) -> Future:
+        lKey: str = serial.upper()
+        with self._lock:
+            lFuture: Future = self._pending.get(lKey)
+            if lFuture is None or (lFuture.done() and lFuture.exception() is not None):
+                lFuture = self._workers.submit(self._fetch, lKey)
+                self._pending[lKey] = lFuture
+
+        return lFuture
+
+    def Get(self, serial: str, timeout: float = C_SHELL_TIMEOUT) -> DeviceProfile:
+        """Cached profile of the device, fetched on first use. None when the device can not be reached."""
+        lKey: str = serial.upper()
+        lProfile: DeviceProfile = self._profiles.get(lKey)
+        if lProfile is not None:
+            return lProfile
+
+        lFailedAt: float = self._failures.get(lKey)
+        if lFailedAt is not None and monotonic() - lFailedAt < C_RETRY_AFTER:
+            return None
+
+        try:
+            return self.Fetch(lKey).result(timeout)
+
+        except Exception as ex:
+            warning(f"Failed to read the profile of {serial}: {ex}")
+            with self._lock:
+                self._pending.pop(lKey, None)
+                self._failures[lKey] = monotonic()
+
+            return None
+
+    def Peek(self, serial: str) -> DeviceProfile:
+        return self._profiles.get(serial.upper())
+
+    def Device(self, serial: str) -> AdbDevice:
+        lKey: str = serial.upper() if serial else ""
+        lDevice: AdbDevice = self._devices.get(lKey)
+        if lDevice is not None:
+            return lDevice
+
+        lDevices: dict[str, AdbDevice] = {device.serial.upper(): device for device in self._client.device_list()}
+        if len(lDevices) == 0:
+            error("No ADB Device found!")
+            return None
+
+        with self._lock:
+            for lSerial, lListed in lDevices.items():
+                self._devices.setdefault(lSerial, lListed)
+
+        lDevice = lDevices.get(lKey)
+        if lDevice is None:
+            warning(f"Device {serial} not found. Returning default")
+            lDevice = next(iter(lDevices.values()), None)
+
+        return lDevice
+
+    def _fetch(self, serial: str) -> DeviceProfile:
+        lStart: float = monotonic()
+        lDevice: AdbDevice = self.Device(serial)
+        # Device falls back to another device when the serial is gone, its profile must not be stored under this one
+        if lDevice is None or lDevice.serial.upper() != serial:
+            raise ConnectionError(f"Device {serial} is not connected")
+
+        lOutput: str = lDevice.shell(C_INVENTORY_SCRIPT, timeout=C_SHELL_TIMEOUT)
+        lProfile: DeviceProfile = self._parse(serial, lOutput)
+
+        with self._lock:
+            # an invalidation while the shell ran means the answer belongs to the old connection
+            if self._pending.get(serial) is not None:
+                self._profiles[serial] = lProfile
+
+        debug(f"Profiled {serial} in {(monotonic() - lStart) * 1000.0:.0f}ms")
+        return lProfile
+
+    @staticmethod
+    def _parse(serial: str, output: str) -> DeviceProfile:
+        lSections: list[str] = output.split(C_SECTION) + ["", "", "", ""]
+        lProfile: DeviceProfile = DeviceProfile(serial, dict(C_PROPERTY_PATTERN.findall(lSections[0])), FetchedAt=monotonic())
+
+        for lKind, lWidth, lHeight in C_SIZE_PATTERN.findall(lSections[1]):
+            lSize: tuple[int, int] = (int(lWidth), int(lHeight))
+            if lKind == "Physical":
+                lProfile.PhysicalSize = lSize
+            else:
+                lProfile.OverrideSize = lSize
+
+        lDensities: dict[str, str] = dict(C_DENSITY_PATTERN.findall(lSections[2]))
+        lDensity: str = lDensities.get("Override") or lDensities.get("Physical")
+        lProfile.Density = int(lDensity) if lDensity else None
+
+        for lName, lType in C_CODEC_PATTERN.findall(lSections[3]):
+            lNames: list[str] = lProfile.Encoders.setdefault(lType, [])
+            if lName not in lNames:
+                lNames.append(lName)
+
+        return lProfile
+
+    # region [PROPERTIES]
+    @property
+    def Client(self) -> AdbClient:
+        return self._client
+
+    @property
+    def Profiles(self) -> dict[str, DeviceProfile]:
+        with self._lock:
+            return dict(self._profiles)
+
+    # endregion
@@ -1,4 +1,10 @@
 from .__androidStreamer import AndroidStreamer
+from .__decodeProcessPool import DecodeProcessPool
+from .__deploymentManager import DeploymentManager
+from .__deviceInventory import DeviceInventory, DeviceProfile
+from .__deviceHub import DeviceHub
 from .__scrcpyStreamService import SCRCPYStreamService
+from .__sessionManager import SessionManager
 from .__streamService import StreamService
 from .__videoPlaybackService import VideoStreamingService, eMediaStatus, ePlaybackState
+from .__warmMode import eWarmMode
@@ -1,33 +1,63 @@
-import os
 import socket
 import struct
-from threading import Lock
-from time import sleep
+from queue import Empty, SimpleQueue
+from selectors import EVENT_READ, DefaultSelector
+from threading import Lock, Thread, current_thread
+from time import monotonic
 
-from adbutils import AdbConnection, AdbDevice, AdbError, Network, adb, device
+from adbutils import AdbConnection, AdbDevice, device
 from av import CodecContext, Packet, VideoFrame
 from av.error import InvalidDataError
-from numpy import ndarray
-from PySide6.QtCore import QSize
+from PySide6.QtCore import Signal
 from PySide6.QtWidgets import QApplication
 
 from jAGFx.logger import debug, error, warning
 
 from ..scrcpy.controls import BaseAppControl
+from ..scrcpy.messages import DeviceMessageReader
+from ..scrcpy.stream import C_CODEC_HEADER, FramePacketReader, MediaPacket
+from ..scrcpy.writer import ControlWriter
+from ..utilities import THREADPOOL
+from .__decodeProcessPool import DecodeProcessPool
+from .__deploymentManager import DeploymentManager
+from .__deviceHub import DeviceHub
+from .__deviceInventory import DeviceInventory, DeviceProfile
 from .__streamService import StreamService
+from .frames import FrameRing, SharedFrameRing, StreamFrame, eFrameFormat
+from .policies import EncoderSettings, StreamPolicy, StreamStatistics
+from .recording import PacketSink, StreamRecorder
 
-JAR_NAME: str = "scrcpy-server.jar"
-FPS: int = 120
-BITRATE: int = 1000000000
 MAX_PACKET_RECIEVE: int = 0x10000
+C_STAGE_POLL_TIMEOUT: float = 0.1
+C_STAGE_JOIN_TIMEOUT: float = 0.5
+C_DEVICE_NAME_LENGTH: int = 64
+C_RESTART_TIMEOUT: float = 5.0
+C_SKIP_NON_KEY: str = "NONKEY"
+C_SKIP_NONE: str = "DEFAULT"
 
 
 class SCRCPYStreamService(StreamService):
-    def __init__(self, adbSerial: str = None, maxWidth: int = 800, connectionTimeout: int = 3000) -> None:
-        super().__init__(name=adbSerial, maxWidth=maxWidth)
+    OnDeviceMessage: Signal = Signal(object)
+
+    def __init__(
+        self,
+        adbSerial: str = None,
+        maxWidth: int = 800,
+        connectionTimeout: int = 3000,
+        frameFormat: eFrameFormat = eFrameFormat.BGR,
+        ringSize: int = 3,
+        lateThreshold: float = 0.1,
+        hub: DeviceHub = None,
+        decoderPool: DecodeProcessPool = None,
+        frameMeta: bool = False,
+        encoderSettings: EncoderSettings = None,
+        policy: StreamPolicy = None,
+    ) -> None:
+        super().__init__(adbSerial, maxWidth, frameFormat, encoderSettings, policy)
         self._adbserial: str = adbSerial
 
         self._device: AdbDevice = None
+        self._serial: str = None
 
         self._serverStream: AdbConnection = None
         self._vsocket: socket.socket = None
@@ -35,22 +65,26 @@ class SCRCPYStreamService(StreamService):
         self._csocketLock: Lock = Lock()
         self._codec: CodecContext = None
 
+        self._ring: FrameRing = FrameRing(ringSize, lateThreshold)
+        self._packetQueue: SimpleQueue = SimpleQueue()
+        self._receiveThread: Thread = None
+        self._decodeThread: Thread = None
+        self._hub: DeviceHub = hub
+        self._decoderPool: DecodeProcessPool = decoderPool
+        self._frameMeta: bool = frameMeta
+        self._packetReader: FramePacketReader = FramePacketReader()
+        self._awaitKeyFrame: bool = False
+        self._messageReader: DeviceMessageReader = DeviceMessageReader(self.OnDeviceMessage.emit)
+        self._sinks: tuple[PacketSink, ...] = ()
+        self._sinksLock: Lock = Lock()
+        self._recorder: StreamRecorder = None
+
         self._connectionTimeout: int = connectionTimeout
         self._control: BaseAppControl = BaseAppControl(self)
 
     def _initServerConnection(self) -> None:
         debug("Connecting to scrcpy server...")
-        for _ in range(self._connectionTimeout // 100):
-            try:
-                self._vsocket = self.Device.create_connection(Network.LOCAL_ABSTRACT, "scrcpy")
-                break
-
-            except AdbError:
-                sleep(0.1)
-                pass
-
-        else:
-            raise ConnectionError(f"Failed to connect scrcpy-server after {self._connectionTimeout / 1000} seconds")
+        self._vsocket = DeploymentManager().Connect(self.Device, self._connectionTimeout / 1000)
 
         debug("Connected to scrcpy server, waiting for handshake...")
 
@@ -61,31 +95,35 @@ class SCRCPYStreamService(StreamService):
         debug("Handshake success. Received dummy byte.")
 
         debug("Creating control socket...")
-        self._csocket = self.Device.create_connection(Network.LOCAL_ABSTRACT, "scrcpy")
+        self._csocket = DeploymentManager().Connect(self.Device, self._connectionTimeout / 1000)
 
-        self._deviceName = self._vsocket.recv(64).decode("utf-8").rstrip("\x00")
+        self._deviceName = self._recvExactly(C_DEVICE_NAME_LENGTH).decode("utf-8").rstrip("\x00")
         if not len(self._deviceName):
             raise ConnectionError("Did not receive Device Name!")
 
         debug(f"Control established to device: {self._deviceName}")
 
-        lRes = self._vsocket.recv(4)
-        self._size = struct.unpack(">HH", lRes)
+        lCodecId, lWidth, lHeight = C_CODEC_HEADER.unpack(self._recvExactly(C_CODEC_HEADER.size))
+        self._size = (lWidth, lHeight)
+        debug(f"Video stream {struct.pack('>I', lCodecId).decode('ascii', 'replace')} {lWidth}x{lHeight}")
         self._vsocket.setblocking(False)
 
-    def _deployServer(self) -> None:
-        lServerPath: str = os.path.join(
-            "\\WS\\nutsLAB\\eNuts\\src\\eNuts" ,
-            JAR_NAME,
-        )
+    def _recvExactly(self, size: int) -> bytes:
+        lData: bytearray = bytearray()
+        while len(lData) < size:
+            lChunk: bytes = self._vsocket.recv(size - len(lData))
+            if not lChunk:
+                raise ConnectionError("Video stream closed during handshake")
 
-        if not os.path.exists(lServerPath):
-            debug(f"{JAR_NAME} JAR file does not exist - {lServerPath}")
+            lData += lChunk
 
-        lRemotePath: str = f"/data/local/tmp/{JAR_NAME}"
+        return bytes(lData)
+
+    def _deployServer(self) -> None:
+        lDeployment: DeploymentManager = DeploymentManager()
+        lRemotePath: str = lDeployment.RemotePath
         try:
-            debug(f"Deploying {JAR_NAME} to device...")
-            self.Device.sync.push(lServerPath, lRemotePath)
+            lDeployment.Deploy(self.Device).result()
             lCommands: list[str] = [
                 f"CLASSPATH={lRemotePath}",
                 "app_process",
@@ -93,11 +131,9 @@ class SCRCPYStreamService(StreamService):
                 "com.genymobile.scrcpy.Server",
                 "2.4",
                 "log_level=info",
-                f"max_size={self.MaximumWidth}",
-                f"max_fps={FPS}",
-                f"video_bit_rate={BITRATE}",
+                *self.EncoderSettings.ServerArguments(),
                 "tunnel_forward=true",
-                "send_frame_meta=false",
+                f"send_frame_meta={str(self._frameMeta).lower()}",
                 "control=true",
                 "audio=false",
                 "show_touches=false",
@@ -136,6 +172,42 @@ class SCRCPYStreamService(StreamService):
     def Control(self, value: BaseAppControl):
         self._control = value
 
+    @property
+    def Ring(self) -> FrameRing:
+        return self._ring
+
+    @property
+    def DroppedFrames(self) -> int:
+        return self._ring.Dropped
+
+    @property
+    def LateFrames(self) -> int:
+        return self._ring.Late
+
+    @property
+    def Sinks(self) -> tuple[PacketSink, ...]:
+        return self._sinks
+
+    @property
+    def Recorder(self) -> StreamRecorder:
+        return self._recorder
+
+    @property
+    def MessageReader(self) -> DeviceMessageReader:
+        return self._messageReader
+
+    @property
+    def FrameMeta(self) -> bool:
+        return self._frameMeta
+
+    @property
+    def Hub(self) -> DeviceHub:
+        return self._hub
+
+    @property
+    def DecoderPool(self) -> DecodeProcessPool:
+        return self._decoderPool
+
     @property
     def SizingRatio(self) -> float:
         return self.MaximumWidth / max(self.size)
@@ -147,19 +219,7 @@ class SCRCPYStreamService(StreamService):
     @property
     def Device(self) -> AdbDevice:
         if self._device is None:
-            lDevices: dict[str, AdbDevice] = {device.serial.upper(): device for device in adb.device_list()}
-
-            if len(lDevices) == 0:
-                error("No ADB Device found!")
-                return None
-
-            lDevice: AdbDevice = lDevices.get(self.ADBSerial.upper(), None)
-
-            if lDevice is None:
-                warning(f"Device {self.ADBSerial} not found. Returning default")
-                lDevice = next(iter(lDevices.values()), None)
-
-            self._device = lDevice
+            self._device = DeviceInventory().Device(self.ADBSerial)
 
         return self._device
 
@@ -169,31 +229,84 @@ class SCRCPYStreamService(StreamService):
 
     @property
     def Serial(self) -> str:
-        if not hasattr(self, "_serial"):
-            self._serial: str = self.Device.shell(["getprop", "ro.serialno"])
-
         if self._serial is None:
-            self._serial = self._adbserial
+            lProfile: DeviceProfile = DeviceInventory().Get(self.ADBSerial)
+            self._serial = (lProfile.HardwareSerial if lProfile is not None else None) or self._adbserial
 
         return self._serial
 
     # endregion [PROPERTIES]
 
+    def start(self, *param):
+        if self._hub is None:
+            super().start(*param)
+            return
+
+        with self._terminatedLock:
+            if not self._terminated:
+                return
+
+            self._terminated = False
+
+        THREADPOOL.submit(self._initService)
+
+    def Reconfigure(self, settings: EncoderSettings):
+        debug(f"Reconfiguring {self.ADBSerial} with {settings}")
+        self._encoderSettings = settings
+        if self.isAlive:
+            self.Restart()
+
+    def Restart(self):
+        lThread: Thread = self._thread
+        self.stop()
+        if self._hub is None and lThread is not None and lThread is not current_thread():
+            lThread.join(C_RESTART_TIMEOUT)
+
+        self.start()
+
+    def stop(self):
+        lWasAlive: bool = self.isAlive
+        super().stop()
+        if self._hub is not None and lWasAlive:
+            self._cleanUp()
+
     def _cleanUp(self):
+        self.Terminate()
+        for lThread in (self._receiveThread, self._decodeThread):
+            if lThread is not None and lThread.is_alive():
+                lThread.join(C_STAGE_JOIN_TIMEOUT)
+
+        self._receiveThread = None
+        self._decodeThread = None
+
         if self._serverStream is not None:
             self._serverStream.close()
             self._serverStream = None
 
         if self._vsocket is not None:
+            if self._hub is not None:
+                self._hub.Unregister(self._vsocket)
+
             self._vsocket.close()
             self._vsocket = None
 
         with self._csocketLock:
             if self._csocket is not None:
+                if self._hub is not None:
+                    self._hub.Unregister(self._csocket)
+
+                ControlWriter().Discard(self._csocket)
                 self._csocket.close()
                 self._csocket = None
 
+        self._messageReader.Close()
+
+        if self._decoderPool is not None:
+            self._decoderPool.Close(self.ADBSerial)
+
         self._codec = None
+        self._lastFrame = None
+        self._ring.Clear()
         self.OnTerminated.emit()
 
     def _initService(self):
@@ -202,32 +315,253 @@ class SCRCPYStreamService(StreamService):
             self._deployServer()
             self._initServerConnection()
             self._codec: CodecContext = CodecContext.create("h264", "r")
-            self._lastFrame: ndarray = None
+            self._codec.skip_frame = C_SKIP_NON_KEY if self.SkipsNonKeyFrames else C_SKIP_NONE
+            self._awaitKeyFrame = False
+            self._packetQueue = SimpleQueue()
+            self._packetReader.Reset()
+            self._messageReader.Reset()
+            self._ring.Clear()
+            self.Latency.Reset()
+
+            if self._decoderPool is not None:
+                lSide: int = max(self._size)
+                self._decoderPool.Open(self.ADBSerial, SharedFrameRing.SlotSizeFor(lSide, lSide), self._onDecoded)
+
+            if self._hub is not None:
+                self._hub.Register(self._vsocket, self._onReadable)
+                if self._csocket is not None:
+                    self._hub.Register(self._csocket, self._onControlReadable)
+
+                DeploymentManager().MarkReady(self.ADBSerial)
+                self.OnStarted.emit(current_thread())
+                return
+
+            self._receiveThread = Thread(target=self._receiveLoop, daemon=True, name=f"{self.ADBSerial}-receive")
+            self._decodeThread = Thread(target=self._decodeLoop, daemon=True, name=f"{self.ADBSerial}-decode")
+            self._receiveThread.start()
+            self._decodeThread.start()
+
+            DeploymentManager().MarkReady(self.ADBSerial)
             self.OnStarted.emit(self._thread)
-            self._cntr = 0
 
         except Exception as ex:
             warning("Error occurred while starting scrcpy service", ex)
+            self.Terminate()
+            self.OnError.emit(ex)
+            if self._hub is not None:
+                self._cleanUp()
+
+    # region [RECORDING]
+    def AddSink(self, sink: PacketSink):
+        if not self._frameMeta:
+            raise ValueError("Packet sinks need the stream to be started with frameMeta")
+
+        with self._sinksLock:
+            if sink not in self._sinks:
+                self._sinks = self._sinks + (sink,)
+
+    def RemoveSink(self, sink: PacketSink):
+        with self._sinksLock:
+            self._sinks = tuple(lSink for lSink in self._sinks if lSink is not sink)
+
+    def StartRecording(self, path: str, containerFormat: str = None) -> StreamRecorder:
+        """Records the incoming stream to ``path`` without re-encoding, until ``StopRecording``."""
+        if self._recorder is not None:
+            raise RuntimeError(f"{self.ADBSerial} is already recording to {self._recorder.Path}")
+
+        lRecorder: StreamRecorder = StreamRecorder(path, containerFormat)
+        self.AddSink(lRecorder)
+        self._recorder = lRecorder
+        return lRecorder
+
+    def StopRecording(self, timeout: float = None) -> StreamRecorder:
+        lRecorder: StreamRecorder = self._recorder
+        if lRecorder is None:
+            return None
+
+        self._recorder = None
+        self.RemoveSink(lRecorder)
+        lRecorder.Close(timeout)
+        return lRecorder
+
+    # endregion
+
+    def _statistics(self) -> StreamStatistics:
+        lStatistics: StreamStatistics = super()._statistics()
+        lStatistics.RingDepth = self._ring.Depth
+        lStatistics.RingCapacity = self._ring.Capacity
+        lStatistics.Dropped = self._ring.Dropped
+        return lStatistics
+
+    def _onDemandChanged(self, keyFramesOnly: bool):
+        lCodec: CodecContext = self._codec
+        if lCodec is not None:
+            lCodec.skip_frame = C_SKIP_NON_KEY if keyFramesOnly else C_SKIP_NONE
+
+        # the frames skipped so far are missing references, hold the output until the next key frame
+        self._awaitKeyFrame = not keyFramesOnly
+
+    def _queueFrame(self, frame: StreamFrame):
+        if self._awaitKeyFrame:
+            if not frame.IsKeyFrame:
+                return
+
+            self._awaitKeyFrame = False
+
+        self._ring.Put(frame)
+
+    def _onDecoded(self, frame: StreamFrame):
+        if self.IsTerminated():
+            return
+
+        self._ring.Put(frame)
+        if self._hub is not None:
+            self._hub.Submit(self, self._drainRing)
+
+    def _decode(self, data: bytes, receivedAt: float):
+        if self._frameMeta:
+            lSinks: tuple[PacketSink, ...] = self._sinks
+            for lMediaPacket in self._packetReader.Feed(data, receivedAt):
+                for lSink in lSinks:
+                    lSink.Write(lMediaPacket, self._packetReader.Config, self._size)
+
+                self._decodePacket(lMediaPacket)
+
+            return
+
+        if self._decoderPool is not None:
+            self._decoderPool.Feed(self.ADBSerial, data, receivedAt)
+            return
+
+        lCodec: CodecContext = self._codec
+        if lCodec is None:
+            return
+
+        lPackets: list[Packet] = lCodec.parse(data)
+        for lPacket in lPackets:
+            lFrames: list[VideoFrame] = lCodec.decode(lPacket)
+            for lFrame in lFrames:
+                self._queueFrame(StreamFrame(lFrame, receivedAt))
+
+    def _decodePacket(self, packet: MediaPacket):
+        if self._decoderPool is not None:
+            self._decoderPool.FeedPacket(self.ADBSerial, packet)
+            return
+
+        lCodec: CodecContext = self._codec
+        if lCodec is None:
+            return
+
+        lFrames: list[VideoFrame] = lCodec.decode(packet.ToPacket())
+        for lFrame in lFrames:
+            self._queueFrame(StreamFrame(lFrame, packet.ReceivedAt, packet.Pts, packet.IsKeyFrame))
+
+    # region [HUB MODE]
+    def _onReadable(self, sock: socket.socket):
+        try:
+            lRAWh264: bytes = sock.recv(MAX_PACKET_RECIEVE)
+
+        except BlockingIOError:
+            return
+
+        except OSError as ex:
+            lRAWh264 = b""
+            if not self.IsTerminated():
+                error("Error reading video stream", ex)
+
+        if lRAWh264 == b"":
+            self._hub.Unregister(sock)
+            if not self.IsTerminated():
+                self.OnError.emit(ConnectionError("Video stream is disconnected"))
+                THREADPOOL.submit(self.stop)
+
+            return
+
+        self._hub.Submit(self, self._decodeAndPublish, lRAWh264, monotonic())
+
+    def _onControlReadable(self, sock: socket.socket):
+        if not self._messageReader.OnReadable(sock):
+            self._hub.Unregister(sock)
+
+    def _decodeAndPublish(self, data: bytes, receivedAt: float):
+        if self.IsTerminated():
+            return
+
+        try:
+            self._decode(data, receivedAt)
+
+        except InvalidDataError as ex:
+            debug("Dropping undecodable h264 data", ex)
+
+        self._drainRing()
+
+    def _drainRing(self):
+        while (lStreamFrame := self._ring.Get(0)) is not None:
+            self._publish(lStreamFrame)
+
+    # endregion
+
+    # region [THREADED MODE]
+    def _receiveLoop(self):
+        lSelector: DefaultSelector = DefaultSelector()
+        try:
+            lSelector.register(self._vsocket, EVENT_READ)
+            if self._csocket is not None:
+                self._csocket.setblocking(False)
+                lSelector.register(self._csocket, EVENT_READ, self._messageReader)
+
+            while not self.IsTerminated():
+                for lKey, _ in lSelector.select(C_STAGE_POLL_TIMEOUT):
+                    if lKey.data is not None:
+                        if not lKey.data.OnReadable(lKey.fileobj):
+                            lSelector.unregister(lKey.fileobj)
+
+                        continue
+
+                    try:
+                        lRAWh264: bytes = self._vsocket.recv(MAX_PACKET_RECIEVE)
+
+                    except BlockingIOError:
+                        continue
+
+                    if lRAWh264 == b"":
+                        raise ConnectionError("Video stream is disconnected")
+
+                    self._packetQueue.put((lRAWh264, monotonic()))
+
+        except Exception as ex:
+            if not self.IsTerminated():
+                error("Error in receive thread", ex)
+                self.OnError.emit(ex)
+
+        finally:
+            lSelector.close()
+            self.Terminate()
+
+    def _decodeLoop(self):
+        while not self.IsTerminated():
+            try:
+                lRAWh264, lReceivedAt = self._packetQueue.get(timeout=C_STAGE_POLL_TIMEOUT)
+
+            except Empty:
+                continue
+
+            try:
+                self._decode(lRAWh264, lReceivedAt)
+
+            except InvalidDataError as ex:
+                debug("Dropping undecodable h264 data", ex)
+
+            except Exception as ex:
+                error("Error in decode thread", ex)
 
     def service(self):
         try:
-            lRAWh264: bytes = self._vsocket.recv(MAX_PACKET_RECIEVE)
-            if lRAWh264 == b"":
-                self.stop()
-                raise ConnectionError("Video stream is disconnected")
-
-            lPackets: list[Packet] = self._codec.parse(lRAWh264)
-            for lPacket in lPackets:
-                lFrames: list[VideoFrame] = self._codec.decode(lPacket)
-                for lFrame in lFrames:
-                    lArrFrame: ndarray = lFrame.to_ndarray(format="bgr24")
-                    self.OnFrame.emit(lArrFrame)
-                    self._lastFrame = lArrFrame
-                    self._setSize(QSize(lArrFrame.shape[1], lArrFrame.shape[0]))
-
-        except (BlockingIOError, InvalidDataError):
-            sleep(0.00001)
-            self.OnFrame.emit(self._lastFrame)
+            lStreamFrame: StreamFrame = self._ring.Get(C_STAGE_POLL_TIMEOUT)
+            if lStreamFrame is not None:
+                self._publish(lStreamFrame)
 
         except Exception as ex:
             error("Error in service thread", ex)
+
+    # endregion
@@ -0,0 +1,125 @@
+# ==================================================================================
+from collections import OrderedDict
+from threading import RLock
+
+# ==================================================================================
+from jAGFx.logger import debug
+from jAGFx.singleton import SingletonF
+
+# ==================================================================================
+from .__streamService import StreamService
+from .__warmMode import eWarmMode
+
+C_DEFAULT_MAX_WARM: int = 16
+
+
+@SingletonF
+class SessionManager:
+    """
+    Keeps stream sessions alive while nobody is looking at them.
+
+    A hidden session stays connected in its ``eWarmMode``: ``DECODE`` keeps decoding without
+    converting, so the last frame is always current, ``KEYFRAMES`` only decodes key frames and
+    ``STOPPED`` disconnects. ``Activate`` republishes the last decoded frame right away instead of
+    waiting for the next one. Past ``maxWarm`` hidden sessions the least recently shown is stopped.
+    """
+
+    def __init__(self, warmMode: eWarmMode = eWarmMode.DECODE, maxWarm: int = C_DEFAULT_MAX_WARM) -> None:
+        self._warmMode: eWarmMode = warmMode
+        self._maxWarm: int = maxWarm
+        self._sessions: dict[str, StreamService] = {}
+        self._warm: OrderedDict[str, StreamService] = OrderedDict()
+        self._active: set[str] = set()
+        self._lock: RLock = RLock()
+
+    def Attach(self, key: str, streamer: StreamService) -> None:
+        with self._lock:
+            self._sessions[key] = streamer
+
+    def Detach(self, key: str) -> StreamService:
+        with self._lock:
+            self._warm.pop(key, None)
+            self._active.discard(key)
+            return self._sessions.pop(key, None)
+
+    def Activate(self, key: str) -> StreamService:
+        with self._lock:
+            lStreamer: StreamService = self._sessions.get(key)
+            if lStreamer is None:
+                return None
+
+            self._warm.pop(key, None)
+            self._active.add(key)
+
+        lStreamer.KeyFramesOnly = False
+        if lStreamer.isAlive:
+            lStreamer.Republish()
+
+        else:
+            lStreamer.start()
+
+        return lStreamer
+
+    def Deactivate(self, key: str) -> None:
+        with self._lock:
+            lStreamer: StreamService = self._sessions.get(key)
+            if lStreamer is None or key not in self._active:
+                return
+
+            self._active.discard(key)
+            if not lStreamer.isAlive:
+                return
+
+            if self._warmMode == eWarmMode.STOPPED:
+                lStreamer.stop()
+                return
+
+            self._warm[key] = lStreamer
+            lStreamer.KeyFramesOnly = self._warmMode == eWarmMode.KEYFRAMES
+            lEvicted: list[StreamService] = []
+            while len(self._warm) > self._maxWarm:
+                lKey, lOldest = self._warm.popitem(last=False)
+                debug(f"Stopping idle session {lKey}")
+                lEvicted.append(lOldest)
+
+        for lOldest in lEvicted:
+            lOldest.stop()
+
+    def Show(self, key: str) -> None:
+        """Activates ``key`` and sends every other active session back to its warm mode."""
+        with self._lock:
+            lOthers: list[str] = [lKey for lKey in self._active if lKey != key]
+
+        # activates first so ``key`` leaves the warm queue before the others can push it out of it
+        self.Activate(key)
+        for lKey in lOthers:
+            self.Deactivate(lKey)
+
+    # region [PROPERTIES]
+    @property
+    def WarmMode(self) -> eWarmMode:
+        return self._warmMode
+
+    @WarmMode.setter
+    def WarmMode(self, value: eWarmMode):
+        self._warmMode = value
+
+    @property
+    def MaxWarm(self) -> int:
+        return self._maxWarm
+
+    @MaxWarm.setter
+    def MaxWarm(self, value: int):
+        self._maxWarm = value
+
+    @property
+    def ActiveKeys(self) -> set[str]:
+        with self._lock:
+            return set(self._active)
+
+    @property
+    def WarmKeys(self) -> list[str]:
+        with self._lock:
+            return list(self._warm)
+
+    # endregion
@@ -1,21 +1,56 @@
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic
+from typing import Any
+
 import numpy as np
-from PySide6.QtCore import QSize, Signal
+from PySide6.QtCore import SIGNAL, QMetaMethod, QSize, Signal
 
 from jAGFx.utilities.names import getRandomNames
 
+from ..utilities import THREADPOOL
 from .__QObjectService import Service
+from .__streamSubscription import StreamSubscription
+from .frames import LatencyTracker, StreamFrame, eFrameFormat
+from .frames.__latencyTracker import C_STAGE_DECODE
+from .policies import EncoderSettings, StreamPolicy, StreamStatistics
+
+C_POLICY_DECODE_PERCENTILE: int = 90
+C_FRAME_SIGNAL: str = SIGNAL("OnFrame(PyObject)")
+C_VIDEO_FRAME_SIGNAL: str = SIGNAL("OnVideoFrame(PyObject)")
+C_FRAME_SIGNATURES: tuple[bytes, ...] = (b"OnFrame(PyObject)", b"OnVideoFrame(PyObject)")
 
 
 class StreamService(Service):
     OnFrame: Signal = Signal(np.ndarray)
+    OnVideoFrame: Signal = Signal(object)
     OnResolutionChanged: Signal = Signal(int, int)
     OnError: Signal = Signal(Exception)
 
-    def __init__(self, name: str = "", maxWidth: int = 800) -> None:
+    def __init__(
+        self,
+        name: str = "",
+        maxWidth: int = 800,
+        frameFormat: eFrameFormat = eFrameFormat.BGR,
+        encoderSettings: EncoderSettings = None,
+        policy: StreamPolicy = None,
+    ) -> None:
         super().__init__()
         self._name: str = getRandomNames() if name.strip().strip else name
         self._resolution: QSize = QSize(0, 0)
         self._maxWidth: int = maxWidth
+        self._frameFormat: eFrameFormat = frameFormat
+        self._latency: LatencyTracker = LatencyTracker()
+        self._encoderSettings: EncoderSettings = encoderSettings or EncoderSettings(maxWidth)
+        self._policy: StreamPolicy = policy
+
+        self._subscriptions: tuple[StreamSubscription, ...] = ()
+        self._subscriptionsLock: Lock = Lock()
+        self._hasFrameReceivers: bool = False
+        self._keyFramesOnly: bool = False
+        self._skipNonKeyFrames: bool = False
+        self._lastFrame: StreamFrame = None
+        self._published: int = 0
 
     def getFrame(self) -> np.ndarray:
         raise NotImplementedError("_getFrame must be overridden in subclasses, this should be one pass process to retrieve the frame")
@@ -43,6 +78,97 @@ class StreamService(Service):
         if frame is not None and hasattr(frame, "shape"):
             self._setSize(QSize(frame.shape[1], frame.shape[0]))
 
+    def Reconfigure(self, settings: EncoderSettings):
+        raise NotImplementedError("Reconfigure must be overridden in subclasses that can apply encoder settings")
+
+    def Subscribe(
+        self, callback: Callable[[Any], None], fps: float = None, keyFramesOnly: bool = False, frameFormat: eFrameFormat = eFrameFormat.BGR
+    ) -> StreamSubscription:
+        lSubscription: StreamSubscription = StreamSubscription(callback, fps, keyFramesOnly, frameFormat, self._removeSubscription)
+        with self._subscriptionsLock:
+            self._subscriptions = (*self._subscriptions, lSubscription)
+
+        self._updateDemand()
+        return lSubscription
+
+    def Unsubscribe(self, subscription: StreamSubscription):
+        subscription.Cancel()
+
+    def _removeSubscription(self, subscription: StreamSubscription):
+        with self._subscriptionsLock:
+            self._subscriptions = tuple(lSubscription for lSubscription in self._subscriptions if lSubscription is not subscription)
+
+        self._updateDemand()
+
+    def connectNotify(self, signal: QMetaMethod):
+        if signal.methodSignature().data() in C_FRAME_SIGNATURES:
+            self._updateDemand()
+
+    def disconnectNotify(self, signal: QMetaMethod):
+        if signal.methodSignature().data() in C_FRAME_SIGNATURES:
+            self._updateDemand()
+
+    def _updateDemand(self):
+        self._hasFrameReceivers = self.receivers(C_FRAME_SIGNAL) > 0
+        lSubscriptions: tuple[StreamSubscription, ...] = self._subscriptions
+        lNeedsEveryFrame: bool = (
+            self._hasFrameReceivers
+            or self.receivers(C_VIDEO_FRAME_SIGNAL) > 0
+            or any(not lSubscription.KeyFramesOnly for lSubscription in lSubscriptions)
+        )
+        lSkip: bool = self._keyFramesOnly or (bool(lSubscriptions) and not lNeedsEveryFrame)
+        if lSkip != self._skipNonKeyFrames:
+            self._skipNonKeyFrames = lSkip
+            self._onDemandChanged(lSkip)
+
+    def _onDemandChanged(self, keyFramesOnly: bool):
+        """Called when consumers switch between needing every frame and key frames only."""
+        pass
+
+    def Republish(self) -> bool:
+        """Hands the last published frame to the frame signals again, False when there is none yet."""
+        lFrame: StreamFrame = self._lastFrame
+        if lFrame is None:
+            return False
+
+        lFrame.IsRepublished = True
+        self.OnVideoFrame.emit(lFrame)
+        if self._frameFormat == eFrameFormat.BGR and self._hasFrameReceivers:
+            self.OnFrame.emit(lFrame.ToBGR())
+
+        return True
+
+    def MarkDisplayed(self, frame: StreamFrame):
+        frame.DisplayedAt = monotonic()
+        if not frame.IsRepublished:
+            self._latency.RecordDisplayed(frame)
+
+    def _publish(self, frame: StreamFrame):
+        frame.PublishedAt = monotonic()
+        frame.Index = self._published
+        self._published += 1
+        self._lastFrame = frame
+        self._latency.RecordPublished(frame)
+        self.OnVideoFrame.emit(frame)
+        if self._frameFormat == eFrameFormat.BGR and self._hasFrameReceivers:
+            self.OnFrame.emit(frame.ToBGR())
+
+        for lSubscription in self._subscriptions:
+            if lSubscription.Wants(frame):
+                lSubscription.Deliver(frame)
+
+        self._setSize(QSize(frame.Width, frame.Height))
+
+        if self._policy is not None:
+            lSettings: EncoderSettings = self._policy.Observe(self._statistics)
+            if lSettings is not None:
+                THREADPOOL.submit(self.Reconfigure, lSettings)
+
+    def _statistics(self) -> StreamStatistics:
+        return StreamStatistics(
+            self._encoderSettings, self._latency.FPS, self._latency.Percentile(C_STAGE_DECODE, C_POLICY_DECODE_PERCENTILE)
+        )
+
     def _setSize(self, size: QSize):
         if size != self._resolution:
             self._resolution = size
@@ -56,6 +182,67 @@ class StreamService(Service):
     def Resolution(self) -> QSize:
         return self._resolution
 
+    @property
+    def FrameFormat(self) -> eFrameFormat:
+        return self._frameFormat
+
+    @FrameFormat.setter
+    def FrameFormat(self, value: eFrameFormat):
+        self._frameFormat = value
+
+    @property
+    def Latency(self) -> LatencyTracker:
+        return self._latency
+
+    @property
+    def FPS(self) -> float:
+        return self._latency.FPS
+
+    @property
+    def Published(self) -> int:
+        return self._published
+
+    @property
+    def Statistics(self) -> StreamStatistics:
+        return self._statistics()
+
+    @property
+    def LastFrame(self) -> StreamFrame:
+        return self._lastFrame
+
+    @property
+    def Subscriptions(self) -> tuple[StreamSubscription, ...]:
+        return self._subscriptions
+
+    @property
+    def KeyFramesOnly(self) -> bool:
+        """Forces key-frame-only decoding regardless of the consumers, used to keep idle streams cheap."""
+        return self._keyFramesOnly
+
+    @KeyFramesOnly.setter
+    def KeyFramesOnly(self, value: bool):
+        self._keyFramesOnly = value
+        self._updateDemand()
+
+    @property
+    def SkipsNonKeyFrames(self) -> bool:
+        return self._skipNonKeyFrames
+
+    @property
+    def EncoderSettings(self) -> EncoderSettings:
+        return self._encoderSettings
+
+    @property
+    def Policy(self) -> StreamPolicy:
+        return self._policy
+
+    @Policy.setter
+    def Policy(self, value: StreamPolicy):
+        if value is not None:
+            value.Reset()
+
+        self._policy = value
+
     @property
     def MaximumWidth(self) -> int:
         return self._maxWidth
@@ -0,0 +1,104 @@
+# ==================================================================================
+from collections.abc import Callable
+from threading import Lock
+from typing import Any
+
+# ==================================================================================
+from jAGFx.logger import error
+
+# ==================================================================================
+from .frames import StreamFrame, eFrameFormat
+
+
+class StreamSubscription:
+    """
+    Sampled view of a stream for a single consumer.
+
+    The callback runs on the thread publishing the frame and receives a ``StreamFrame`` for
+    ``eFrameFormat.NATIVE`` or the BGR array otherwise. ``fps`` caps the delivery rate and
+    ``keyFramesOnly`` restricts it to key frames, frames the subscription skips are never converted.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Any], None],
+        fps: float = None,
+        keyFramesOnly: bool = False,
+        frameFormat: eFrameFormat = eFrameFormat.BGR,
+        onCancel: Callable[["StreamSubscription"], None] = None,
+    ) -> None:
+        self._callback: Callable[[Any], None] = callback
+        self._interval: float = 1.0 / fps if fps else 0.0
+        self._keyFramesOnly: bool = keyFramesOnly
+        self._frameFormat: eFrameFormat = frameFormat
+        self._onCancel: Callable[[StreamSubscription], None] = onCancel
+
+        self._nextDue: float = 0.0
+        self._delivered: int = 0
+        self._skipped: int = 0
+        self._isActive: bool = True
+        self._lock: Lock = Lock()
+
+    def Wants(self, frame: StreamFrame) -> bool:
+        if not self._isActive or (self._keyFramesOnly and not frame.IsKeyFrame):
+            self._skipped += 1
+            return False
+
+        if self._interval:
+            lNow: float = frame.PublishedAt
+            with self._lock:
+                if lNow < self._nextDue:
+                    self._skipped += 1
+                    return False
+
+                lBehind: bool = lNow - self._nextDue >= self._interval
+                self._nextDue = lNow + self._interval if lBehind else self._nextDue + self._interval
+
+        return True
+
+    def Deliver(self, frame: StreamFrame) -> None:
+        lPayload: Any = frame if self._frameFormat == eFrameFormat.NATIVE else frame.ToBGR()
+        if lPayload is None:
+            return
+
+        try:
+            self._callback(lPayload)
+            self._delivered += 1
+
+        except Exception as ex:
+            error("Error in stream subscriber", ex)
+
+    def Cancel(self) -> None:
+        if not self._isActive:
+            return
+
+        self._isActive = False
+        if self._onCancel is not None:
+            self._onCancel(self)
+
+    # region [PROPERTIES]
+    @property
+    def FPS(self) -> float:
+        return 1.0 / self._interval if self._interval else None
+
+    @property
+    def KeyFramesOnly(self) -> bool:
+        return self._keyFramesOnly
+
+    @property
+    def FrameFormat(self) -> eFrameFormat:
+        return self._frameFormat
+
+    @property
+    def IsActive(self) -> bool:
+        return self._isActive
+
+    @property
+    def Delivered(self) -> int:
+        return self._delivered
+
+    @property
+    def Skipped(self) -> int:
+        return self._skipped
+
+    # endregion
@@ -0,0 +1,8 @@
+# ==================================================================================
+from enum import Enum, auto
+
+
+class eWarmMode(Enum):
+    DECODE = auto()
+    KEYFRAMES = auto()
+    STOPPED = auto()
@@ -0,0 +1,7 @@
+# ==================================================================================
+from enum import Enum, auto
+
+
+class eFrameFormat(Enum):
+    BGR = auto()
+    NATIVE = auto()
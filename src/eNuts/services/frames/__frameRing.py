@@ -0,0 +1,107 @@
+# ==================================================================================
+from collections import deque
+from threading import Condition
+from time import monotonic
+from typing import Any
+
+C_DEFAULT_RING_CAPACITY: int = 3
+C_DEFAULT_LATE_THRESHOLD: float = 0.1
+C_LATENCY_SMOOTHING: float = 0.1
+
+
+class FrameRing:
+    """
+    Fixed-size hand-off between a producer and a consumer thread.
+
+    When the ring is full the oldest entry is discarded so the consumer always sees the most
+    recent frames. Entries older than ``LateThreshold`` seconds when taken are counted as late.
+    """
+
+    def __init__(self, capacity: int = C_DEFAULT_RING_CAPACITY, lateThreshold: float = C_DEFAULT_LATE_THRESHOLD) -> None:
+        self._capacity: int = max(1, capacity)
+        self._lateThreshold: float = lateThreshold
+        self._entries: deque[tuple[float, Any]] = deque(maxlen=self._capacity)
+        self._condition: Condition = Condition()
+
+        self._received: int = 0
+        self._delivered: int = 0
+        self._dropped: int = 0
+        self._late: int = 0
+        self._averageLatency: float = 0.0
+
+    def Put(self, item: Any) -> None:
+        with self._condition:
+            if len(self._entries) == self._capacity:
+                self._dropped += 1
+
+            self._entries.append((monotonic(), item))
+            self._received += 1
+            self._condition.notify()
+
+    def Get(self, timeout: float = None) -> Any:
+        with self._condition:
+            if not self._entries and not self._condition.wait(timeout):
+                return None
+
+            if not self._entries:
+                return None
+
+            lQueuedAt, lItem = self._entries.popleft()
+            lLatency: float = monotonic() - lQueuedAt
+            if lLatency > self._lateThreshold:
+                self._late += 1
+
+            self._delivered += 1
+            self._averageLatency += (lLatency - self._averageLatency) * C_LATENCY_SMOOTHING
+            return lItem
+
+    def Clear(self) -> None:
+        with self._condition:
+            self._entries.clear()
+
+    def ResetCounters(self) -> None:
+        with self._condition:
+            self._received = self._delivered = self._dropped = self._late = 0
+            self._averageLatency = 0.0
+
+    @property
+    def Capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def Depth(self) -> int:
+        with self._condition:
+            return len(self._entries)
+
+    @property
+    def LateThreshold(self) -> float:
+        return self._lateThreshold
+
+    @LateThreshold.setter
+    def LateThreshold(self, value: float):
+        self._lateThreshold = value
+
+    @property
+    def Received(self) -> int:
+        with self._condition:
+            return self._received
+
+    @property
+    def Delivered(self) -> int:
+        with self._condition:
+            return self._delivered
+
+    @property
+    def Dropped(self) -> int:
+        with self._condition:
+            return self._dropped
+
+    @property
+    def Late(self) -> int:
+        with self._condition:
+            return self._late
+
+    @property
+    def AverageLatency(self) -> float:
+        with self._condition:
+            return self._averageLatency
@@ -0,0 +1,7 @@
+from .__frameFormat import eFrameFormat
+from .__frameRing import FrameRing
+from .__latencyTracker import LatencyTracker
+from .__sharedFrameRing import SharedFrameRing, SharedStreamFrame
+from .__streamFrame import StreamFrame
+
+__all__ = ["FrameRing", "LatencyTracker", "SharedFrameRing", "SharedStreamFrame", "StreamFrame", "eFrameFormat"]
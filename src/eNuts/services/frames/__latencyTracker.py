@@ -0,0 +1,113 @@
+# ==================================================================================
+from collections import deque
+from threading import Lock
+from time import monotonic
+
+# ==================================================================================
+from numpy import array, float64, ndarray, percentile
+
+# ==================================================================================
+from .__streamFrame import StreamFrame
+
+C_DEFAULT_LATENCY_WINDOW: int = 300
+C_DEFAULT_PERCENTILES: tuple[int, ...] = (50, 90, 99)
+C_PTS_UNITS_PER_SECOND: float = 1_000_000.0
+
+C_STAGE_DECODE: str = "decode"
+C_STAGE_PUBLISH: str = "publish"
+C_STAGE_DISPLAY: str = "display"
+C_STAGE_CAPTURE_TO_DISPLAY: str = "captureToDisplay"
+
+
+class LatencyTracker:
+    """
+    Sliding window of per-stage frame latencies.
+
+    Stages are measured from the ``StreamFrame`` timestamps: receive to decode, decode to publish and
+    publish to display. The device PTS and the host clock share no epoch, so capture-to-display uses
+    the smallest ``ReceivedAt - PTS`` seen in the window as the clock offset, which makes it the
+    latency on top of the fastest frame observed.
+    """
+
+    def __init__(self, window: int = C_DEFAULT_LATENCY_WINDOW) -> None:
+        self._window: int = window
+        self._stages: dict[str, deque[float]] = {}
+        self._offsets: deque[float] = deque(maxlen=window)
+        self._published: deque[float] = deque(maxlen=window)
+        self._displayed: deque[float] = deque(maxlen=window)
+        self._lock: Lock = Lock()
+
+    def RecordPublished(self, frame: StreamFrame) -> None:
+        with self._lock:
+            self._published.append(frame.PublishedAt)
+            self._add(C_STAGE_DECODE, frame.DecodedAt, frame.ReceivedAt)
+            self._add(C_STAGE_PUBLISH, frame.PublishedAt, frame.DecodedAt)
+            if frame.Pts is not None and frame.ReceivedAt is not None:
+                self._offsets.append(frame.ReceivedAt - frame.Pts / C_PTS_UNITS_PER_SECOND)
+
+    def RecordDisplayed(self, frame: StreamFrame) -> None:
+        with self._lock:
+            self._displayed.append(frame.DisplayedAt)
+            self._add(C_STAGE_DISPLAY, frame.DisplayedAt, frame.PublishedAt)
+            if frame.Pts is not None and self._offsets:
+                self._add(C_STAGE_CAPTURE_TO_DISPLAY, frame.DisplayedAt, frame.Pts / C_PTS_UNITS_PER_SECOND + min(self._offsets))
+
+    def Percentiles(self, percentiles: tuple[int, ...] = C_DEFAULT_PERCENTILES) -> dict[str, dict[int, float]]:
+        """Latency per stage in milliseconds."""
+        with self._lock:
+            lStages: dict[str, ndarray] = {lName: array(lSamples, dtype=float64) for lName, lSamples in self._stages.items() if lSamples}
+
+        return {lName: dict(zip(percentiles, (percentile(lSamples, percentiles) * 1000.0).tolist())) for lName, lSamples in lStages.items()}
+
+    def Percentile(self, stage: str, value: int) -> float:
+        """Single percentile of one stage in milliseconds, 0.0 until the stage has samples."""
+        with self._lock:
+            lSamples: deque[float] = self._stages.get(stage)
+            if not lSamples:
+                return 0.0
+
+            lArray: ndarray = array(lSamples, dtype=float64)
+
+        return float(percentile(lArray, value)) * 1000.0
+
+    def Reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._offsets.clear()
+            self._published.clear()
+            self._displayed.clear()
+
+    def _add(self, stage: str, end: float, start: float) -> None:
+        if end is None or start is None:
+            return
+
+        lSamples: deque[float] = self._stages.get(stage)
+        if lSamples is None:
+            lSamples = self._stages[stage] = deque(maxlen=self._window)
+
+        lSamples.append(end - start)
+
+    @staticmethod
+    def _rate(stamps: deque[float]) -> float:
+        if len(stamps) < 2:
+            return 0.0
+
+        lSpan: float = max(stamps[-1], monotonic()) - stamps[0]
+        return (len(stamps) - 1) / lSpan if lSpan > 0 else 0.0
+
+    # region [PROPERTIES]
+    @property
+    def Window(self) -> int:
+        return self._window
+
+    @property
+    def FPS(self) -> float:
+        with self._lock:
+            return self._rate(self._published)
+
+    @property
+    def DisplayFPS(self) -> float:
+        with self._lock:
+            return self._rate(self._displayed)
+
+    # endregion
@@ -0,0 +1,184 @@
+# ==================================================================================
+from multiprocessing.shared_memory import SharedMemory
+from time import monotonic
+
+# ==================================================================================
+from av import VideoFrame
+from cv2 import COLOR_YUV2BGR_I420, cvtColor
+from numpy import copyto, int64, ndarray, uint8
+
+# ==================================================================================
+from .__streamFrame import StreamFrame
+
+C_HEADER_FIELDS: int = 7
+C_FIELD_SEQUENCE: int = 0
+C_FIELD_WIDTH: int = 1
+C_FIELD_HEIGHT: int = 2
+C_FIELD_PTS: int = 3
+C_FIELD_KEY_FRAME: int = 4
+C_FIELD_RECEIVED_AT: int = 5
+C_FIELD_DECODED_AT: int = 6
+C_WRITING: int = -1
+C_NO_VALUE: int = -1
+C_NANOSECONDS: float = 1e9
+C_DEFAULT_SHARED_SLOTS: int = 4
+
+
+class SharedFrameRing:
+    """
+    Ring of I420 frame slots living in a ``multiprocessing.shared_memory`` block.
+
+    The owning process creates the block and unlinks it on ``Close``, a decode worker attaches by
+    name and writes frames into it. Each slot carries a sequence number so readers can detect that a
+    slot was overwritten while they were reading it.
+    """
+
+    def __init__(self, slots: int, slotSize: int, name: str = None) -> None:
+        self._slots: int = slots
+        self._slotSize: int = slotSize
+        self._isOwner: bool = name is None
+        self._headerSize: int = slots * C_HEADER_FIELDS * int64().itemsize
+
+        if self._isOwner:
+            self._memory: SharedMemory = SharedMemory(create=True, size=self._headerSize + slots * slotSize)
+
+        else:
+            self._memory = SharedMemory(name=name)
+
+        self._header: ndarray = ndarray((slots, C_HEADER_FIELDS), dtype=int64, buffer=self._memory.buf)
+        self._data: ndarray = ndarray((slots, slotSize), dtype=uint8, buffer=self._memory.buf, offset=self._headerSize)
+        if self._isOwner:
+            self._header.fill(0)
+
+    @staticmethod
+    def SlotSizeFor(width: int, height: int) -> int:
+        return width * height * 3 // 2
+
+    def Write(self, sequence: int, frame: VideoFrame, receivedAt: float = None, pts: int = None, isKeyFrame: bool = None) -> int:
+        lWidth, lHeight = frame.width, frame.height
+        if self.SlotSizeFor(lWidth, lHeight) > self._slotSize:
+            raise ValueError(f"Frame {lWidth}x{lHeight} does not fit a {self._slotSize} byte slot")
+
+        lSlot: int = sequence % self._slots
+        self._header[lSlot, C_FIELD_SEQUENCE] = C_WRITING
+
+        lOffset: int = 0
+        lFrame: VideoFrame = frame if frame.format.name == "yuv420p" else frame.reformat(format="yuv420p")
+        for lPlane in lFrame.planes:
+            lSize: int = lPlane.width * lPlane.height
+            lSource: ndarray = ndarray((lPlane.height, lPlane.line_size), dtype=uint8, buffer=lPlane)[:, : lPlane.width]
+            copyto(self._data[lSlot, lOffset : lOffset + lSize].reshape(lPlane.height, lPlane.width), lSource)
+            lOffset += lSize
+
+        self._header[lSlot, C_FIELD_WIDTH] = lWidth
+        self._header[lSlot, C_FIELD_HEIGHT] = lHeight
+        lPts: int = frame.pts if pts is None else pts
+        self._header[lSlot, C_FIELD_PTS] = C_NO_VALUE if lPts is None else lPts
+        self._header[lSlot, C_FIELD_KEY_FRAME] = frame.key_frame if isKeyFrame is None else isKeyFrame
+        self._header[lSlot, C_FIELD_RECEIVED_AT] = C_NO_VALUE if receivedAt is None else int(receivedAt * C_NANOSECONDS)
+        self._header[lSlot, C_FIELD_DECODED_AT] = int(monotonic() * C_NANOSECONDS)
+        self._header[lSlot, C_FIELD_SEQUENCE] = sequence
+        return lSlot
+
+    def Frame(self, sequence: int) -> "SharedStreamFrame":
+        return SharedStreamFrame(self, sequence)
+
+    def SequenceAt(self, slot: int) -> int:
+        if self._header is None:
+            return C_WRITING
+
+        return int(self._header[slot, C_FIELD_SEQUENCE])
+
+    def MetaAt(self, slot: int) -> tuple[int, bool, float, float]:
+        lPts, lKeyFrame, lReceivedAt, lDecodedAt = (int(lValue) for lValue in self._header[slot, C_FIELD_PTS:])
+        return (
+            None if lPts == C_NO_VALUE else lPts,
+            bool(lKeyFrame),
+            None if lReceivedAt == C_NO_VALUE else lReceivedAt / C_NANOSECONDS,
+            lDecodedAt / C_NANOSECONDS,
+        )
+
+    def I420At(self, slot: int) -> ndarray:
+        lWidth, lHeight = int(self._header[slot, C_FIELD_WIDTH]), int(self._header[slot, C_FIELD_HEIGHT])
+        return self._data[slot, : self.SlotSizeFor(lWidth, lHeight)].reshape(lHeight * 3 // 2, lWidth)
+
+    def Close(self) -> None:
+        self._header = None
+        self._data = None
+        try:
+            self._memory.close()
+
+        except BufferError:
+            pass  # frames handed out still view the block, the mapping goes away with them
+
+        if self._isOwner:
+            self._memory.unlink()
+
+    @property
+    def Name(self) -> str:
+        return self._memory.name
+
+    @property
+    def Slots(self) -> int:
+        return self._slots
+
+    @property
+    def SlotSize(self) -> int:
+        return self._slotSize
+
+
+class SharedStreamFrame(StreamFrame):
+    """
+    ``StreamFrame`` backed by a ``SharedFrameRing`` slot instead of a decoder frame.
+
+    The planes are views into shared memory and stay valid only until the decoder wraps around the
+    ring, ``IsValid`` tells whether that already happened and ``ToBGR`` returns None if it did.
+    """
+
+    def __init__(self, ring: SharedFrameRing, sequence: int) -> None:
+        lSlot: int = sequence % ring.Slots
+        lPts, lKeyFrame, lReceivedAt, lDecodedAt = ring.MetaAt(lSlot)
+        super().__init__(None, lReceivedAt, lPts, lKeyFrame, lDecodedAt)
+        self._ring: SharedFrameRing = ring
+        self._sequence: int = sequence
+        self._slot: int = lSlot
+        self._i420: ndarray = ring.I420At(self._slot)
+
+    @property
+    def Sequence(self) -> int:
+        return self._sequence
+
+    @property
+    def IsValid(self) -> bool:
+        return self._ring.SequenceAt(self._slot) == self._sequence
+
+    @property
+    def Width(self) -> int:
+        return self._i420.shape[1]
+
+    @property
+    def Height(self) -> int:
+        return self._i420.shape[0] * 2 // 3
+
+    @property
+    def Format(self) -> str:
+        return "yuv420p"
+
+    @property
+    def Planes(self) -> list[ndarray]:
+        lWidth, lHeight = self.Width, self.Height
+        lFlat: ndarray = self._i420.reshape(-1)
+        lLuma: int = lWidth * lHeight
+        lChroma: int = lLuma // 4
+        return [
+            lFlat[:lLuma].reshape(lHeight, lWidth),
+            lFlat[lLuma : lLuma + lChroma].reshape(lHeight // 2, lWidth // 2),
+            lFlat[lLuma + lChroma : lLuma + 2 * lChroma].reshape(lHeight // 2, lWidth // 2),
+        ]
+
+    def _convert(self) -> ndarray:
+        if not self.IsValid:
+            return None
+
+        lBGR: ndarray = cvtColor(self._i420, COLOR_YUV2BGR_I420)
+        return lBGR if self.IsValid else None
@@ -0,0 +1,125 @@
+# ==================================================================================
+from threading import Lock
+from time import monotonic
+
+# ==================================================================================
+from av import VideoFrame
+from numpy import frombuffer, ndarray, uint8
+
+C_PLANAR_FORMATS: tuple[str, ...] = ("yuv420p", "yuvj420p", "yuv422p", "yuvj422p", "yuv444p", "yuvj444p", "gray")
+
+
+class StreamFrame:
+    """
+    Decoded video frame handed to stream consumers.
+
+    The decoder output is kept in its native layout, ``Planes`` exposes it as zero-copy views and
+    ``ToBGR`` converts on demand, at most once per frame, no matter how many consumers ask for it.
+    Timestamps are ``time.monotonic`` seconds, ``Pts`` is the device presentation time in microseconds.
+    """
+
+    def __init__(
+        self, frame: VideoFrame, receivedAt: float = None, pts: int = None, isKeyFrame: bool = None, decodedAt: float = None
+    ) -> None:
+        self._frame: VideoFrame = frame
+        self._bgr: ndarray = None
+        self._bgrLock: Lock = Lock()
+
+        self._pts: int = pts if pts is not None or frame is None else frame.pts
+        self._isKeyFrame: bool = isKeyFrame if isKeyFrame is not None or frame is None else frame.key_frame
+        self._receivedAt: float = receivedAt
+        self._decodedAt: float = monotonic() if decodedAt is None else decodedAt
+        self._publishedAt: float = None
+        self._displayedAt: float = None
+        self._isRepublished: bool = False
+        self._index: int = None
+
+    @property
+    def Frame(self) -> VideoFrame:
+        return self._frame
+
+    @property
+    def Width(self) -> int:
+        return self._frame.width
+
+    @property
+    def Height(self) -> int:
+        return self._frame.height
+
+    @property
+    def Format(self) -> str:
+        return self._frame.format.name
+
+    @property
+    def Planes(self) -> list[ndarray]:
+        lIsPlanar: bool = self.Format in C_PLANAR_FORMATS
+        lPlanes: list[ndarray] = []
+        for lPlane in self._frame.planes:
+            lRaw: ndarray = frombuffer(lPlane, dtype=uint8).reshape(lPlane.height, lPlane.line_size)
+            lPlanes.append(lRaw[:, : lPlane.width] if lIsPlanar else lRaw)
+
+        return lPlanes
+
+    @property
+    def Pts(self) -> int:
+        return self._pts
+
+    @property
+    def IsKeyFrame(self) -> bool:
+        return bool(self._isKeyFrame)
+
+    @property
+    def ReceivedAt(self) -> float:
+        return self._receivedAt
+
+    @property
+    def DecodedAt(self) -> float:
+        return self._decodedAt
+
+    @property
+    def PublishedAt(self) -> float:
+        return self._publishedAt
+
+    @PublishedAt.setter
+    def PublishedAt(self, value: float):
+        self._publishedAt = value
+
+    @property
+    def DisplayedAt(self) -> float:
+        return self._displayedAt
+
+    @DisplayedAt.setter
+    def DisplayedAt(self, value: float):
+        self._displayedAt = value
+
+    @property
+    def IsRepublished(self) -> bool:
+        return self._isRepublished
+
+    @IsRepublished.setter
+    def IsRepublished(self, value: bool):
+        self._isRepublished = value
+
+    @property
+    def Index(self) -> int:
+        """Position of the frame among the frames its stream published, None before publishing."""
+        return self._index
+
+    @Index.setter
+    def Index(self, value: int):
+        self._index = value
+
+    @property
+    def IsConverted(self) -> bool:
+        with self._bgrLock:
+            return self._bgr is not None
+
+    def ToBGR(self) -> ndarray:
+        with self._bgrLock:
+            if self._bgr is None:
+                self._bgr = self._convert()
+
+            return self._bgr
+
+    def _convert(self) -> ndarray:
+        return self._frame.to_ndarray(format="bgr24")
@@ -0,0 +1,143 @@
+# ==================================================================================
+from math import ceil
+
+# ==================================================================================
+from jAGFx.logger import info
+
+# ==================================================================================
+from .__encoderSettings import EncoderSettings
+from .__streamPolicy import C_DEFAULT_POLICY_INTERVAL, StreamPolicy
+from .__streamStatistics import StreamStatistics
+
+C_STEP: float = 0.75
+C_SIZE_ALIGNMENT: int = 8
+
+
+class AdaptiveBitratePolicy(StreamPolicy):
+    """
+    Lowers the encoder settings of a device that falls behind and raises them again with headroom.
+
+    A device is behind when its decode time eats more than ``DecodeBudget`` of the frame interval,
+    or when the frame ring backs up or drops frames. Decode pressure is relieved by shrinking the
+    size first, a backlog by lowering the bit rate first. Settings only go back up after
+    ``HeadroomIntervals`` quiet evaluations in a row and never above the ones the stream started
+    with. Every change is followed by a ``Cooldown`` so the restarted server can settle.
+    """
+
+    def __init__(
+        self,
+        interval: float = C_DEFAULT_POLICY_INTERVAL,
+        cooldown: float = 10.0,
+        decodeBudget: float = 0.6,
+        headroomBudget: float = 0.25,
+        headroomIntervals: int = 3,
+        minSize: int = 480,
+        minFPS: int = 24,
+        minBitRate: int = 1000000,
+        maxBitRate: int = 16000000,
+    ) -> None:
+        super().__init__(interval)
+        self._cooldown: float = cooldown
+        self._decodeBudget: float = decodeBudget
+        self._headroomBudget: float = headroomBudget
+        self._headroomIntervals: int = headroomIntervals
+        self._minSize: int = minSize
+        self._minFPS: int = minFPS
+        self._minBitRate: int = minBitRate
+        self._maxBitRate: int = maxBitRate
+
+        self._ceiling: EncoderSettings = None
+        self._cooldownUntil: float = 0.0
+        self._lastDropped: int = 0
+        self._headroom: int = 0
+
+    def Evaluate(self, statistics: StreamStatistics, now: float) -> EncoderSettings:
+        lSettings: EncoderSettings = statistics.Settings
+        if self._ceiling is None:
+            self._ceiling = lSettings.Copy(BitRate=min(lSettings.BitRate, self._maxBitRate))
+
+        lDropped: int = max(0, statistics.Dropped - self._lastDropped)
+        self._lastDropped = statistics.Dropped
+        if now < self._cooldownUntil:
+            return None
+
+        lFrameInterval: float = 1000.0 / max(1, lSettings.MaxFPS)
+        lDecodeBound: bool = statistics.DecodeTime > lFrameInterval * self._decodeBudget
+        lBacklog: bool = lDropped > 0 or statistics.RingDepth * 2 > statistics.RingCapacity
+
+        lNext: EncoderSettings = None
+        if lDecodeBound or lBacklog:
+            self._headroom = 0
+            lNext = self._stepDown(lSettings, lDecodeBound)
+
+        elif statistics.DecodeTime < lFrameInterval * self._headroomBudget and statistics.RingDepth <= 1:
+            self._headroom += 1
+            if self._headroom >= self._headroomIntervals:
+                self._headroom = 0
+                lNext = self._stepUp(lSettings)
+
+        else:
+            self._headroom = 0
+
+        if lNext is not None:
+            info(f"Stream policy changes {lSettings} to {lNext} (decode {statistics.DecodeTime:.1f}ms, dropped {lDropped})")
+            self._cooldownUntil = now + self._cooldown
+
+        return lNext
+
+    def Reset(self) -> None:
+        super().Reset()
+        self._ceiling = None
+        self._cooldownUntil = 0.0
+        self._lastDropped = 0
+        self._headroom = 0
+
+    def _stepDown(self, settings: EncoderSettings, decodeBound: bool) -> EncoderSettings:
+        lBitRate: int = max(self._minBitRate, int(min(settings.BitRate, self._maxBitRate) * C_STEP))
+        lFPS: int = max(self._minFPS, int(settings.MaxFPS * C_STEP))
+        lSize: int = max(self._minSize, int(settings.MaxSize * C_STEP) // C_SIZE_ALIGNMENT * C_SIZE_ALIGNMENT)
+
+        lSteps: list[tuple[str, int, int]] = [
+            ("MaxSize", lSize, settings.MaxSize),
+            ("MaxFPS", lFPS, settings.MaxFPS),
+            ("BitRate", lBitRate, settings.BitRate),
+        ]
+        return self._firstChange(settings, lSteps if decodeBound else lSteps[::-1])
+
+    def _stepUp(self, settings: EncoderSettings) -> EncoderSettings:
+        lBitRate: int = min(self._ceiling.BitRate, ceil(settings.BitRate / C_STEP))
+        lFPS: int = min(self._ceiling.MaxFPS, ceil(settings.MaxFPS / C_STEP))
+        lSize: int = min(self._ceiling.MaxSize, ceil(settings.MaxSize / C_STEP / C_SIZE_ALIGNMENT) * C_SIZE_ALIGNMENT)
+
+        return self._firstChange(settings, [("BitRate", lBitRate, settings.BitRate), ("MaxFPS", lFPS, settings.MaxFPS), ("MaxSize", lSize, settings.MaxSize)])
+
+    @staticmethod
+    def _firstChange(settings: EncoderSettings, steps: list[tuple[str, int, int]]) -> EncoderSettings:
+        for lName, lValue, lCurrent in steps:
+            if lValue != lCurrent:
+                return settings.Copy(**{lName: lValue})
+
+        return None
+
+    # region [PROPERTIES]
+    @property
+    def Cooldown(self) -> float:
+        return self._cooldown
+
+    @Cooldown.setter
+    def Cooldown(self, value: float):
+        self._cooldown = value
+
+    @property
+    def DecodeBudget(self) -> float:
+        return self._decodeBudget
+
+    @DecodeBudget.setter
+    def DecodeBudget(self, value: float):
+        self._decodeBudget = value
+
+    @property
+    def Ceiling(self) -> EncoderSettings:
+        return self._ceiling
+
+    # endregion
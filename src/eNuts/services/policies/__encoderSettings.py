@@ -0,0 +1,57 @@
+# ==================================================================================
+
+# ==================================================================================
+from jAGFx.serializer import Serialisable
+
+# ==================================================================================
+
+C_DEFAULT_MAX_SIZE: int = 800
+C_DEFAULT_MAX_FPS: int = 120
+C_DEFAULT_BIT_RATE: int = 1000000000
+
+
+class EncoderSettings(Serialisable):
+    def __init__(self, maxSize: int = C_DEFAULT_MAX_SIZE, maxFPS: int = C_DEFAULT_MAX_FPS, bitRate: int = C_DEFAULT_BIT_RATE):
+        super().__init__()
+        self._maxSize: int = maxSize
+        self._maxFPS: int = maxFPS
+        self._bitRate: int = bitRate
+
+        self.Properties.extend(["MaxSize", "MaxFPS", "BitRate"])
+
+    def Copy(self, **changes) -> "EncoderSettings":
+        lSettings: EncoderSettings = EncoderSettings(self._maxSize, self._maxFPS, self._bitRate)
+        for lName, lValue in changes.items():
+            setattr(lSettings, lName, lValue)
+
+        return lSettings
+
+    def ServerArguments(self) -> list[str]:
+        return [f"max_size={self._maxSize}", f"max_fps={self._maxFPS}", f"video_bit_rate={self._bitRate}"]
+
+    def __repr__(self) -> str:
+        return f"EncoderSettings(maxSize={self._maxSize}, maxFPS={self._maxFPS}, bitRate={self._bitRate})"
+
+    @property
+    def MaxSize(self) -> int:
+        return self._maxSize
+
+    @MaxSize.setter
+    def MaxSize(self, value: int):
+        self._maxSize = value
+
+    @property
+    def MaxFPS(self) -> int:
+        return self._maxFPS
+
+    @MaxFPS.setter
+    def MaxFPS(self, value: int):
+        self._maxFPS = value
+
+    @property
+    def BitRate(self) -> int:
+        return self._bitRate
+
+    @BitRate.setter
+    def BitRate(self, value: int):
+        self._bitRate = value
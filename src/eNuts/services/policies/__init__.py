@@ -0,0 +1,6 @@
+from .__adaptiveBitratePolicy import AdaptiveBitratePolicy
+from .__encoderSettings import EncoderSettings
+from .__streamPolicy import StreamPolicy
+from .__streamStatistics import StreamStatistics
+
+__all__ = ["AdaptiveBitratePolicy", "EncoderSettings", "StreamPolicy", "StreamStatistics"]
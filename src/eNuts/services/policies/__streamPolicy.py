@@ -0,0 +1,49 @@
+# ==================================================================================
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic
+
+# ==================================================================================
+from .__encoderSettings import EncoderSettings
+from .__streamStatistics import StreamStatistics
+
+C_DEFAULT_POLICY_INTERVAL: float = 2.0
+
+
+class StreamPolicy:
+    """
+    Decides the encoder settings a stream should run with.
+
+    ``Observe`` is called by the stream for every published frame and only samples the statistics
+    once per ``Interval``. ``Evaluate`` returns new settings when the stream should be reconfigured,
+    the base policy keeps whatever the stream runs with.
+    """
+
+    def __init__(self, interval: float = C_DEFAULT_POLICY_INTERVAL) -> None:
+        self._interval: float = interval
+        self._nextEvaluation: float = 0.0
+        self._lock: Lock = Lock()
+
+    def Observe(self, statistics: Callable[[], StreamStatistics]) -> EncoderSettings:
+        lNow: float = monotonic()
+        with self._lock:
+            if lNow < self._nextEvaluation:
+                return None
+
+            self._nextEvaluation = lNow + self._interval
+            return self.Evaluate(statistics(), lNow)
+
+    def Evaluate(self, statistics: StreamStatistics, now: float) -> EncoderSettings:
+        return None
+
+    def Reset(self) -> None:
+        with self._lock:
+            self._nextEvaluation = 0.0
+
+    @property
+    def Interval(self) -> float:
+        return self._interval
+
+    @Interval.setter
+    def Interval(self, value: float):
+        self._interval = value
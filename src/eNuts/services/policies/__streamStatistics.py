@@ -0,0 +1,15 @@
+# ==================================================================================
+from dataclasses import dataclass
+
+# ==================================================================================
+from .__encoderSettings import EncoderSettings
+
+
+@dataclass(slots=True)
+class StreamStatistics:
+    Settings: EncoderSettings
+    FPS: float = 0.0
+    DecodeTime: float = 0.0
+    RingDepth: int = 0
+    RingCapacity: int = 0
+    Dropped: int = 0
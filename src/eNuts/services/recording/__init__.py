@@ -0,0 +1,6 @@
+from .__packetSink import PacketSink
+from .__segmentRecorder import SegmentIndex, SegmentInfo, SegmentRecorder
+from .__sessionRecorder import SessionLog, SessionRecorder
+from .__streamRecorder import StreamRecorder
+
+__all__ = ["PacketSink", "SegmentIndex", "SegmentInfo", "SegmentRecorder", "SessionLog", "SessionRecorder", "StreamRecorder"]
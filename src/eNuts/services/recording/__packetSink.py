@@ -0,0 +1,18 @@
+# ==================================================================================
+from ...scrcpy.stream import MediaPacket
+
+
+class PacketSink:
+    """
+    Receiver of the encoded packets of a stream, before they are decoded.
+
+    ``Write`` is called on the thread that parses the stream, an implementation must hand the
+    packet off and return instead of doing I/O there. ``config`` is the last SPS/PPS the device sent
+    and ``size`` the encoded resolution from the codec header.
+    """
+
+    def Write(self, packet: MediaPacket, config: bytes, size: tuple[int, int]) -> None:
+        raise NotImplementedError()
+
+    def Close(self, timeout: float = None) -> None:
+        pass
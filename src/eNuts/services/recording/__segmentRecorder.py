@@ -0,0 +1,231 @@
+# ==================================================================================
+import json
+import os
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from time import time
+
+# ==================================================================================
+from jAGFx.logger import debug, error, info, warning
+
+# ==================================================================================
+from ...scrcpy.stream import MediaPacket
+from .__streamRecorder import C_PTS_TIME_BASE, C_RESTART_GAP, StreamRecorder
+
+C_INDEX_FILE: str = "index.json"
+C_DEFAULT_SEGMENT_DURATION: float = 60.0
+C_DEFAULT_SEGMENT_EXTENSION: str = "mkv"
+C_DEFAULT_SEGMENT_PREFIX: str = "segment"
+C_SEGMENT_DATE_FORMAT: str = "%Y%m%d_%H%M%S"
+C_PTS_PER_SECOND: int = C_PTS_TIME_BASE.denominator
+
+
+@dataclass
+class SegmentInfo:
+    Name: str
+    Sequence: int
+    Start: int
+    End: int
+    StartedAt: float
+    EndedAt: float
+    Bytes: int = 0
+
+    @property
+    def Duration(self) -> float:
+        return (self.End - self.Start) / C_PTS_PER_SECOND
+
+
+class SegmentIndex:
+    """
+    Ordered list of the segments in a directory, kept in ``index.json``.
+
+    ``Start`` and ``End`` are recording time in microseconds, continuous across segments and across
+    recorder restarts on the same directory, ``StartedAt`` and ``EndedAt`` wall-clock seconds.
+    Segments only ever get appended, so both lookups are a bisection over the start times.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory: str = directory
+        self._segments: list[SegmentInfo] = []
+        self._starts: list[int] = []
+        self._startedAt: list[float] = []
+
+        lPath: str = os.path.join(directory, C_INDEX_FILE)
+        if os.path.exists(lPath):
+            with open(lPath, "r", encoding="utf-8") as lFile:
+                self._segments = [SegmentInfo(**lSegment) for lSegment in json.load(lFile)]
+
+            self._reindex()
+
+    def Append(self, segment: SegmentInfo) -> None:
+        self._segments.append(segment)
+        self._starts.append(segment.Start)
+        self._startedAt.append(segment.StartedAt)
+
+    def Remove(self, segment: SegmentInfo) -> None:
+        self._segments.remove(segment)
+        self._reindex()
+
+    def Find(self, timestamp: float) -> tuple[SegmentInfo, float]:
+        """Segment holding ``timestamp`` seconds of recording time and the offset into it, None outside the recording."""
+        return self._find(self._starts, round(timestamp * C_PTS_PER_SECOND))
+
+    def FindWallClock(self, timestamp: float) -> tuple[SegmentInfo, float]:
+        """Like ``Find`` for a ``time.time()`` timestamp."""
+        lIndex: int = bisect_right(self._startedAt, timestamp) - 1
+        if lIndex < 0 or timestamp > self._segments[lIndex].EndedAt:
+            return None
+
+        lSegment: SegmentInfo = self._segments[lIndex]
+        return lSegment, timestamp - lSegment.StartedAt
+
+    def Path(self, segment: SegmentInfo) -> str:
+        return os.path.join(self._directory, segment.Name)
+
+    def Save(self) -> None:
+        lPath: str = os.path.join(self._directory, C_INDEX_FILE)
+        with open(f"{lPath}.tmp", "w", encoding="utf-8") as lFile:
+            json.dump([asdict(lSegment) for lSegment in self._segments], lFile)
+
+        os.replace(f"{lPath}.tmp", lPath)
+
+    def _find(self, starts: list[int], position: int) -> tuple[SegmentInfo, float]:
+        lIndex: int = bisect_right(starts, position) - 1
+        if lIndex < 0 or position > self._segments[lIndex].End:
+            return None
+
+        lSegment: SegmentInfo = self._segments[lIndex]
+        return lSegment, (position - lSegment.Start) / C_PTS_PER_SECOND
+
+    def _reindex(self) -> None:
+        self._starts = [lSegment.Start for lSegment in self._segments]
+        self._startedAt = [lSegment.StartedAt for lSegment in self._segments]
+
+    # region [PROPERTIES]
+    @property
+    def Segments(self) -> list[SegmentInfo]:
+        return self._segments
+
+    @property
+    def Bytes(self) -> int:
+        return sum(lSegment.Bytes for lSegment in self._segments)
+
+    @property
+    def End(self) -> int:
+        return self._segments[-1].End if self._segments else -C_RESTART_GAP
+
+    # endregion
+
+
+class SegmentRecorder(StreamRecorder):
+    """
+    Continuous recording split into files of about ``segmentDuration`` seconds.
+
+    A segment is only cut on a key frame, so every file starts decodable and plays from zero; a change
+    of the stream configuration cuts one right away. After each cut the oldest finished segments are
+    deleted while the directory holds more than ``maximumSize`` bytes or they ended more than
+    ``retention`` seconds ago, the same way the rotating log handler keeps its backups bounded. The
+    segment just finished is always kept, even when it alone is over ``maximumSize``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segmentDuration: float = C_DEFAULT_SEGMENT_DURATION,
+        maximumSize: int = None,
+        retention: float = None,
+        extension: str = C_DEFAULT_SEGMENT_EXTENSION,
+        prefix: str = C_DEFAULT_SEGMENT_PREFIX,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self._index: SegmentIndex = SegmentIndex(directory)
+        self._segmentDuration: int = int(segmentDuration * C_PTS_PER_SECOND)
+        self._maximumSize: int = maximumSize
+        self._retention: float = retention
+        self._extension: str = extension
+        self._prefix: str = prefix
+        self._segment: SegmentInfo = None
+        self._warnedSize: bool = False
+        self._sequence: int = self._index.Segments[-1].Sequence + 1 if self._index.Segments else 0
+        self._timeOffset: int = self._index.End + C_RESTART_GAP
+        super().__init__(directory)
+
+    def _open(self, path: str, config: bytes, size: tuple[int, int]) -> None:
+        lStartedAt: float = time()
+        lName: str = f"{self._prefix}-{self._sequence:06d}-{datetime.fromtimestamp(lStartedAt).strftime(C_SEGMENT_DATE_FORMAT)}.{self._extension}"
+        self._segment = SegmentInfo(lName, self._sequence, None, None, lStartedAt, lStartedAt)
+        self._sequence += 1
+        super()._open(os.path.join(path, lName), config, size)
+
+    def _onConfigChanged(self, packet: MediaPacket, config: bytes, size: tuple[int, int]) -> None:
+        debug(f"Stream configuration changed, cutting a new segment in {self._path}")
+        self._rotate(config, self._probeSize(packet) or size)
+
+    def _onKeyFrame(self, packet: MediaPacket, config: bytes, size: tuple[int, int]) -> None:
+        if self._segment.Start is not None and self._segment.End - self._segment.Start >= self._segmentDuration:
+            self._rotate(config, size)
+
+    def _rotate(self, config: bytes, size: tuple[int, int]) -> None:
+        self._closeContainer()
+        self._open(self._path, config, size)
+
+    def _timestamp(self, pts: int) -> int:
+        lPosition: int = self._rebase(pts) + self._timeOffset
+        if self._segment.Start is None:
+            self._segment.Start = lPosition
+            self._index.Append(self._segment)
+
+        self._segment.End = lPosition
+        self._segment.EndedAt = time()
+        return lPosition - self._segment.Start
+
+    def _closeContainer(self) -> None:
+        super()._closeContainer()
+        lSegment: SegmentInfo = self._segment
+        if lSegment is None or lSegment.Start is None:
+            return
+
+        self._segment = None
+        try:
+            lSegment.Bytes = os.path.getsize(self._index.Path(lSegment))
+            self._prune(lSegment)
+            self._index.Save()
+
+        except Exception as ex:
+            error(f"Failed to update the segment index of {self._path}", ex)
+
+    def _prune(self, keep: SegmentInfo) -> None:
+        if self._maximumSize is not None and keep.Bytes > self._maximumSize and not self._warnedSize:
+            warning(f"A segment of {keep.Bytes} bytes is over the {self._maximumSize} bytes of {self._path}, only the last one is kept")
+            self._warnedSize = True
+
+        lNow: float = time()
+        while self._index.Segments:
+            lOldest: SegmentInfo = self._index.Segments[0]
+            lTooBig: bool = self._maximumSize is not None and self._index.Bytes > self._maximumSize
+            lTooOld: bool = self._retention is not None and lNow - lOldest.EndedAt > self._retention
+            if not (lTooBig or lTooOld) or lOldest is keep:
+                return
+
+            lPath: str = self._index.Path(lOldest)
+            if os.path.exists(lPath):
+                os.remove(lPath)
+
+            self._index.Remove(lOldest)
+            info(f"Pruned segment {lOldest.Name}")
+
+    # region [PROPERTIES]
+    @property
+    def Index(self) -> SegmentIndex:
+        return self._index
+
+    @property
+    def Segment(self) -> SegmentInfo:
+        return self._segment
+
+    @property
+    def SegmentDuration(self) -> float:
+        return self._segmentDuration / C_PTS_PER_SECOND
+
+    # endregion
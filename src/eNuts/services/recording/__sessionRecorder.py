@@ -0,0 +1,335 @@
+# ==================================================================================
+import json
+import os
+from queue import Empty, SimpleQueue
+from threading import Lock, Thread
+from time import monotonic, time
+
+# ==================================================================================
+from numpy import dtype, empty, memmap, ndarray
+from PySide6.QtCore import Qt
+
+# ==================================================================================
+from jAGFx.logger import error
+
+# ==================================================================================
+from ...scrcpy.writer import ControlWriter
+from ..frames import StreamFrame
+
+C_DEFAULT_CHUNK_ROWS: int = 4096
+C_DEFAULT_FLUSH_INTERVAL: float = 1.0
+C_SESSION_FILE: str = "session.json"
+C_PACKETS_FILE: str = "packets.bin"
+C_TABLE_FRAMES: str = "frames"
+C_TABLE_CONTROLS: str = "controls"
+
+FRAME_DTYPE: dtype = dtype(
+    [
+        ("index", "<u8"),
+        ("pts", "<i8"),
+        ("keyFrame", "u1"),
+        ("receivedAt", "<f8"),
+        ("decodedAt", "<f8"),
+        ("publishedAt", "<f8"),
+    ]
+)
+CONTROL_DTYPE: dtype = dtype(
+    [
+        ("sentAt", "<f8"),
+        ("type", "u1"),
+        ("frameIndex", "<i8"),
+        ("offset", "<u8"),
+        ("length", "<u4"),
+    ]
+)
+
+
+class _Table:
+    def __init__(self, directory: str, name: str, rowType: dtype, chunkRows: int) -> None:
+        self.Directory: str = os.path.join(directory, name)
+        self.RowType: dtype = rowType
+        self.ChunkRows: int = chunkRows
+        self.Chunk: ndarray = empty(chunkRows, dtype=rowType)
+        self.Count: int = 0
+        self.Lock: Lock = Lock()
+        os.makedirs(self.Directory, exist_ok=True)
+        self.Rows: int = self._resume()
+
+    def _resume(self) -> int:
+        """Rows already on disk, columns a crash left longer than the others are cut back so new rows line up."""
+        lPaths: list[str] = [os.path.join(self.Directory, f"{lName}.bin") for lName in self.RowType.names]
+        lRows: int = min((os.path.getsize(lPath) // self.RowType[lName].itemsize if os.path.exists(lPath) else 0 for lName, lPath in zip(self.RowType.names, lPaths)), default=0)
+        for lName, lPath in zip(self.RowType.names, lPaths):
+            if os.path.exists(lPath) and os.path.getsize(lPath) != lRows * self.RowType[lName].itemsize:
+                os.truncate(lPath, lRows * self.RowType[lName].itemsize)
+
+        return lRows
+
+    def Last(self, name: str) -> int:
+        if self.Rows == 0:
+            return None
+
+        return int(memmap(os.path.join(self.Directory, f"{name}.bin"), dtype=self.RowType[name], mode="r", shape=(self.Rows,))[-1])
+
+    def Append(self, row: tuple) -> ndarray:
+        """Adds a row, returns the chunk when it filled up so the caller can queue it."""
+        self.Chunk[self.Count] = row
+        self.Count += 1
+        self.Rows += 1
+        if self.Count < self.ChunkRows:
+            return None
+
+        lFull: ndarray = self.Chunk
+        self.Chunk = empty(self.ChunkRows, dtype=self.RowType)
+        self.Count = 0
+        return lFull
+
+    def Take(self) -> ndarray:
+        lRows: ndarray = self.Chunk[: self.Count].copy()
+        self.Count = 0
+        return lRows
+
+    def Write(self, rows: ndarray) -> None:
+        for lName in self.RowType.names:
+            with open(os.path.join(self.Directory, f"{lName}.bin"), "ab") as lFile:
+                rows[lName].tofile(lFile)
+
+
+class SessionRecorder:
+    """
+    Append-only columnar log of the frames a stream published and the control packets sent to it.
+
+    Every column is a raw little-endian file under ``frames/`` or ``controls/``, so a column of a
+    finished or running session is read with one ``numpy.memmap``; ``session.json`` holds the
+    schema. Control packets go verbatim into ``packets.bin`` and their rows keep offset and length,
+    the send time and the index of the last frame published before them. Rows are collected in memory
+    chunks, full chunks and every ``flushInterval`` the pending rows are written by a background
+    thread, so recording only costs the capturing thread a row copy. A directory that already holds a
+    session is appended to, offsets continue after the packets already in ``packets.bin``.
+    """
+
+    def __init__(self, directory: str, chunkRows: int = C_DEFAULT_CHUNK_ROWS, flushInterval: float = C_DEFAULT_FLUSH_INTERVAL) -> None:
+        self._directory: str = directory
+        self._flushInterval: float = flushInterval
+        os.makedirs(directory, exist_ok=True)
+
+        self._frames: _Table = _Table(directory, C_TABLE_FRAMES, FRAME_DTYPE, chunkRows)
+        self._controls: _Table = _Table(directory, C_TABLE_CONTROLS, CONTROL_DTYPE, chunkRows)
+        self._packets: bytearray = bytearray()
+        lPacketsPath: str = os.path.join(directory, C_PACKETS_FILE)
+        self._packetsOffset: int = os.path.getsize(lPacketsPath) if os.path.exists(lPacketsPath) else 0
+        lLastFrameIndex: int = self._frames.Last("index")
+        self._lastFrameIndex: int = lLastFrameIndex if lLastFrameIndex is not None else -1
+
+        self._service = None
+        self._socket = None
+        self._queue: SimpleQueue = SimpleQueue()
+        self._closed: bool = False
+        self._writeSession({"origin": {"monotonic": monotonic(), "time": time()}}, keep=True)
+        self._thread: Thread = Thread(target=self._run, daemon=True, name=f"Session-{os.path.basename(directory)}")
+        self._thread.start()
+
+    # region [CAPTURE]
+    def Attach(self, service) -> None:
+        """Records the frames published by ``service`` and the control packets sent to it, across restarts."""
+        self.Detach()
+        self._service = service
+        self._writeSession({"serial": getattr(service, "ADBSerial", None), "name": service.Name})
+        service.OnVideoFrame.connect(self.RecordFrame, Qt.ConnectionType.DirectConnection)
+        service.OnStarted.connect(self._observeControl, Qt.ConnectionType.DirectConnection)
+        self._observeControl()
+
+    def Detach(self) -> None:
+        lService = self._service
+        if lService is None:
+            return
+
+        self._service = None
+        lService.OnVideoFrame.disconnect(self.RecordFrame)
+        lService.OnStarted.disconnect(self._observeControl)
+        if self._socket is not None:
+            ControlWriter().Unobserve(self._socket)
+            self._socket = None
+
+    def RecordFrame(self, frame: StreamFrame) -> None:
+        if self._closed or frame.IsRepublished:
+            return
+
+        lIndex: int = frame.Index if frame.Index is not None else self._lastFrameIndex + 1
+        lRow: tuple = (lIndex, frame.Pts if frame.Pts is not None else -1, bool(frame.IsKeyFrame), frame.ReceivedAt or 0.0, frame.DecodedAt or 0.0, frame.PublishedAt or 0.0)
+        with self._frames.Lock:
+            self._lastFrameIndex = lIndex
+            lFull: ndarray = self._frames.Append(lRow)
+
+        if lFull is not None:
+            self._queue.put((self._frames, lFull, None))
+
+    def RecordControl(self, packet: bytes, sentAt: float = None) -> None:
+        if self._closed:
+            return
+
+        lSentAt: float = monotonic() if sentAt is None else sentAt
+        with self._controls.Lock:
+            lLength: int = len(packet)
+            lRow: tuple = (lSentAt, packet[0] if lLength else 0, self._lastFrameIndex, self._packetsOffset, lLength)
+            self._packets += packet
+            self._packetsOffset += lLength
+            lFull: ndarray = self._controls.Append(lRow)
+            if lFull is not None:
+                lPackets, self._packets = self._packets, bytearray()
+                self._queue.put((self._controls, lFull, lPackets))
+
+    def _observeControl(self, *_) -> None:
+        lSocket = self._service.ControlSocket if self._service is not None else None
+        if lSocket is None or lSocket is self._socket:
+            return
+
+        if self._socket is not None:
+            ControlWriter().Unobserve(self._socket)
+
+        self._socket = lSocket
+        ControlWriter().Observe(lSocket, self.RecordControl)
+
+    # endregion
+
+    # region [WRITING]
+    def Flush(self) -> None:
+        """Queues the rows collected so far, they are on disk once the writer thread gets to them."""
+        with self._frames.Lock:
+            lFrames: ndarray = self._frames.Take()
+
+        with self._controls.Lock:
+            lControls: ndarray = self._controls.Take()
+            lPackets, self._packets = self._packets, bytearray()
+
+        if len(lFrames):
+            self._queue.put((self._frames, lFrames, None))
+
+        if len(lControls):
+            self._queue.put((self._controls, lControls, lPackets))
+
+    def Close(self, timeout: float = None) -> None:
+        if self._closed:
+            return
+
+        self.Detach()
+        self.Flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._writeSession({"frames": self._frames.Rows, "controls": self._controls.Rows})
+
+    def _run(self) -> None:
+        while True:
+            try:
+                lItem = self._queue.get(timeout=self._flushInterval)
+
+            except Empty:
+                self.Flush()
+                continue
+
+            if lItem is None:
+                return
+
+            lTable, lRows, lPackets = lItem
+            try:
+                # the packets go first so a row never points past the end of packets.bin
+                if lPackets:
+                    with open(os.path.join(self._directory, C_PACKETS_FILE), "ab") as lFile:
+                        lFile.write(lPackets)
+
+                lTable.Write(lRows)
+
+            except Exception as ex:
+                error(f"Failed to write session log {self._directory}", ex)
+
+    def _writeSession(self, values: dict, keep: bool = False) -> None:
+        """Merges ``values`` into session.json, with ``keep`` the values already there win."""
+        lPath: str = os.path.join(self._directory, C_SESSION_FILE)
+        lSession: dict = {}
+        if os.path.exists(lPath):
+            with open(lPath, "r", encoding="utf-8") as lFile:
+                lSession = json.load(lFile)
+
+        lSession.update({lKey: lValue for lKey, lValue in values.items() if not keep or lKey not in lSession})
+        lSession["schema"] = {
+            C_TABLE_FRAMES: [[lName, FRAME_DTYPE[lName].str] for lName in FRAME_DTYPE.names],
+            C_TABLE_CONTROLS: [[lName, CONTROL_DTYPE[lName].str] for lName in CONTROL_DTYPE.names],
+        }
+        with open(lPath, "w", encoding="utf-8") as lFile:
+            json.dump(lSession, lFile, indent=2)
+
+    # endregion
+
+    # region [PROPERTIES]
+    @property
+    def Directory(self) -> str:
+        return self._directory
+
+    @property
+    def Frames(self) -> int:
+        return self._frames.Rows
+
+    @property
+    def Controls(self) -> int:
+        return self._controls.Rows
+
+    @property
+    def IsClosed(self) -> bool:
+        return self._closed
+
+    # endregion
+
+
+class SessionLog:
+    """Read side of a ``SessionRecorder`` directory, columns are memory mapped and never copied."""
+
+    def __init__(self, directory: str) -> None:
+        self._directory: str = directory
+        with open(os.path.join(directory, C_SESSION_FILE), "r", encoding="utf-8") as lFile:
+            self._session: dict = json.load(lFile)
+
+    def Column(self, table: str, name: str) -> ndarray:
+        lType: dtype = dtype(dict(self._session["schema"][table])[name])
+        lRows: int = self.Rows(table)
+        if lRows == 0:
+            return empty(0, dtype=lType)
+
+        return memmap(os.path.join(self._directory, table, f"{name}.bin"), dtype=lType, mode="r", shape=(lRows,))
+
+    def Rows(self, table: str) -> int:
+        """Rows every column of the table has, a running recorder may have written some columns further."""
+        lRows: list[int] = []
+        for lName, lType in self._session["schema"][table]:
+            lPath: str = os.path.join(self._directory, table, f"{lName}.bin")
+            lRows.append(os.path.getsize(lPath) // dtype(lType).itemsize if os.path.exists(lPath) else 0)
+
+        return min(lRows, default=0)
+
+    def Frames(self, name: str) -> ndarray:
+        return self.Column(C_TABLE_FRAMES, name)
+
+    def Controls(self, name: str) -> ndarray:
+        return self.Column(C_TABLE_CONTROLS, name)
+
+    def Packet(self, row: int) -> bytes:
+        lOffset: int = int(self.Controls("offset")[row])
+        lLength: int = int(self.Controls("length")[row])
+        with open(os.path.join(self._directory, C_PACKETS_FILE), "rb") as lFile:
+            lFile.seek(lOffset)
+            return lFile.read(lLength)
+
+    # region [PROPERTIES]
+    @property
+    def Session(self) -> dict:
+        return self._session
+
+    @property
+    def FrameCount(self) -> int:
+        return self.Rows(C_TABLE_FRAMES)
+
+    @property
+    def ControlCount(self) -> int:
+        return self.Rows(C_TABLE_CONTROLS)
+
+    # endregion
@@ -0,0 +1,211 @@
+# ==================================================================================
+import os
+from fractions import Fraction
+from queue import SimpleQueue
+from threading import Thread
+
+# ==================================================================================
+import av
+from av.container import OutputContainer
+from av.video.stream import VideoStream
+
+# ==================================================================================
+from jAGFx.logger import debug, error, warning
+
+# ==================================================================================
+from ...scrcpy.stream import MediaPacket
+from .__packetSink import PacketSink
+
+C_PTS_TIME_BASE: Fraction = Fraction(1, 1_000_000)
+C_RESTART_GAP: int = 16_667
+C_CODEC_NAME: str = "h264"
+
+
+class StreamRecorder(PacketSink):
+    """
+    Stream-copies the H.264 packets of a scrcpy stream into a container file, nothing is re-encoded.
+
+    The container is picked from the extension (``.mp4``, ``.mkv``, ...). Writing starts on the first
+    key frame, with the SPS/PPS as the stream's extradata, and timestamps are the device PTS rebased
+    to that frame. When the device restarts its encoder, PTS begin again from zero; the recording
+    continues one frame after the last packet instead of going backwards. A container can not change
+    its frame size, so when the device rotates or resizes the recording goes on in a new file next to
+    the first one, ``name-1.mp4``, ``name-2.mp4``, ... with the timestamps still continuous; ``Files``
+    lists them. Muxing runs on the recorder's own thread, ``Write`` only queues.
+    """
+
+    def __init__(self, path: str, containerFormat: str = None) -> None:
+        self._path: str = path
+        self._containerFormat: str = containerFormat
+        self._queue: SimpleQueue = SimpleQueue()
+        self._container: OutputContainer = None
+        self._stream: VideoStream = None
+        self._files: list[str] = []
+        self._size: tuple[int, int] = None
+        self._config: bytes = None
+        self._origin: int = None
+        self._lastPts: int = -1
+        self._packets: int = 0
+        self._skipped: int = 0
+        self._bytes: int = 0
+        self._closed: bool = False
+        self._thread: Thread = Thread(target=self._run, daemon=True, name=f"Recorder-{os.path.basename(path)}")
+        self._thread.start()
+
+    def Write(self, packet: MediaPacket, config: bytes, size: tuple[int, int]) -> None:
+        if not self._closed:
+            self._queue.put((packet, config, size))
+
+    def Close(self, timeout: float = None) -> None:
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            while (lItem := self._queue.get()) is not None:
+                lPacket, lConfig, lSize = lItem
+                if self._container is None:
+                    if not lPacket.IsKeyFrame:
+                        self._skipped += 1
+                        continue
+
+                    self._open(self._path, lConfig, lSize)
+
+                elif lConfig != self._config:
+                    self._onConfigChanged(lPacket, lConfig, lSize)
+
+                elif lPacket.IsKeyFrame:
+                    self._onKeyFrame(lPacket, lConfig, lSize)
+
+                self._mux(lPacket)
+
+        except Exception as ex:
+            error(f"Recording to {self._path} failed", ex)
+
+        finally:
+            self._closeContainer()
+
+    def _open(self, path: str, config: bytes, size: tuple[int, int]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._container = av.open(path, "w", format=self._containerFormat)
+        self._stream = self._container.add_stream(C_CODEC_NAME)
+        self._stream.width, self._stream.height = size
+        self._stream.time_base = C_PTS_TIME_BASE
+        if config:
+            self._stream.codec_context.extradata = config
+
+        self._files.append(path)
+        self._size = tuple(size)
+        self._config = config
+        debug(f"Recording {size[0]}x{size[1]} to {path}")
+
+    def _onConfigChanged(self, packet: MediaPacket, config: bytes, size: tuple[int, int]) -> None:
+        # the handshake size is not sent again when the device rotates, the new SPS is the only source
+        size = self._probeSize(packet) or size
+        if tuple(size) != self._size:
+            lRoot, lExtension = os.path.splitext(self._path)
+            lPath: str = f"{lRoot}-{len(self._files)}{lExtension}"
+            warning(f"Stream size changed to {size[0]}x{size[1]}, recording continues in {lPath}")
+            self._closeContainer()
+            self._open(lPath, config, size)
+            return
+
+        # the key frame after a reconfiguration carries its SPS/PPS in-band, so the file stays decodable
+        warning(f"Stream configuration changed while recording to {self._path}")
+        self._config = config
+
+    def _probeSize(self, packet: MediaPacket) -> tuple[int, int]:
+        """Frame size of a key frame that carries its SPS/PPS, decoded once on a throwaway context."""
+        if not packet.IsKeyFrame:
+            return None
+
+        try:
+            lCodec: av.CodecContext = av.CodecContext.create(C_CODEC_NAME, "r")
+            lFrames: list[av.VideoFrame] = [*lCodec.decode(packet.ToPacket()), *lCodec.decode(None)]
+            return (lFrames[0].width, lFrames[0].height) if lFrames else None
+
+        except av.FFmpegError as ex:
+            warning(f"Could not read the frame size of a key frame: {ex}")
+            return None
+
+    def _onKeyFrame(self, packet: MediaPacket, config: bytes, size: tuple[int, int]) -> None:
+        pass
+
+    def _mux(self, packet: MediaPacket) -> None:
+        lPacket: av.Packet = packet.ToPacket()
+        lPacket.stream = self._stream
+        lPacket.pts = lPacket.dts = self._timestamp(packet.Pts)
+        lPacket.time_base = C_PTS_TIME_BASE
+        self._container.mux(lPacket)
+        self._packets += 1
+        self._bytes += len(packet.Data)
+
+    def _timestamp(self, pts: int) -> int:
+        return self._rebase(pts)
+
+    def _rebase(self, pts: int) -> int:
+        if self._origin is None:
+            self._origin = pts
+
+        lPts: int = pts - self._origin
+        if lPts <= self._lastPts:
+            self._origin = pts - self._lastPts - C_RESTART_GAP
+            lPts = self._lastPts + C_RESTART_GAP
+
+        self._lastPts = lPts
+        return lPts
+
+    def _closeContainer(self) -> None:
+        if self._container is None:
+            return
+
+        try:
+            self._container.close()
+            debug(f"Recorded {self._packets} packets to {self._files[-1]}")
+
+        except Exception as ex:
+            error(f"Failed to finalise {self._files[-1]}", ex)
+
+        self._container = None
+        self._stream = None
+
+    # region [PROPERTIES]
+    @property
+    def Path(self) -> str:
+        return self._path
+
+    @property
+    def Files(self) -> list[str]:
+        """Files written so far, more than one when the frame size changed during the recording."""
+        return self._files
+
+    @property
+    def Packets(self) -> int:
+        return self._packets
+
+    @property
+    def Skipped(self) -> int:
+        """Packets dropped while waiting for the first key frame."""
+        return self._skipped
+
+    @property
+    def Bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def Duration(self) -> float:
+        return max(self._lastPts, 0) * float(C_PTS_TIME_BASE)
+
+    @property
+    def IsRecording(self) -> bool:
+        return self._container is not None
+
+    @property
+    def IsClosed(self) -> bool:
+        return self._closed
+
+    # endregion
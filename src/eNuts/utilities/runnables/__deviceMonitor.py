@@ -1,72 +1,144 @@
-from threading import Lock, Thread
-from time import sleep
+from random import uniform
+from threading import Event, Lock, Thread
 
-from adbutils import AdbDevice, adb
-from jAGFx.logger import warning
+from adbutils import AdbClient, AdbConnection, AdbDevice, adb
+from jAGFx.logger import debug, warning
 from jAGFx.singleton import SingletonF
-from PySide6.QtCore import QObject, QThread, Signal
-from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, Signal
+
+C_TRACK_COMMAND: str = "host:track-devices"
+C_ONLINE: str = "device"
+C_MIN_BACKOFF: float = 0.5
+C_MAX_BACKOFF: float = 30.0
+C_BACKOFF_JITTER: float = 0.25
 
 
 @SingletonF
 class DeviceMonitor(QObject):
+    """
+    Follows the adb server's ``track-devices`` stream, every block it sends is the complete device list.
+
+    Only devices in the ``device`` state count as connected, the signals fire on changes of that set.
+    When tracking fails the monitor polls the device list instead, waiting an exponentially growing
+    and jittered delay before it retries tracking, and goes back to streaming once it succeeds.
+    """
+
     OnDeviceAdded: Signal = Signal(AdbDevice)
     OnDeviceRemoved: Signal = Signal(AdbDevice)
 
-    def __init__(self) -> None:
+    def __init__(self, client: AdbClient = None, minBackoff: float = C_MIN_BACKOFF, maxBackoff: float = C_MAX_BACKOFF) -> None:
         super().__init__()
+        self._client: AdbClient = client or adb
+        self._minBackoff: float = minBackoff
+        self._maxBackoff: float = maxBackoff
+        self._backoff: float = minBackoff
+
         self._enderLock: Lock = Lock()
         self._ender: object = None
-        self._thread: Thread = Thread(target=self._run, daemon=True)
+        self._stopped: Event = Event()
+        self._thread: Thread = None
+        self._connection: AdbConnection = None
+        self._devices: dict[str, AdbDevice] = dict[str, AdbDevice]()
 
     @property
     def Ender(self) -> object:
         with self._enderLock:
             return self._ender
 
-    def _run(self):
-        lDevices: dict[str, AdbDevice] = dict[str, AdbDevice]()
-        lAppIns: QApplication = QApplication.instance()
+    @property
+    def Client(self) -> AdbClient:
+        return self._client
+
+    @property
+    def Devices(self) -> list[AdbDevice]:
+        return list(self._devices.values())
+
+    @property
+    def Backoff(self) -> float:
+        return self._backoff
 
+    def _run(self):
         while self.Ender is not None:
             try:
-                lNewList: dict[str, AdbDevice] = {device.serial: device for device in adb.device_list()}
-                lMarkedRemove: list[AdbDevice] = list[AdbDevice]()
-
-                for srl in lDevices:
-                    if srl not in lNewList:
-                        lMarkedRemove.append(lDevices[srl])
+                self._track()
 
-                for srl in lNewList.keys():
-                    if srl not in lDevices:
-                        _device: AdbDevice = lNewList[srl]
-                        if _device is not None:
-                            lDevices.update({srl: _device})
-                            self.OnDeviceAdded.emit(_device)
+            except Exception as ex:
+                if self.Ender is None:
+                    break
 
-                for device in lMarkedRemove:
-                    self.OnDeviceRemoved.emit(lDevices.pop(device.serial))
+                warning("Device tracking failed, polling the device list", ex)
 
-                if lAppIns is not None:
-                    lAppIns.processEvents()
+            if self.Ender is None:
+                break
 
-            except KeyboardInterrupt:
-                with self._enderLock:
-                    self._ender = None
+            try:
+                self._apply({lDevice.serial for lDevice in self._client.device_list()})
 
             except Exception as ex:
-                warning("Error occur in device monitor, pausing monitor for 3 seconds", ex)
-                sleep(3)
+                warning("Error occur in device monitor", ex)
+
+            self._stopped.wait(self._nextBackoff())
+
+    def _track(self):
+        with self._client.make_connection() as lConnection:
+            self._connection = lConnection
+            try:
+                lConnection.send_command(C_TRACK_COMMAND)
+                lConnection.check_okay()
+                self._backoff = self._minBackoff
+                debug("Tracking adb devices")
+
+                while self.Ender is not None:
+                    self._apply(self._parse(lConnection.read_string_block()))
+
+            finally:
+                self._connection = None
+
+    @staticmethod
+    def _parse(output: str) -> set[str]:
+        lOnline: set[str] = set()
+        for lLine in output.splitlines():
+            lFields: list[str] = lLine.strip().split("\t", maxsplit=1)
+            if len(lFields) == 2 and lFields[1] == C_ONLINE:
+                lOnline.add(lFields[0])
+
+        return lOnline
+
+    def _apply(self, online: set[str]):
+        for srl in [srl for srl in self._devices if srl not in online]:
+            self.OnDeviceRemoved.emit(self._devices.pop(srl))
+
+        for srl in online:
+            if srl not in self._devices:
+                lDevice: AdbDevice = self._client.device(serial=srl)
+                self._devices[srl] = lDevice
+                self.OnDeviceAdded.emit(lDevice)
+
+    def _nextBackoff(self) -> float:
+        lDelay: float = self._backoff * uniform(1.0 - C_BACKOFF_JITTER, 1.0 + C_BACKOFF_JITTER)
+        self._backoff = min(self._backoff * 2.0, self._maxBackoff)
+        return lDelay
 
     def start(self):
-        if self.Ender is None:
-            self._ender: object = object()
-            self._thread.start()
-            return
+        with self._enderLock:
+            if self._ender is None:
+                self._ender = object()
+                self._stopped.clear()
+                self._thread = Thread(target=self._run, daemon=True, name="DeviceMonitor")
+                self._thread.start()
+                return
 
         warning("Already running...")
 
     def stop(self):
         with self._enderLock:
             self._ender = None
-            self._thread.join(0.01)
+            self._stopped.set()
+
+        # unblocks the tracking read
+        lConnection: AdbConnection = self._connection
+        if lConnection is not None:
+            lConnection.close()
+
+        if self._thread is not None:
+            self._thread.join(1.0)
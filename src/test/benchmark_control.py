@@ -0,0 +1,50 @@
+# ==================================================================================
+import struct
+from timeit import timeit
+
+# ==================================================================================
+from eNuts.scrcpy import const
+from eNuts.scrcpy.protocol import ControlMessageBuilder
+
+C_ITERATIONS: int = 200000
+
+
+def legacyTouch(x: int, y: int) -> bytes:
+    lPackage = struct.pack(">BqiiHHHii", const.ACTION_MOVE, 0x1234567887654321, x, y, 1080, 1920, 0xFFFF, 1, 1)
+    return struct.pack(">B", const.TYPE_INJECT_TOUCH_EVENT) + lPackage
+
+
+def legacyKeycode(keycode: int) -> bytes:
+    return struct.pack(">B", const.TYPE_INJECT_KEYCODE) + struct.pack(">Biii", const.ACTION_DOWN, keycode, 0, 0)
+
+
+def legacyText(text: str) -> bytes:
+    lBuffer = text.encode("utf-8")
+    return struct.pack(">B", const.TYPE_INJECT_TEXT) + struct.pack(">i", len(lBuffer)) + lBuffer
+
+
+def main() -> None:
+    lBuilder: ControlMessageBuilder = ControlMessageBuilder()
+    lCases: dict[str, tuple] = {
+        "touch": (
+            lambda: legacyTouch(10, 20),
+            lambda: lBuilder.Touch(const.ACTION_MOVE, 0x1234567887654321, 10, 20, 1080, 1920),
+        ),
+        "keycode": (
+            lambda: legacyKeycode(const.KEYCODE_HOME),
+            lambda: lBuilder.Keycode(const.ACTION_DOWN, const.KEYCODE_HOME),
+        ),
+        "text": (
+            lambda: legacyText("hello"),
+            lambda: lBuilder.Text("hello"),
+        ),
+    }
+
+    for lName, (lLegacy, lBuilt) in lCases.items():
+        lLegacyTime: float = timeit(lLegacy, number=C_ITERATIONS) / C_ITERATIONS * 1e9
+        lBuiltTime: float = timeit(lBuilt, number=C_ITERATIONS) / C_ITERATIONS * 1e9
+        print(f"{lName:8} legacy {lLegacyTime:7.1f} ns  builder {lBuiltTime:7.1f} ns  x{lLegacyTime / lBuiltTime:.2f}")
+
+
+if __name__ == "__main__":
+    main()
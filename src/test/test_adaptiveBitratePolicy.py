@@ -0,0 +1,88 @@
+# ==================================================================================
+import unittest
+
+# ==================================================================================
+from eNuts.services.policies import AdaptiveBitratePolicy, EncoderSettings, StreamStatistics
+
+# at 60 fps a frame lasts 16.7 ms: over 10 ms of decoding is too slow, under 4.2 ms is headroom;
+# at 24 fps the frame lasts 41.7 ms and only over 25 ms is too slow
+C_SLOW: float = 12.0
+C_BUSY: float = 6.0
+C_IDLE: float = 2.0
+
+
+def settings(size: int = 1600, fps: int = 60, bitRate: int = 8_000_000) -> EncoderSettings:
+    return EncoderSettings(size, fps, bitRate)
+
+
+def values(encoder: EncoderSettings) -> tuple[int, int, int]:
+    return (encoder.MaxSize, encoder.MaxFPS, encoder.BitRate) if encoder is not None else None
+
+
+class TestAdaptiveBitratePolicy(unittest.TestCase):
+    def test_single_evaluation(self):
+        lCases = [
+            # name, settings, statistics, expected settings
+            ("decode bound shrinks the size", settings(), dict(DecodeTime=C_SLOW), (1200, 60, 8_000_000)),
+            ("size at its minimum lowers the rate", settings(480), dict(DecodeTime=C_SLOW), (480, 45, 8_000_000)),
+            ("size and rate at minimum lower the bit rate", settings(480, 24), dict(DecodeTime=30.0), (480, 24, 6_000_000)),
+            ("nothing left to lower", settings(480, 24, 1_000_000), dict(DecodeTime=30.0), None),
+            ("backed up ring lowers the bit rate", settings(), dict(RingDepth=5, RingCapacity=8), (1600, 60, 6_000_000)),
+            ("dropped frames lower the bit rate", settings(), dict(Dropped=3, RingCapacity=8), (1600, 60, 6_000_000)),
+            ("backlog at minimum bit rate lowers the rate", settings(bitRate=1_000_000), dict(Dropped=1), (1600, 45, 1_000_000)),
+            ("bit rate steps down from the policy maximum", settings(bitRate=1_000_000_000), dict(Dropped=1), (1600, 60, 12_000_000)),
+            ("busy but in budget", settings(), dict(DecodeTime=C_BUSY, RingDepth=2, RingCapacity=8), None),
+            ("one quiet interval is not enough", settings(), dict(DecodeTime=C_IDLE), None),
+        ]
+        for lName, lSettings, lStatistics, lExpected in lCases:
+            with self.subTest(lName):
+                lPolicy = AdaptiveBitratePolicy()
+                self.assertEqual(values(lPolicy.Evaluate(StreamStatistics(lSettings, **lStatistics), 0.0)), lExpected)
+
+    def test_step_up_stays_under_ceiling(self):
+        lPolicy = AdaptiveBitratePolicy(cooldown=10.0, headroomIntervals=3)
+        lCurrent = settings()
+        lSteps = [
+            # now, decode time, expected settings, None when unchanged
+            (0.0, C_SLOW, (1200, 60, 8_000_000)),
+            (5.0, C_SLOW, None),
+            (11.0, C_SLOW, (896, 60, 8_000_000)),
+            (22.0, C_IDLE, None),
+            (24.0, C_IDLE, None),
+            (26.0, C_IDLE, (1200, 60, 8_000_000)),
+            (37.0, C_IDLE, None),
+            (39.0, C_IDLE, None),
+            (41.0, C_IDLE, (1600, 60, 8_000_000)),
+            # the starting settings are the ceiling, no amount of headroom goes above them
+            (52.0, C_IDLE, None),
+            (54.0, C_IDLE, None),
+            (56.0, C_IDLE, None),
+        ]
+        for lNow, lDecodeTime, lExpected in lSteps:
+            with self.subTest(now=lNow):
+                lNext = lPolicy.Evaluate(StreamStatistics(lCurrent, DecodeTime=lDecodeTime), lNow)
+                self.assertEqual(values(lNext), lExpected)
+                lCurrent = lNext or lCurrent
+
+        self.assertEqual(values(lPolicy.Ceiling), (1600, 60, 8_000_000))
+
+    def test_busy_interval_resets_headroom(self):
+        lPolicy = AdaptiveBitratePolicy(cooldown=0.0, headroomIntervals=2)
+        lStart = lPolicy.Evaluate(StreamStatistics(settings(), DecodeTime=C_SLOW), 0.0)
+        lResults = [lPolicy.Evaluate(StreamStatistics(lStart, DecodeTime=lDecodeTime), lNow) for lNow, lDecodeTime in ((1.0, C_IDLE), (2.0, C_BUSY), (3.0, C_IDLE), (4.0, C_IDLE))]
+        self.assertEqual([values(lResult) for lResult in lResults], [None, None, None, (1600, 60, 8_000_000)])
+
+    def test_dropped_counter_is_cumulative(self):
+        lPolicy = AdaptiveBitratePolicy(cooldown=0.0)
+        lFirst = lPolicy.Evaluate(StreamStatistics(settings(), Dropped=4, DecodeTime=C_BUSY), 0.0)
+        self.assertEqual(values(lFirst), (1600, 60, 6_000_000))
+        # the same total is no new drop
+        self.assertIsNone(lPolicy.Evaluate(StreamStatistics(lFirst, Dropped=4, DecodeTime=C_BUSY), 1.0))
+
+        lPolicy.Reset()
+        self.assertIsNone(lPolicy.Ceiling)
+        self.assertEqual(values(lPolicy.Evaluate(StreamStatistics(lFirst, Dropped=4, DecodeTime=C_BUSY), 2.0)), (1600, 60, 4_500_000))
+
+
+if __name__ == "__main__":
+    unittest.main()
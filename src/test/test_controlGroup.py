@@ -0,0 +1,106 @@
+# ==================================================================================
+import socket
+import unittest
+
+# ==================================================================================
+import numpy as np
+from PySide6.QtCore import QSize
+
+# ==================================================================================
+from eNuts.scrcpy import const
+from eNuts.scrcpy.group import ControlGroup
+from eNuts.scrcpy.protocol import C_SCROLL_NORMALISER, SCROLL_DTYPE, TOUCH_DTYPE, ControlMessageBuilder, toI16FixedPoint
+
+C_REFERENCE: tuple[int, int] = (1000, 2000)
+C_SIZES: list[tuple[int, int]] = [(1000, 2000), (500, 1000), (1080, 2400), (720, 1280)]
+
+
+class FakeDevice:
+    def __init__(self, width: int, height: int) -> None:
+        self.Resolution: QSize = QSize(width, height)
+        self.ControlSocket, self.Remote = socket.socketpair()
+        self.Remote.settimeout(5.0)
+
+    def Receive(self, dtype: np.dtype, count: int = 1) -> np.ndarray:
+        lData = bytearray()
+        while len(lData) < count * dtype.itemsize:
+            lData += self.Remote.recv(0x10000)
+
+        return np.frombuffer(bytes(lData), dtype=dtype)
+
+    def Close(self) -> None:
+        self.ControlSocket.close()
+        self.Remote.close()
+
+
+class TestControlGroup(unittest.TestCase):
+    def setUp(self):
+        self._devices = [FakeDevice(*lSize) for lSize in C_SIZES]
+        self._group = ControlGroup(self._devices, reference=C_REFERENCE)
+
+    def tearDown(self):
+        for lDevice in self._devices:
+            lDevice.Close()
+
+    def expected(self, x: float, y: float) -> list[tuple[int, int]]:
+        return [
+            (min(max(round(x * lWidth / C_REFERENCE[0]), 0), lWidth - 1), min(max(round(y * lHeight / C_REFERENCE[1]), 0), lHeight - 1))
+            for lWidth, lHeight in C_SIZES
+        ]
+
+    def test_touch_rescaled_per_member(self):
+        # inside, past the bottom right corner and before the top left one
+        for lX, lY in [(400, 1500), (1200, 2100), (-50, -10)]:
+            with self.subTest(x=lX, y=lY):
+                self._group.touch(lX, lY, const.ACTION_DOWN, touch_id=7).result(5.0)
+                lRows = [lDevice.Receive(TOUCH_DTYPE)[0] for lDevice in self._devices]
+
+                self.assertEqual([(int(lRow["x"]), int(lRow["y"])) for lRow in lRows], self.expected(lX, lY))
+                self.assertEqual([(int(lRow["width"]), int(lRow["height"])) for lRow in lRows], C_SIZES)
+                for lRow in lRows:
+                    self.assertEqual((lRow["type"], lRow["action"], lRow["pointerId"]), (const.TYPE_INJECT_TOUCH_EVENT, const.ACTION_DOWN, 7))
+
+    def test_scroll_rescaled_per_member(self):
+        self._group.scroll(250, 500, 2.0, -4.0).result(5.0)
+        lRows = [lDevice.Receive(SCROLL_DTYPE)[0] for lDevice in self._devices]
+
+        self.assertEqual([(int(lRow["x"]), int(lRow["y"])) for lRow in lRows], self.expected(250, 500))
+        self.assertEqual([(int(lRow["width"]), int(lRow["height"])) for lRow in lRows], C_SIZES)
+        for lRow in lRows:
+            self.assertEqual(lRow["type"], const.TYPE_INJECT_SCROLL_EVENT)
+            self.assertEqual(int(lRow["hScroll"]), toI16FixedPoint(2.0 / C_SCROLL_NORMALISER))
+            self.assertEqual(int(lRow["vScroll"]), toI16FixedPoint(-4.0 / C_SCROLL_NORMALISER))
+
+    def test_keycode_same_bytes(self):
+        lExpected: bytes = bytes(ControlMessageBuilder().Keycode(const.ACTION_UP, const.KEYCODE_HOME, 0))
+        lFlushed: dict = self._group.keycode(const.KEYCODE_HOME, const.ACTION_UP).result(5.0)
+
+        self.assertEqual(len(lFlushed), len(self._devices))
+        for lDevice in self._devices:
+            self.assertEqual(lDevice.Remote.recv(len(lExpected)), lExpected)
+
+    def test_default_reference_and_skipped_member(self):
+        lBlank = FakeDevice(0, 0)
+        try:
+            lGroup = ControlGroup([self._devices[1], lBlank, self._devices[2]])
+            self.assertEqual(lGroup.ScreenSize, C_SIZES[1])
+            self.assertEqual(lGroup.Targets, 2)
+
+            # the first member's own coordinates go through unchanged
+            lGroup.touch(100, 300).result(5.0)
+            lRow = self._devices[1].Receive(TOUCH_DTYPE)[0]
+            self.assertEqual((int(lRow["x"]), int(lRow["y"])), (100, 300))
+
+        finally:
+            lBlank.Close()
+
+    def test_reference_change(self):
+        self._group.Reference = (500, 1000)
+        self._group.touch(100, 100).result(5.0)
+        lRows = [lDevice.Receive(TOUCH_DTYPE)[0] for lDevice in self._devices]
+
+        self.assertEqual([(int(lRow["x"]), int(lRow["y"])) for lRow in lRows], [(200, 200), (100, 100), (216, 240), (144, 128)])
+
+
+if __name__ == "__main__":
+    unittest.main()
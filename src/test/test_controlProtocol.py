@@ -0,0 +1,60 @@
+# ==================================================================================
+import struct
+import unittest
+
+# ==================================================================================
+from numpy import zeros
+
+# ==================================================================================
+from eNuts.scrcpy import const
+from eNuts.scrcpy.protocol import SCROLL_DTYPE, TOUCH_DTYPE, ControlMessageBuilder, validateWireFormat
+
+
+class TestControlProtocol(unittest.TestCase):
+    def setUp(self):
+        self._builder = ControlMessageBuilder()
+
+    def test_wire_format(self):
+        validateWireFormat()
+
+    def test_touch_matches_legacy_packing(self):
+        lLegacy = struct.pack(">B", const.TYPE_INJECT_TOUCH_EVENT) + struct.pack(
+            ">BqiiHHHii", const.ACTION_MOVE, 0x1234567887654321, 10, 20, 1080, 1920, 0xFFFF, 1, 1
+        )
+        lPacked = self._builder.Touch(const.ACTION_MOVE, 0x1234567887654321, 10, 20, 1080, 1920)
+        self.assertEqual(bytes(lPacked), lLegacy)
+
+    def test_scroll_uses_fixed_point(self):
+        lPacked = bytes(self._builder.Scroll(1, 2, 100, 200, 16.0, -8.0))
+        self.assertEqual(len(lPacked), const.MESSAGE_SIZE_INJECT_SCROLL_EVENT)
+        self.assertEqual(struct.unpack(">BiiHHhhI", lPacked)[5:7], (0x7FFF, -0x4000))
+
+    def test_set_clipboard_layout(self):
+        lPacked = bytes(self._builder.SetClipboard("hé", paste=True, sequence=7))
+        self.assertEqual(lPacked[:14], struct.pack(">BQ?I", const.TYPE_SET_CLIPBOARD, 7, True, 3))
+        self.assertEqual(lPacked[14:].decode("utf-8"), "hé")
+
+    def test_text_is_truncated_on_character_boundary(self):
+        lPacked = bytes(self._builder.Text("é" * 200))
+        (lLength,) = struct.unpack(">I", lPacked[1:5])
+        self.assertEqual(lLength, const.INJECT_TEXT_MAX_LENGTH)
+        self.assertEqual(lPacked[5:].decode("utf-8"), "é" * 150)
+
+    def test_views_survive_buffer_growth(self):
+        lShort = self._builder.Text("a")
+        lLong = self._builder.SetClipboard("b" * 1000)
+        self.assertEqual(len(lLong), 1014)
+        self.assertEqual(bytes(lShort), b"\x01\x00\x00\x00\x01a")
+
+    def test_structured_rows_match_builder(self):
+        lTouch = zeros(1, dtype=TOUCH_DTYPE)
+        lTouch[0] = (const.TYPE_INJECT_TOUCH_EVENT, const.ACTION_MOVE, 0x1234567887654321, 10, 20, 1080, 1920, 0xFFFF, 1, 1)
+        self.assertEqual(lTouch.tobytes(), bytes(self._builder.Touch(const.ACTION_MOVE, 0x1234567887654321, 10, 20, 1080, 1920)))
+
+        lScroll = zeros(1, dtype=SCROLL_DTYPE)
+        lScroll[0] = (const.TYPE_INJECT_SCROLL_EVENT, 1, 2, 100, 200, 0x7FFF, -0x4000, 0)
+        self.assertEqual(lScroll.tobytes(), bytes(self._builder.Scroll(1, 2, 100, 200, 16.0, -8.0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
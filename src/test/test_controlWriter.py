@@ -0,0 +1,155 @@
+# ==================================================================================
+import socket
+import time
+import unittest
+
+# ==================================================================================
+import numpy as np
+
+# ==================================================================================
+from eNuts.scrcpy import const
+from eNuts.scrcpy.protocol import TOUCH_DTYPE, ControlMessageBuilder
+from eNuts.scrcpy.writer import ControlWriter
+
+C_SIZE: tuple[int, int] = (1080, 1920)
+BUILDER: ControlMessageBuilder = ControlMessageBuilder()
+
+
+def touch(action: int, x: int, y: int = 0) -> bytes:
+    return bytes(BUILDER.Touch(action, -1, x, y, *C_SIZE))
+
+
+def receive(sock: socket.socket, count: int) -> bytes:
+    lData = bytearray()
+    while len(lData) < count:
+        lChunk: bytes = sock.recv(0x10000)
+        if not lChunk:
+            break
+
+        lData += lChunk
+
+    return bytes(lData)
+
+
+class TestControlWriter(unittest.TestCase):
+    def setUp(self):
+        # an isolated instance, the singleton is shared with every device
+        self.writer = ControlWriter.__wrapped__(tick=0.2)
+        self.local, self.remote = socket.socketpair()
+        self.remote.settimeout(5.0)
+
+    def tearDown(self):
+        self.local.close()
+        self.remote.close()
+
+    def test_moves_coalesce_in_order(self):
+        lPackets: list[bytes] = [
+            touch(const.ACTION_DOWN, 1),
+            touch(const.ACTION_MOVE, 2),
+            touch(const.ACTION_MOVE, 3),
+            touch(const.ACTION_MOVE, 4),
+            touch(const.ACTION_UP, 5),
+            touch(const.ACTION_MOVE, 6),
+            touch(const.ACTION_MOVE, 7),
+        ]
+        lKeys: list = [None, "move", "move", "move", None, "move", "move"]
+        for lPacket, lKey in zip(lPackets, lKeys):
+            self.writer.Send(self.local, lPacket, lKey)
+
+        lWire = np.frombuffer(receive(self.remote, 4 * TOUCH_DTYPE.itemsize), dtype=TOUCH_DTYPE)
+
+        # the latest position of each run of moves wins, the packets around it keep their place
+        self.assertEqual(lWire["action"].tolist(), [const.ACTION_DOWN, const.ACTION_MOVE, const.ACTION_UP, const.ACTION_MOVE])
+        self.assertEqual(lWire["x"].tolist(), [1, 4, 5, 7])
+        self.assertEqual(self.writer.Packets, 4)
+        self.assertEqual(self.writer.Coalesced, 3)
+
+    def test_different_length_is_not_coalesced(self):
+        lKeycode: bytes = bytes(BUILDER.Keycode(const.ACTION_DOWN, 4, 0))
+        lMove: bytes = touch(const.ACTION_MOVE, 1)
+        self.writer.Send(self.local, lMove, "key")
+        self.writer.Send(self.local, lKeycode, "key")
+
+        self.assertEqual(receive(self.remote, len(lMove) + len(lKeycode)), lMove + lKeycode)
+        self.assertEqual(self.writer.Coalesced, 0)
+
+    def test_immediate_is_not_coalesced(self):
+        lFutures = [self.writer.Send(self.local, touch(const.ACTION_MOVE, lX), "move", immediate=True) for lX in range(5)]
+        lWire = np.frombuffer(receive(self.remote, 5 * TOUCH_DTYPE.itemsize), dtype=TOUCH_DTYPE)
+
+        self.assertEqual(lWire["x"].tolist(), list(range(5)))
+        self.assertEqual(self.writer.Coalesced, 0)
+        for lFuture in lFutures:
+            self.assertIn(self.local, lFuture.result(timeout=5.0))
+
+    def test_partial_sends_on_non_blocking_socket(self):
+        self.local.setblocking(False)
+        self.local.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        lPayload: bytes = bytes(range(256)) * 4096
+
+        lFuture = self.writer.Send(self.local, lPayload, immediate=True)
+        # nothing is read for a while so the socket buffer fills up and send() comes back short
+        time.sleep(0.1)
+        self.assertFalse(lFuture.done())
+
+        self.assertEqual(receive(self.remote, len(lPayload)), lPayload)
+        self.assertIn(self.local, lFuture.result(timeout=5.0))
+        self.assertEqual(self.writer.Bytes, len(lPayload))
+
+    def test_send_many_ticket(self):
+        lOther, lOtherRemote = socket.socketpair()
+        lClosed, lClosedRemote = socket.socketpair()
+        lClosedRemote.close()
+        try:
+            lPacket: bytes = touch(const.ACTION_DOWN, 1)
+            lBefore: float = time.monotonic()
+            lFlushed = self.writer.SendMany([(self.local, lPacket), (lOther, lPacket), (lClosed, lPacket)]).result(timeout=5.0)
+
+            self.assertEqual(set(lFlushed), {self.local, lOther})
+            for lFlushedAt in lFlushed.values():
+                self.assertGreaterEqual(lFlushedAt, lBefore)
+
+            self.assertEqual(receive(self.remote, len(lPacket)), lPacket)
+            self.assertEqual(self.writer.SendMany([]).result(timeout=5.0), {})
+
+        finally:
+            lOther.close()
+            lOtherRemote.close()
+            lClosed.close()
+
+    def test_discard_resolves_ticket(self):
+        # keeps the writer thread busy in its tick wait so the second packet stays queued
+        self.writer.Send(self.local, touch(const.ACTION_DOWN, 1))
+        receive(self.remote, TOUCH_DTYPE.itemsize)
+
+        lOther, lOtherRemote = socket.socketpair()
+        try:
+            lFuture = self.writer.SendMany([(self.local, touch(const.ACTION_UP, 1)), (lOther, touch(const.ACTION_UP, 1))])
+            self.writer.Discard(lOther)
+
+            self.assertEqual(set(lFuture.result(timeout=5.0)), {self.local})
+
+        finally:
+            lOther.close()
+            lOtherRemote.close()
+
+    def test_queue_latency(self):
+        self.assertEqual(self.writer.QueueLatency(), {})
+
+        self.writer.Send(self.local, touch(const.ACTION_DOWN, 1))
+        for lX in range(8):
+            self.writer.Send(self.local, touch(const.ACTION_MOVE, lX))
+
+        self.writer.Send(self.local, touch(const.ACTION_UP, 1), immediate=True).result(timeout=5.0)
+        receive(self.remote, 10 * TOUCH_DTYPE.itemsize)
+
+        lLatency = self.writer.QueueLatency((50, 99))
+        self.assertEqual(list(lLatency), [50, 99])
+        self.assertLessEqual(lLatency[50], lLatency[99])
+        # an immediate packet cuts the tick short, nothing waits the full 200 ms
+        self.assertGreaterEqual(lLatency[50], 0.0)
+        self.assertLess(lLatency[99], 200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# ==================================================================================
+import hashlib
+import os
+import tempfile
+import unittest
+from threading import Event
+
+# ==================================================================================
+from eNuts.services import DeploymentManager
+
+
+class FakeDevice:
+    """Answers ``md5sum`` with the remote hash once ``Release`` is set, counts the pushes."""
+
+    def __init__(self, serial: str, remoteHash: str) -> None:
+        self.serial: str = serial
+        self.sync = self
+        self.RemoteHash: str = remoteHash
+        self.Release: Event = Event()
+        self.Hashed: int = 0
+        self.Pushed: int = 0
+
+    def shell(self, command: list[str], timeout: float = None) -> str:
+        self.Release.wait(5.0)
+        self.Hashed += 1
+        return f"{self.RemoteHash}  {command[-1]}"
+
+    def push(self, source: str, destination: str) -> None:
+        self.Pushed += 1
+
+
+class TestDeploymentManager(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self._jar = os.path.join(self._temp.name, "scrcpy-server.jar")
+        with open(self._jar, "wb") as lFile:
+            lFile.write(b"server")
+
+        self._hash = hashlib.md5(b"server").hexdigest()
+        self._manager = DeploymentManager.__wrapped__(workers=2, serverPath=self._jar)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_verified_device_is_skipped(self):
+        lDevice = FakeDevice("A", self._hash)
+        lDevice.Release.set()
+        self.assertFalse(self._manager.Deploy(lDevice).result(5.0))
+        self.assertFalse(self._manager.Deploy(lDevice).result(5.0))
+        self.assertEqual((lDevice.Hashed, lDevice.Pushed), (1, 0))
+
+    def test_outdated_jar_is_pushed(self):
+        lDevice = FakeDevice("A", "0" * 32)
+        lDevice.Release.set()
+        self.assertTrue(self._manager.Deploy(lDevice).result(5.0))
+        self.assertEqual(lDevice.Pushed, 1)
+
+    def test_invalidate_during_deploy(self):
+        lDevice = FakeDevice("A", self._hash)
+        lStale = self._manager.Deploy(lDevice)
+        self._manager.Invalidate("A")
+        lDevice.Release.set()
+        self.assertFalse(lStale.result(5.0))
+
+        # the deployment of the old connection must not vouch for the new one
+        lFresh = self._manager.Deploy(lDevice)
+        self.assertIsNot(lFresh, lStale)
+        lFresh.result(5.0)
+        self.assertEqual(lDevice.Hashed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# ==================================================================================
+import unittest
+from concurrent.futures import Future
+
+# ==================================================================================
+from eNuts.services import DeviceInventory
+from eNuts.services.__deviceInventory import C_SECTION
+
+C_TRANSCRIPT: str = f"""[ro.boot.serialno]: [R58M12ABCDE]
+[ro.build.version.release]: [13]
+[ro.build.version.sdk]: [33]
+[ro.product.cpu.abi]: [arm64-v8a]
+[ro.product.manufacturer]: [samsung]
+[ro.product.model]: [SM-G991B]
+{C_SECTION}
+Physical size: 1080x2400
+Override size: 720x1600
+{C_SECTION}
+Physical density: 420
+Override density: 320
+{C_SECTION}
+        <MediaCodec name="c2.exynos.h264.encoder" type="video/avc" >
+        <MediaCodec name="c2.android.avc.encoder" type="video/avc" >
+        <MediaCodec name="c2.exynos.hevc.encoder" type="video/hevc" >
+        <MediaCodec name="c2.android.avc.encoder" type="video/avc" >
+"""
+
+
+class FakeClient:
+    def __init__(self, devices: list = None) -> None:
+        self.Devices: list = devices or []
+        self.Listed: int = 0
+
+    def device_list(self) -> list:
+        self.Listed += 1
+        return self.Devices
+
+
+class TestDeviceInventory(unittest.TestCase):
+    def test_parse_transcript(self):
+        lProfile = DeviceInventory.__wrapped__._parse("EMULATOR-5554", C_TRANSCRIPT)
+
+        self.assertEqual(lProfile.HardwareSerial, "R58M12ABCDE")
+        self.assertEqual((lProfile.Manufacturer, lProfile.Model, lProfile.Release, lProfile.SdkLevel, lProfile.Abi), ("samsung", "SM-G991B", "13", 33, "arm64-v8a"))
+        self.assertEqual(lProfile.PhysicalSize, (1080, 2400))
+        self.assertEqual(lProfile.DisplaySize, (720, 1600))
+        self.assertEqual(lProfile.Density, 320)
+        self.assertEqual(lProfile.EncodersFor("video/avc"), ["c2.exynos.h264.encoder", "c2.android.avc.encoder"])
+        self.assertEqual(lProfile.EncodersFor("video/hevc"), ["c2.exynos.hevc.encoder"])
+
+    def test_parse_without_overrides(self):
+        lProfile = DeviceInventory.__wrapped__._parse("A", f"[ro.serialno]: [XYZ]\n{C_SECTION}\nPhysical size: 1080x1920\n{C_SECTION}\nPhysical density: 480\n{C_SECTION}\n")
+
+        self.assertEqual(lProfile.HardwareSerial, "XYZ")
+        self.assertEqual(lProfile.DisplaySize, (1080, 1920))
+        self.assertEqual(lProfile.Density, 480)
+        self.assertIsNone(lProfile.SdkLevel)
+        self.assertEqual(lProfile.EncodersFor(), [])
+
+    def test_failed_fetch_is_not_retried(self):
+        lClient = FakeClient()
+        # bypasses the singleton so the test gets its own client
+        lInventory = DeviceInventory.__wrapped__(lClient, workers=1)
+
+        self.assertIsNone(lInventory.Get("GONE", timeout=1.0))
+        self.assertIsNone(lInventory.Get("GONE", timeout=1.0))
+        self.assertEqual(lClient.Listed, 1)
+
+        lInventory.Invalidate("GONE")
+        lFuture: Future = lInventory.Fetch("GONE")
+        self.assertIsInstance(lFuture.exception(1.0), ConnectionError)
+        self.assertEqual(lClient.Listed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
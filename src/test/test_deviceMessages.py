@@ -0,0 +1,70 @@
+# ==================================================================================
+import unittest
+
+# ==================================================================================
+from eNuts.scrcpy import const
+from eNuts.scrcpy.messages import (
+    ACK_CLIPBOARD,
+    CLIPBOARD_HEADER,
+    UHID_OUTPUT_HEADER,
+    AckClipboardMessage,
+    ClipboardMessage,
+    DeviceMessageReader,
+    UhidOutputMessage,
+)
+
+
+def clipboard(text: str) -> bytes:
+    lText: bytes = text.encode("utf-8")
+    return CLIPBOARD_HEADER.pack(const.DEVICE_MSG_TYPE_CLIPBOARD, len(lText)) + lText
+
+
+def ack(sequence: int) -> bytes:
+    return ACK_CLIPBOARD.pack(const.DEVICE_MSG_TYPE_ACK_CLIPBOARD, sequence)
+
+
+class TestDeviceMessageReader(unittest.TestCase):
+    def setUp(self):
+        self._received = []
+        self._reader = DeviceMessageReader(self._received.append)
+
+    def test_messages_in_pieces(self):
+        lStream = clipboard("hé llo") + ack(7) + UHID_OUTPUT_HEADER.pack(const.DEVICE_MSG_TYPE_UHID_OUTPUT, 3, 2) + b"\x01\x02"
+        for lByte in range(len(lStream)):
+            self._reader.Feed(lStream[lByte : lByte + 1])
+
+        self.assertEqual(self._received, [ClipboardMessage("hé llo"), AckClipboardMessage(7), UhidOutputMessage(3, b"\x01\x02")])
+
+    def test_clipboard_split_inside_text(self):
+        lMessage = clipboard("日本語")
+        # cut through a multi-byte character, nothing is decoded until the whole text is there
+        self.assertEqual(self._reader.Feed(lMessage[:7]), [])
+        self.assertEqual(self._reader.Feed(lMessage[7:]), [ClipboardMessage("日本語")])
+
+    def test_clipboard_requests_resolve_in_order(self):
+        lFirst = self._reader.RequestClipboard()
+        lSecond = self._reader.RequestClipboard()
+        lMessage = clipboard("one") + clipboard("two")
+        self._reader.Feed(lMessage[:5])
+        self.assertFalse(lFirst.done())
+
+        self._reader.Feed(lMessage[5:])
+        self.assertEqual((lFirst.result(0), lSecond.result(0)), ("one", "two"))
+        self.assertEqual(self._reader.PendingRequests, 0)
+
+    def test_ack_resolves_by_sequence(self):
+        lSequence1, lFuture1 = self._reader.ExpectAck()
+        lSequence2, lFuture2 = self._reader.ExpectAck()
+        lMessage = ack(lSequence2)
+        self._reader.Feed(lMessage[:4])
+        self._reader.Feed(lMessage[4:])
+
+        self.assertEqual(lFuture2.result(0), lSequence2)
+        self.assertFalse(lFuture1.done())
+
+        self._reader.Close()
+        self.assertIsInstance(lFuture1.exception(0), ConnectionError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# ==================================================================================
+import socket
+import unittest
+from queue import Empty, Queue
+from threading import Thread
+from time import monotonic, sleep
+
+# ==================================================================================
+from adbutils import AdbClient
+from PySide6.QtCore import Qt
+
+# ==================================================================================
+from eNuts.utilities.runnables import DeviceMonitor
+
+
+class FakeAdbServer:
+    """Answers ``host:track-devices`` with the queued snapshots and ``host:devices`` with the last one."""
+
+    def __init__(self, failTrack: bool = False) -> None:
+        self.FailTrack: bool = failTrack
+        self.Snapshots: Queue = Queue()
+        self.Current: str = ""
+        self.Commands: list[str] = []
+        self._closed: bool = False
+        self._server: socket.socket = socket.create_server(("127.0.0.1", 0))
+        self._thread: Thread = Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @property
+    def Port(self) -> int:
+        return self._server.getsockname()[1]
+
+    def Push(self, snapshot: str) -> None:
+        self.Current = snapshot
+        self.Snapshots.put(snapshot)
+
+    def Close(self) -> None:
+        self._closed = True
+        self._server.close()
+
+    def _serve(self) -> None:
+        while not self._closed:
+            try:
+                lConnection, _ = self._server.accept()
+
+            except OSError:
+                return
+
+            Thread(target=self._handle, args=(lConnection,), daemon=True).start()
+
+    def _handle(self, connection: socket.socket) -> None:
+        with connection:
+            lCommand: str = connection.recv(int(connection.recv(4), 16)).decode()
+            self.Commands.append(lCommand)
+            if lCommand == "host:track-devices" and not self.FailTrack:
+                connection.sendall(b"OKAY")
+                while not self._closed:
+                    try:
+                        connection.sendall(self._block(self.Snapshots.get(timeout=0.1)))
+
+                    except Empty:
+                        continue
+
+                    except OSError:
+                        return
+
+            elif lCommand == "host:devices":
+                connection.sendall(b"OKAY" + self._block(self.Current))
+
+            else:
+                connection.sendall(b"FAIL" + self._block("unknown host service"))
+
+    @staticmethod
+    def _block(text: str) -> bytes:
+        lData: bytes = text.encode()
+        return b"%04x" % len(lData) + lData
+
+
+class TestDeviceMonitor(unittest.TestCase):
+    def setUp(self):
+        self._server = None
+        self._monitor = None
+        self._events: list[tuple[str, str]] = []
+
+    def tearDown(self):
+        if self._monitor is not None:
+            self._monitor.stop()
+
+        if self._server is not None:
+            self._server.Close()
+
+    def _start(self, failTrack: bool = False) -> None:
+        self._server = FakeAdbServer(failTrack)
+        # bypasses the singleton so each test gets its own client
+        self._monitor = DeviceMonitor.__wrapped__(AdbClient("127.0.0.1", self._server.Port), minBackoff=0.05, maxBackoff=0.2)
+        self._monitor.OnDeviceAdded.connect(lambda device: self._events.append(("added", device.serial)), Qt.ConnectionType.DirectConnection)
+        self._monitor.OnDeviceRemoved.connect(lambda device: self._events.append(("removed", device.serial)), Qt.ConnectionType.DirectConnection)
+        self._monitor.start()
+
+    def _waitFor(self, count: int, timeout: float = 3.0) -> None:
+        lDeadline: float = monotonic() + timeout
+        while len(self._events) < count and monotonic() < lDeadline:
+            sleep(0.01)
+
+    def test_track_emits_only_changes(self):
+        self._start()
+        self._server.Push("A\tdevice\n")
+        self._server.Push("A\tdevice\nB\toffline\n")
+        self._server.Push("A\tdevice\nB\tdevice\n")
+        self._server.Push("B\tdevice\n")
+        self._waitFor(3)
+        sleep(0.05)
+
+        self.assertEqual(self._events, [("added", "A"), ("added", "B"), ("removed", "A")])
+        self.assertEqual(self._server.Commands, ["host:track-devices"])
+
+    def test_falls_back_to_polling(self):
+        self._start(failTrack=True)
+        self._server.Push("C\tdevice\n")
+        self._waitFor(1)
+        sleep(0.3)
+
+        self.assertEqual(self._events, [("added", "C")])
+        self.assertIn("host:devices", self._server.Commands)
+        self.assertGreater(self._server.Commands.count("host:track-devices"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
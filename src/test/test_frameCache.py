@@ -0,0 +1,81 @@
+# ==================================================================================
+import unittest
+
+# ==================================================================================
+import numpy as np
+
+# ==================================================================================
+from vannon.videoThread import CacheOptions, FrameCache
+
+C_FRAME_BYTES: int = 1024 * 1024
+
+
+def _frame() -> np.ndarray:
+    return np.zeros(C_FRAME_BYTES, dtype=np.uint8)
+
+
+class TestFrameCache(unittest.TestCase):
+    def test_byte_budget(self):
+        lOptions = CacheOptions(cacheSize=4)
+        lCache = FrameCache(lOptions)
+        for lIndex in range(10):
+            lCache.Put(lIndex, _frame())
+
+        self.assertEqual(len(lCache), 4)
+        self.assertLessEqual(lCache.Bytes, lOptions.MaximumBytes)
+        self.assertEqual(lOptions.Statistics.Evictions, 6)
+        self.assertEqual(lOptions.Statistics.Bytes, lCache.Bytes)
+
+    def test_keeps_frames_near_playhead(self):
+        lOptions = CacheOptions(cacheSize=3)
+        lCache = FrameCache(lOptions)
+        lCache.Playhead = 100
+        for lIndex in (99, 100, 5):
+            lCache.Put(lIndex, _frame())
+
+        # 99 and 100 are older than 5 but closer to the playhead
+        lCache.Put(101, _frame())
+        self.assertNotIn(5, lCache)
+        self.assertIn(99, lCache)
+        self.assertIn(100, lCache)
+
+    def test_far_frames_do_not_displace_the_playhead(self):
+        lOptions = CacheOptions(cacheSize=5)
+        lCache = FrameCache(lOptions)
+        lCache.Playhead = 100
+        for lIndex in range(98, 103):
+            lCache.Put(lIndex, _frame())
+
+        # the neighbours are the least recently used frames, yet every far frame goes first
+        for lIndex in (200, 40, 150, 7, 300):
+            self.assertFalse(lCache.Put(lIndex, _frame()))
+
+        self.assertEqual([lIndex for lIndex in range(98, 103) if lIndex in lCache], list(range(98, 103)))
+        self.assertEqual(len(lCache), 5)
+
+        # a frame closer than the farthest cached one replaces it
+        self.assertTrue(lCache.Put(100, _frame()))
+        lCache.Playhead = 101
+        self.assertTrue(lCache.Put(103, _frame()))
+        self.assertNotIn(98, lCache)
+        self.assertEqual(lOptions.Statistics.Evictions, 6)
+
+    def test_counters(self):
+        lOptions = CacheOptions()
+        lCache = FrameCache(lOptions)
+        lCache.Put(1, _frame())
+
+        self.assertIsNotNone(lCache.Get(1))
+        self.assertIsNone(lCache.Get(2))
+        self.assertEqual((lOptions.Statistics.Hits, lOptions.Statistics.Misses), (1, 1))
+        self.assertEqual(lOptions.Statistics.HitRate, 0.5)
+
+    def test_rejects_frame_over_budget(self):
+        lCache = FrameCache(CacheOptions(cacheSize=1))
+
+        self.assertFalse(lCache.Put(0, np.zeros(2 * C_FRAME_BYTES, dtype=np.uint8)))
+        self.assertEqual(len(lCache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# ==================================================================================
+import unittest
+
+# ==================================================================================
+from eNuts.scrcpy.stream import C_FRAME_HEADER, C_PACKET_FLAG_CONFIG, C_PACKET_FLAG_KEY_FRAME, FramePacketReader
+
+C_CONFIG: bytes = b"\x00\x00\x00\x01\x67sps\x00\x00\x00\x01\x68pps"
+C_KEY_FRAME: bytes = b"\x00\x00\x00\x01\x65idr"
+C_FRAME: bytes = b"\x00\x00\x00\x01\x41p"
+
+
+def frame(pts: int, payload: bytes, keyFrame: bool = False, config: bool = False) -> bytes:
+    lFlags: int = (C_PACKET_FLAG_KEY_FRAME if keyFrame else 0) | (C_PACKET_FLAG_CONFIG if config else 0)
+    return C_FRAME_HEADER.pack(pts | lFlags, len(payload)) + payload
+
+
+class TestFramePacketReader(unittest.TestCase):
+    def setUp(self):
+        self._reader = FramePacketReader()
+
+    def test_flags_and_pts(self):
+        lPackets = self._reader.Feed(frame(1000, C_KEY_FRAME, keyFrame=True) + frame(2000, C_FRAME), receivedAt=5.0)
+        self.assertEqual([lPacket.Pts for lPacket in lPackets], [1000, 2000])
+        self.assertEqual([lPacket.IsKeyFrame for lPacket in lPackets], [True, False])
+        self.assertFalse(any(lPacket.IsConfig for lPacket in lPackets))
+        self.assertTrue(all(lPacket.ReceivedAt == 5.0 for lPacket in lPackets))
+
+    def test_config_is_prepended_to_next_packet(self):
+        self.assertEqual(self._reader.Feed(frame(0, C_CONFIG, config=True)), [])
+        self.assertEqual(self._reader.Config, C_CONFIG)
+
+        (lKey,) = self._reader.Feed(frame(1000, C_KEY_FRAME, keyFrame=True))
+        self.assertEqual(lKey.Data, C_CONFIG + C_KEY_FRAME)
+        self.assertTrue(lKey.IsKeyFrame)
+
+        # only the packet right after the config carries it
+        (lNext,) = self._reader.Feed(frame(2000, C_FRAME))
+        self.assertEqual(lNext.Data, C_FRAME)
+        self.assertEqual(self._reader.Config, C_CONFIG)
+
+    def test_header_split_across_feeds(self):
+        lStream = frame(0, C_CONFIG, config=True) + frame(1000, C_KEY_FRAME, keyFrame=True) + frame(2000, C_FRAME)
+        lPackets = []
+        for lByte in range(len(lStream)):
+            lPackets += self._reader.Feed(lStream[lByte : lByte + 1], receivedAt=float(lByte))
+
+        self.assertEqual([lPacket.Data for lPacket in lPackets], [C_CONFIG + C_KEY_FRAME, C_FRAME])
+        self.assertEqual([lPacket.Pts for lPacket in lPackets], [1000, 2000])
+        # a packet is stamped with the arrival of the bytes that completed it
+        self.assertEqual(lPackets[-1].ReceivedAt, float(len(lStream) - 1))
+        self.assertEqual(self._reader.Buffered, 0)
+
+    def test_partial_payload_stays_buffered(self):
+        lFrame = frame(1000, C_KEY_FRAME, keyFrame=True)
+        self.assertEqual(self._reader.Feed(lFrame[: C_FRAME_HEADER.size + 2]), [])
+        self.assertEqual(self._reader.Buffered, C_FRAME_HEADER.size + 2)
+
+        (lPacket,) = self._reader.Feed(lFrame[C_FRAME_HEADER.size + 2 :])
+        self.assertEqual(lPacket.Data, C_KEY_FRAME)
+
+    def test_reset_drops_config(self):
+        self._reader.Feed(frame(0, C_CONFIG, config=True) + frame(1000, C_KEY_FRAME, keyFrame=True)[:5])
+        self._reader.Reset()
+        self.assertEqual(self._reader.Config, b"")
+        self.assertEqual(self._reader.Buffered, 0)
+
+        (lPacket,) = self._reader.Feed(frame(1000, C_KEY_FRAME, keyFrame=True))
+        self.assertEqual(lPacket.Data, C_KEY_FRAME)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# ==================================================================================
+import time
+import unittest
+from threading import Thread
+
+# ==================================================================================
+from eNuts.services.frames import FrameRing
+
+
+class TestFrameRing(unittest.TestCase):
+    def test_drop_oldest(self):
+        lRing = FrameRing(capacity=3)
+        for lItem in range(5):
+            lRing.Put(lItem)
+
+        self.assertEqual(lRing.Dropped, 2)
+        self.assertEqual([lRing.Get(0) for _ in range(3)], [2, 3, 4])
+        self.assertIsNone(lRing.Get(0))
+
+    def test_late_frames(self):
+        lRing = FrameRing(capacity=2, lateThreshold=0.01)
+        lRing.Put("stale")
+        time.sleep(0.02)
+        lRing.Put("fresh")
+
+        lRing.Get(0)
+        lRing.Get(0)
+        self.assertEqual(lRing.Late, 1)
+        self.assertEqual(lRing.Delivered, 2)
+
+    def test_get_wakes_on_put(self):
+        lRing = FrameRing()
+        Thread(target=lambda: (time.sleep(0.05), lRing.Put("frame")), daemon=True).start()
+
+        self.assertEqual(lRing.Get(1.0), "frame")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# ==================================================================================
+import socket
+import unittest
+from math import ceil
+
+# ==================================================================================
+import numpy as np
+from PySide6.QtCore import QSize
+
+# ==================================================================================
+from eNuts.scrcpy import const
+from eNuts.scrcpy.control import ControlSender
+from eNuts.scrcpy.macro import MacroPlayer, MacroTimeline, TouchEvent, easeInOut
+from eNuts.scrcpy.protocol import TOUCH_DTYPE
+
+
+class FakeDevice:
+    def __init__(self, width: int, height: int) -> None:
+        self.Resolution: QSize = QSize(width, height)
+        self.ControlSocket, self.Remote = socket.socketpair()
+        self.Remote.settimeout(5.0)
+
+    def Receive(self, count: int) -> np.ndarray:
+        lData = bytearray()
+        while len(lData) < count * TOUCH_DTYPE.itemsize:
+            lData += self.Remote.recv(0x10000)
+
+        return np.frombuffer(bytes(lData), dtype=TOUCH_DTYPE)
+
+    def Close(self) -> None:
+        self.ControlSocket.close()
+        self.Remote.close()
+
+
+def moves(timeline: MacroTimeline) -> list[TouchEvent]:
+    return [lEvent for lEvent in timeline.Events if lEvent.Action == const.ACTION_MOVE]
+
+
+class TestMacroTimeline(unittest.TestCase):
+    def test_swipe_interpolation(self):
+        lTimeline = MacroTimeline().Swipe(1.0, (0, 0), (100, 50), 0.5, rate=20)
+        lMoves = moves(lTimeline)
+
+        self.assertEqual(len(lMoves), 10)
+        self.assertEqual([lEvent.Action for lEvent in (lTimeline.Events[0], lTimeline.Events[-1])], [const.ACTION_DOWN, const.ACTION_UP])
+        for lStep, lEvent in enumerate(lMoves, 1):
+            self.assertAlmostEqual(lEvent.At, 1.0 + 0.05 * lStep)
+            self.assertAlmostEqual(lEvent.X, 10.0 * lStep)
+            self.assertAlmostEqual(lEvent.Y, 5.0 * lStep)
+
+        self.assertAlmostEqual(lTimeline.Duration, 1.5)
+
+    def test_path_keeps_constant_speed(self):
+        # 30 px right then 10 px down, four steps of 10 px each
+        lMoves = moves(MacroTimeline().Path(0.0, [(0, 0), (30, 0), (30, 10)], 0.4, rate=10))
+        self.assertEqual([(round(lEvent.X, 6), round(lEvent.Y, 6)) for lEvent in lMoves], [(10, 0), (20, 0), (30, 0), (30, 10)])
+
+    def test_easing(self):
+        lMoves = moves(MacroTimeline().Swipe(0.0, (0, 0), (100, 0), 1.0, rate=4, easing=easeInOut))
+        self.assertEqual([round(lEvent.X, 6) for lEvent in lMoves], [15.625, 50.0, 84.375, 100.0])
+
+    def test_order(self):
+        lTimeline = MacroTimeline().Tap(0.5, 1, 1).Press(0.0, const.KEYCODE_HOME, hold=0.5).Touch(0.5, 2, 2, const.ACTION_MOVE)
+        lEvents = [(lEvent.At, type(lEvent).__name__, lEvent.Action) for lEvent in lTimeline.Events]
+        # events of the same instant stay in the order they were added
+        self.assertEqual(lEvents, [
+            (0.0, "KeyEvent", const.ACTION_DOWN),
+            (0.5, "TouchEvent", const.ACTION_DOWN),
+            (0.5, "KeyEvent", const.ACTION_UP),
+            (0.5, "TouchEvent", const.ACTION_MOVE),
+            (0.55, "TouchEvent", const.ACTION_UP),
+        ])
+
+    def test_path_needs_two_points(self):
+        with self.assertRaises(ValueError):
+            MacroTimeline().Path(0.0, [(0, 0)], 1.0)
+
+
+class TestMacroPlayer(unittest.TestCase):
+    def setUp(self):
+        self._device = FakeDevice(100, 200)
+        self._sender = ControlSender(self._device)
+
+    def tearDown(self):
+        self._device.Close()
+
+    def test_swipe_steps_and_clamping(self):
+        # the end is past the right edge, it is clamped to the last column
+        self._sender.swipe(10, 20, 500, 20, move_step_length=5, move_steps_delay=0.002).result(5.0)
+        lSteps = ceil((99 - 10) / 5)
+        lRows = self._device.Receive(lSteps + 2)
+
+        self.assertEqual(len(lRows), lSteps + 2)
+        self.assertEqual([lRows["action"][0], lRows["action"][-1]], [const.ACTION_DOWN, const.ACTION_UP])
+        # every interpolated point reaches the device, none is coalesced away
+        self.assertTrue((lRows["action"][1:-1] == const.ACTION_MOVE).all())
+        self.assertTrue((np.diff(lRows["x"]) >= 0).all())
+        self.assertEqual((int(lRows["x"][-1]), int(lRows["y"][-1])), (99, 20))
+        self.assertTrue(((lRows["width"] == 100) & (lRows["height"] == 200)).all())
+
+    def test_normalized_timeline_and_jitter(self):
+        lTimeline = MacroTimeline(normalized=True).Swipe(0.0, (0.1, 0.1), (0.9, 0.5), 0.05, rate=200)
+        lPlayer = MacroPlayer(lTimeline, [self._sender])
+        self.assertEqual(lPlayer.Play(), len(lTimeline.Events))
+
+        lRows = self._device.Receive(len(lTimeline.Events))
+        self.assertEqual((int(lRows["x"][-1]), int(lRows["y"][-1])), (90, 100))
+        # one flush time per event, far below the writer's tick apart from scheduling noise
+        self.assertEqual(set(lPlayer.Jitter()), {50, 90, 99})
+        self.assertLess(lPlayer.Jitter()[50], 20.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
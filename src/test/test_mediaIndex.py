@@ -0,0 +1,67 @@
+# ==================================================================================
+import os
+import tempfile
+import unittest
+
+# ==================================================================================
+import av
+import numpy as np
+
+# ==================================================================================
+from vannon.videoThread import IndexedReader, MediaIndex
+
+C_FRAMES: int = 60
+
+
+def _writeVideo(path: str) -> None:
+    with av.open(path, "w") as lContainer:
+        lStream = lContainer.add_stream("libx264", rate=30)
+        lStream.width, lStream.height, lStream.pix_fmt = 64, 64, "yuv420p"
+        lStream.options = {"g": "20", "bf": "2", "sc_threshold": "0"}
+        for lIndex in range(C_FRAMES):
+            lFrame = av.VideoFrame.from_ndarray(np.full((64, 64, 3), lIndex * 4, np.uint8), "bgr24")
+            lFrame.pts = lIndex
+            for lPacket in lStream.encode(lFrame):
+                lContainer.mux(lPacket)
+
+        for lPacket in lStream.encode(None):
+            lContainer.mux(lPacket)
+
+
+class TestMediaIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        cls._path = os.path.join(cls._directory.name, "clip.mkv")
+        _writeVideo(cls._path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def test_index_and_sidecar(self):
+        lIndex = MediaIndex.Load(self._path)
+
+        self.assertTrue(os.path.exists(self._path + ".index.npz"))
+        self.assertEqual(lIndex.FrameCount, C_FRAMES)
+        self.assertEqual(lIndex.KeyFrames.tolist(), [0, 20, 40])
+        self.assertEqual(lIndex.KeyFrameOf(39), 20)
+        self.assertEqual(lIndex.NextKeyFrame(20), 40)
+        self.assertEqual(lIndex.FrameAt(1.0), 30)
+        self.assertEqual(MediaIndex.Load(self._path).Pts.tolist(), lIndex.Pts.tolist())
+
+    def test_reads_are_frame_accurate(self):
+        with av.open(self._path) as lContainer:
+            lExpected = [lFrame.to_ndarray(format="bgr24") for lFrame in lContainer.decode(video=0)]
+
+        lReader = IndexedReader(self._path, MediaIndex.Load(self._path))
+        for lStart in (45, 7, 33):
+            for lFrameIndex, lFrame in lReader.Read(range(lStart, lStart + 3)):
+                np.testing.assert_array_equal(lFrame, lExpected[lFrameIndex])
+
+        lReader.Close()
+        self.assertEqual(lReader.Seeks, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
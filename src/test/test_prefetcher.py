@@ -0,0 +1,98 @@
+# ==================================================================================
+import os
+import tempfile
+import time
+import unittest
+
+# ==================================================================================
+import av
+import numpy as np
+
+# ==================================================================================
+from vannon.videoThread import CacheOptions, FrameCache, MediaIndex, Prefetcher
+
+C_FRAMES: int = 60
+C_OVERSTATED: int = 5
+C_PLAYHEAD: int = C_FRAMES - 10
+
+
+def _writeVideo(path: str) -> None:
+    with av.open(path, "w") as lContainer:
+        lStream = lContainer.add_stream("libx264", rate=30)
+        lStream.width, lStream.height, lStream.pix_fmt = 64, 64, "yuv420p"
+        lStream.options = {"g": "20", "bf": "0", "sc_threshold": "0"}
+        for lIndex in range(C_FRAMES):
+            lFrame = av.VideoFrame.from_ndarray(np.full((64, 64, 3), lIndex * 4, np.uint8), "bgr24")
+            lFrame.pts = lIndex
+            for lPacket in lStream.encode(lFrame):
+                lContainer.mux(lPacket)
+
+        for lPacket in lStream.encode(None):
+            lContainer.mux(lPacket)
+
+
+class TestPrefetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        cls._path = os.path.join(cls._directory.name, "clip.mkv")
+        _writeVideo(cls._path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def _prefetch(self, index: MediaIndex = None) -> tuple[CacheOptions, FrameCache]:
+        lOptions = CacheOptions(cacheDuration=10000)
+        lCache = FrameCache(lOptions)
+        lPrefetcher = Prefetcher(lCache, lOptions)
+        # more frames than the file holds, the ones past the end can never be read
+        lPrefetcher.Open(self._path, C_FRAMES + C_OVERSTATED, 30.0, index)
+        lPrefetcher.Move(C_PLAYHEAD, False)
+        lPrefetcher.Start()
+        try:
+            time.sleep(1.0)
+            self.assertFalse(lPrefetcher.WaitFor(C_FRAMES + 1, 0.5))
+
+        finally:
+            lPrefetcher.Stop()
+
+        return lOptions, lCache
+
+    def test_overstated_frame_count_with_opencv(self):
+        lOptions, lCache = self._prefetch()
+
+        # the playhead itself is the playback's frame, everything around it is prefetched
+        self.assertTrue(all(lFrame in lCache for lFrame in range(C_FRAMES) if lFrame != C_PLAYHEAD))
+        self.assertLess(lOptions.Statistics.Seeks, 4 * C_OVERSTATED)
+
+    def test_overstated_frame_count_with_index(self):
+        lOptions, lCache = self._prefetch(MediaIndex.Build(self._path))
+
+        # the playhead itself is the playback's frame, everything around it is prefetched
+        self.assertTrue(all(lFrame in lCache for lFrame in range(C_FRAMES) if lFrame != C_PLAYHEAD))
+        self.assertLess(lOptions.Statistics.Seeks, 4 * C_OVERSTATED)
+
+    def test_window_larger_than_budget(self):
+        # 1 MB frames in a 10 MB budget against a 4 s window at 30 fps
+        lOptions = CacheOptions(cacheDuration=4000, cacheSize=10)
+        lCache = FrameCache(lOptions)
+        lPrefetcher = Prefetcher(lCache, lOptions)
+        lPrefetcher.Open(self._path, 1000, 30.0)
+        for lPlayhead, lBackward in ((500, False), (520, True), (3, False)):
+            lCache.Playhead = lPlayhead
+            lRuns = 0
+            while (lRun := lPrefetcher.Plan(lPlayhead, 1000, 30.0, lBackward)) is not None:
+                lRuns += 1
+                self.assertLess(lRuns, 20)
+                for lFrame in lRun:
+                    lCache.Put(lFrame, np.zeros(1024 * 1024, np.uint8))
+
+            self.assertLessEqual(len(lCache), 10)
+            self.assertTrue(all(lFrame in lCache for lFrame in range(max(0, lPlayhead - 4), lPlayhead + 5) if lFrame != lPlayhead))
+
+        self.assertLess(lOptions.Statistics.Evictions, 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,249 @@
+# ==================================================================================
+import json
+import os
+import tempfile
+import time
+import unittest
+from dataclasses import asdict
+from fractions import Fraction
+
+# ==================================================================================
+import av
+import numpy as np
+
+# ==================================================================================
+from eNuts.scrcpy.stream import MediaPacket
+from eNuts.services.frames import StreamFrame
+from eNuts.services.recording import SegmentIndex, SegmentInfo, SegmentRecorder, SessionLog, SessionRecorder, StreamRecorder
+from eNuts.services.recording.__streamRecorder import C_RESTART_GAP
+
+C_FRAME_INTERVAL: int = 16_667
+C_IDR: bytes = b"\x00\x00\x00\x01\x65"
+
+
+def encode(frames: int, size: tuple[int, int], gop: int = 10) -> list[MediaPacket]:
+    """Synthetic device stream, PTS start at zero like after an encoder (re)start, the first packet carries the config."""
+    lCodec = av.CodecContext.create("libx264", "w")
+    lCodec.width, lCodec.height, lCodec.pix_fmt = *size, "yuv420p"
+    lCodec.time_base = Fraction(1, 60)
+    lCodec.gop_size = gop
+    lCodec.options = {"tune": "zerolatency", "preset": "ultrafast", "bf": "0", "sc_threshold": "0"}
+    lPackets = []
+    for lIndex in range(frames):
+        lFrame = av.VideoFrame.from_ndarray(np.full((size[1], size[0], 3), lIndex * 4 % 255, np.uint8), "bgr24").reformat(format="yuv420p")
+        lFrame.pts = lIndex
+        lPackets += [(bytes(lPacket), lPacket.is_keyframe, lIndex) for lPacket in lCodec.encode(lFrame)]
+
+    return [MediaPacket(lData, lIndex * C_FRAME_INTERVAL, lKey, False, 0.0) for lData, lKey, lIndex in lPackets]
+
+
+def config(packets: list[MediaPacket]) -> bytes:
+    return packets[0].Data[: packets[0].Data.find(C_IDR)]
+
+
+def decode(path: str) -> list[av.VideoFrame]:
+    with av.open(path) as lContainer:
+        return list(lContainer.decode(video=0))
+
+
+class TestSessionRecorder(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self._directory = os.path.join(self._temp.name, "session")
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _record(self, frames: range, packets: list[bytes]) -> None:
+        lRecorder = SessionRecorder(self._directory, chunkRows=4)
+        for lFrame, lPacket in zip(frames, packets):
+            lRecorder.RecordFrame(StreamFrame(None, receivedAt=lFrame, pts=lFrame * 1000, isKeyFrame=lFrame % 10 == 0, decodedAt=lFrame + 0.5))
+            lRecorder.RecordControl(lPacket, sentAt=lFrame + 0.25)
+
+        lRecorder.Close(5.0)
+
+    def test_round_trip(self):
+        lPackets = [bytes([lIndex % 3]) * (lIndex + 1) for lIndex in range(10)]
+        self._record(range(10), lPackets)
+
+        lLog = SessionLog(self._directory)
+        self.assertEqual((lLog.FrameCount, lLog.ControlCount), (10, 10))
+        self.assertEqual(list(lLog.Frames("index")), list(range(10)))
+        self.assertEqual(list(lLog.Frames("pts")), [lIndex * 1000 for lIndex in range(10)])
+        self.assertEqual(list(lLog.Frames("keyFrame")), [1] + [0] * 9)
+        self.assertEqual(list(lLog.Controls("frameIndex")), list(range(10)))
+        self.assertEqual([lLog.Packet(lRow) for lRow in range(10)], lPackets)
+
+    def test_reopen_appends(self):
+        lFirst = [b"\x02first" for _ in range(6)]
+        lSecond = [b"\x03second" + bytes([lIndex]) for lIndex in range(5)]
+        self._record(range(6), lFirst)
+        lOrigin = SessionLog(self._directory).Session["origin"]
+        self._record(range(6, 11), lSecond)
+
+        lLog = SessionLog(self._directory)
+        self.assertEqual(lLog.ControlCount, 11)
+        self.assertEqual(lLog.Session["origin"], lOrigin)
+        self.assertEqual([lLog.Packet(lRow) for lRow in range(11)], lFirst + lSecond)
+        self.assertEqual(list(lLog.Frames("index")), list(range(11)))
+
+    def test_reopen_after_torn_write(self):
+        self._record(range(3), [b"\x01a"] * 3)
+        # a crash between two column files leaves one of them a row ahead
+        with open(os.path.join(self._directory, "frames", "pts.bin"), "ab") as lFile:
+            lFile.write(b"\x00" * 8)
+
+        self._record(range(3, 5), [b"\x01b"] * 2)
+        lLog = SessionLog(self._directory)
+        self.assertEqual(list(lLog.Frames("pts")), [lIndex * 1000 for lIndex in range(5)])
+
+
+class TestStreamRecorder(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_encoder_restart_keeps_time_monotonic(self):
+        lFirst, lSecond = encode(30, (320, 240)), encode(20, (320, 240))
+        lRecorder = StreamRecorder(os.path.join(self._temp.name, "restart.mkv"))
+        # recording starts mid-GOP, the packets before the next key frame are skipped
+        for lPacket in lFirst[3:]:
+            lRecorder.Write(lPacket, config(lFirst), (320, 240))
+
+        for lPacket in lSecond:
+            lRecorder.Write(lPacket, config(lSecond), (320, 240))
+
+        lRecorder.Close(10.0)
+        self.assertEqual(lRecorder.Skipped, 7)
+        self.assertEqual(lRecorder.Files, [lRecorder.Path])
+
+        lFrames = decode(lRecorder.Path)
+        self.assertEqual(len(lFrames), 20 + 20)
+        self.assertTrue(lFrames[0].key_frame)
+        lPts = [round(float(lFrame.pts * lFrame.time_base) * 1_000_000) for lFrame in lFrames]
+        self.assertTrue(all(lNext > lPrevious for lPrevious, lNext in zip(lPts, lPts[1:])))
+        # the restart continues one frame interval after the last packet
+        self.assertAlmostEqual(lPts[20] - lPts[19], C_RESTART_GAP, delta=1000)
+
+    def test_rebase(self):
+        lRecorder = StreamRecorder(os.path.join(self._temp.name, "unused.mkv"))
+        lRecorder.Close()
+        self.assertEqual([lRecorder._rebase(lPts) for lPts in (5000, 6000, 0, 1000, 900)], [0, 1000, 1000 + C_RESTART_GAP, 2000 + C_RESTART_GAP, 2000 + 2 * C_RESTART_GAP])
+
+    def test_size_change_starts_new_file(self):
+        lLandscape, lPortrait = encode(20, (320, 240)), encode(20, (240, 320))
+        lRecorder = StreamRecorder(os.path.join(self._temp.name, "rotate.mp4"))
+        # the service keeps passing the handshake size, the recorder reads the new one from the SPS
+        for lPackets in (lLandscape, lPortrait):
+            for lPacket in lPackets:
+                lRecorder.Write(lPacket, config(lPackets), (320, 240))
+
+        lRecorder.Close(10.0)
+        self.assertEqual(lRecorder.Files, [os.path.join(self._temp.name, "rotate.mp4"), os.path.join(self._temp.name, "rotate-1.mp4")])
+        lFirst, lSecond = decode(lRecorder.Files[0]), decode(lRecorder.Files[1])
+        self.assertEqual((len(lFirst), lFirst[0].width, lFirst[0].height), (20, 320, 240))
+        self.assertEqual((len(lSecond), lSecond[0].width, lSecond[0].height), (20, 240, 320))
+        self.assertGreater(lSecond[0].pts * lSecond[0].time_base, lFirst[-1].pts * lFirst[-1].time_base)
+
+
+class TestSegmentRecorder(unittest.TestCase):
+    def setUp(self):
+        self._temp = tempfile.TemporaryDirectory()
+        self._directory = self._temp.name
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _record(self, frames: int, **options) -> SegmentRecorder:
+        # a key frame every 10 frames at 60 fps, a 0.1 s segment is cut on every key frame
+        lPackets = encode(frames, (160, 120))
+        lRecorder = SegmentRecorder(self._directory, segmentDuration=0.1, **options)
+        for lPacket in lPackets:
+            lRecorder.Write(lPacket, config(lPackets), (160, 120))
+
+        lRecorder.Close(10.0)
+        return lRecorder
+
+    def test_find(self):
+        lIndex = SegmentIndex(self._directory)
+        for lSequence, (lStart, lEnd) in enumerate(((0, 900_000), (1_000_000, 1_900_000), (3_000_000, 3_500_000))):
+            lIndex.Append(SegmentInfo(f"s{lSequence}", lSequence, lStart, lEnd, 100.0 + lStart / 1e6, 100.0 + lEnd / 1e6))
+
+        lIndex.Save()
+        lIndex = SegmentIndex(self._directory)
+        self.assertEqual(lIndex.Find(0.0), (lIndex.Segments[0], 0.0))
+        self.assertEqual(lIndex.Find(0.9), (lIndex.Segments[0], 0.9))
+        self.assertEqual(lIndex.Find(1.5), (lIndex.Segments[1], 0.5))
+        self.assertEqual(lIndex.Find(3.5), (lIndex.Segments[2], 0.5))
+        # before the first, between two and after the last segment
+        self.assertIsNone(lIndex.Find(-0.1))
+        self.assertIsNone(lIndex.Find(0.95))
+        self.assertIsNone(lIndex.Find(2.5))
+        self.assertIsNone(lIndex.Find(3.6))
+
+        lSegment, lOffset = lIndex.FindWallClock(101.25)
+        self.assertEqual(lSegment.Name, "s1")
+        self.assertAlmostEqual(lOffset, 0.25)
+        self.assertIsNone(lIndex.FindWallClock(99.0))
+        self.assertIsNone(lIndex.FindWallClock(102.0))
+
+    def test_segments_are_decodable(self):
+        lRecorder = self._record(40)
+        self.assertEqual([lSegment.Sequence for lSegment in lRecorder.Index.Segments], [0, 1, 2, 3])
+        for lSegment in lRecorder.Index.Segments:
+            lFrames = decode(lRecorder.Index.Path(lSegment))
+            self.assertEqual(len(lFrames), 10)
+            self.assertTrue(lFrames[0].key_frame)
+            self.assertEqual(lSegment.Bytes, os.path.getsize(lRecorder.Index.Path(lSegment)))
+
+        lFound, lOffset = lRecorder.Index.Find(lRecorder.Index.Segments[2].Start / 1_000_000 + 0.05)
+        self.assertIs(lFound, lRecorder.Index.Segments[2])
+        self.assertAlmostEqual(lOffset, 0.05)
+
+    def test_prune_by_size(self):
+        lMaximum = sum(lSegment.Bytes for lSegment in self._record(20).Index.Segments)
+        for lName in os.listdir(self._directory):
+            os.remove(os.path.join(self._directory, lName))
+
+        lRecorder = self._record(60, maximumSize=lMaximum)
+        lSegments = lRecorder.Index.Segments
+        self.assertLessEqual(lRecorder.Index.Bytes, lMaximum)
+        self.assertEqual([lSegment.Sequence for lSegment in lSegments], list(range(6 - len(lSegments), 6)))
+        self.assertEqual(sorted(os.listdir(self._directory)), sorted(["index.json", *(lSegment.Name for lSegment in lSegments)]))
+
+    def test_prune_keeps_last_segment(self):
+        lRecorder = self._record(40, maximumSize=1, retention=0)
+        self.assertEqual([lSegment.Sequence for lSegment in lRecorder.Index.Segments], [3])
+        self.assertEqual(len(decode(lRecorder.Index.Path(lRecorder.Index.Segments[0]))), 10)
+        self.assertEqual(sorted(os.listdir(self._directory)), sorted(["index.json", lRecorder.Index.Segments[0].Name]))
+
+    def test_prune_by_age(self):
+        lOld = SegmentInfo("segment-old.mkv", 0, 0, 100_000, time.time() - 3600, time.time() - 3599)
+        with open(os.path.join(self._directory, lOld.Name), "wb") as lFile:
+            lFile.write(b"\x00" * 16)
+
+        with open(os.path.join(self._directory, "index.json"), "w", encoding="utf-8") as lFile:
+            json.dump([asdict(lOld)], lFile)
+
+        lRecorder = self._record(20, retention=600)
+        self.assertNotIn(lOld.Name, [lSegment.Name for lSegment in lRecorder.Index.Segments])
+        self.assertFalse(os.path.exists(os.path.join(self._directory, lOld.Name)))
+        self.assertEqual([lSegment.Sequence for lSegment in lRecorder.Index.Segments], [1, 2])
+
+    def test_restart_continues_index(self):
+        lFirst = self._record(20).Index.Segments[-1]
+        lRecorder = self._record(20)
+        lSegments = lRecorder.Index.Segments
+        self.assertEqual([lSegment.Sequence for lSegment in lSegments], [0, 1, 2, 3])
+        self.assertEqual(lSegments[2].Start, lFirst.End + C_RESTART_GAP)
+        self.assertGreaterEqual(lSegments[2].StartedAt, lFirst.EndedAt)
+        self.assertTrue(all(lNext.Start > lPrevious.End for lPrevious, lNext in zip(lSegments, lSegments[1:])))
+
+        lFound, _ = SegmentIndex(self._directory).Find(lSegments[3].Start / 1_000_000)
+        self.assertEqual(lFound.Name, lSegments[3].Name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# ==================================================================================
+import unittest
+
+# ==================================================================================
+from eNuts.services import SessionManager, eWarmMode
+
+
+class FakeStreamer:
+    """Stands in for a ``StreamService``, records the calls the manager makes."""
+
+    def __init__(self) -> None:
+        self.isAlive: bool = False
+        self.KeyFramesOnly: bool = False
+        self.Started: int = 0
+        self.Stopped: int = 0
+        self.Republished: int = 0
+
+    def start(self) -> None:
+        self.isAlive = True
+        self.Started += 1
+
+    def stop(self) -> None:
+        self.isAlive = False
+        self.Stopped += 1
+
+    def Republish(self) -> None:
+        self.Republished += 1
+
+
+class TestSessionManager(unittest.TestCase):
+    def manager(self, warmMode: eWarmMode = eWarmMode.DECODE, maxWarm: int = 2) -> SessionManager:
+        lManager: SessionManager = SessionManager.__wrapped__(warmMode, maxWarm)
+        self._streamers: dict[str, FakeStreamer] = {lKey: FakeStreamer() for lKey in "abcd"}
+        for lKey, lStreamer in self._streamers.items():
+            lManager.Attach(lKey, lStreamer)
+
+        return lManager
+
+    def test_activate_starts_then_republishes(self):
+        lManager = self.manager()
+        lStreamer = self._streamers["a"]
+
+        self.assertIs(lManager.Activate("a"), lStreamer)
+        self.assertEqual((lStreamer.Started, lStreamer.Republished), (1, 0))
+
+        lManager.Deactivate("a")
+        lManager.Activate("a")
+        # a warm session shows its last frame again instead of restarting
+        self.assertEqual((lStreamer.Started, lStreamer.Republished), (1, 1))
+        self.assertEqual(lManager.ActiveKeys, {"a"})
+        self.assertEqual(lManager.WarmKeys, [])
+        self.assertIsNone(lManager.Activate("unknown"))
+
+    def test_warm_modes(self):
+        # mode, still alive once hidden, decoding key frames only, kept warm
+        lCases = [
+            (eWarmMode.DECODE, True, False, ["a"]),
+            (eWarmMode.KEYFRAMES, True, True, ["a"]),
+            (eWarmMode.STOPPED, False, False, []),
+        ]
+        for lMode, lAlive, lKeyFramesOnly, lWarm in lCases:
+            with self.subTest(mode=lMode):
+                lManager = self.manager(lMode)
+                lStreamer = self._streamers["a"]
+                lManager.Activate("a")
+                lManager.Deactivate("a")
+
+                self.assertEqual(lStreamer.isAlive, lAlive)
+                self.assertEqual(lStreamer.KeyFramesOnly, lKeyFramesOnly)
+                self.assertEqual(lManager.WarmKeys, lWarm)
+                self.assertEqual(lManager.ActiveKeys, set())
+
+                # showing it again always decodes every frame
+                lManager.Activate("a")
+                self.assertFalse(lStreamer.KeyFramesOnly)
+                self.assertTrue(lStreamer.isAlive)
+
+    def test_show_switches_active_session(self):
+        lManager = self.manager(eWarmMode.KEYFRAMES)
+        lManager.Show("a")
+        lManager.Show("b")
+
+        self.assertEqual(lManager.ActiveKeys, {"b"})
+        self.assertEqual(lManager.WarmKeys, ["a"])
+        self.assertTrue(self._streamers["a"].KeyFramesOnly)
+        self.assertFalse(self._streamers["b"].KeyFramesOnly)
+
+        lManager.Show("a")
+        self.assertEqual(lManager.ActiveKeys, {"a"})
+        self.assertEqual(lManager.WarmKeys, ["b"])
+        self.assertEqual(self._streamers["a"].Republished, 1)
+
+    def test_least_recently_shown_is_stopped(self):
+        lManager = self.manager(maxWarm=2)
+        for lKey in "abcd":
+            lManager.Show(lKey)
+
+        # d is active, a was hidden first and is the one over the limit
+        self.assertEqual(lManager.ActiveKeys, {"d"})
+        self.assertEqual(lManager.WarmKeys, ["b", "c"])
+        self.assertEqual([self._streamers[lKey].Stopped for lKey in "abcd"], [1, 0, 0, 0])
+
+        # showing b again moves it to the back of the queue, so c goes next
+        lManager.Show("b")
+        lManager.Show("a")
+        self.assertEqual(lManager.WarmKeys, ["d", "b"])
+        self.assertEqual([self._streamers[lKey].Stopped for lKey in "abcd"], [1, 0, 1, 0])
+        self.assertEqual(self._streamers["a"].Started, 2)
+
+    def test_detach(self):
+        lManager = self.manager()
+        lManager.Show("a")
+        lManager.Show("b")
+
+        self.assertIs(lManager.Detach("a"), self._streamers["a"])
+        self.assertEqual(lManager.WarmKeys, [])
+        self.assertIsNone(lManager.Detach("a"))
+
+        # deactivating a session that is not shown changes nothing
+        lManager.Deactivate("c")
+        self.assertEqual(lManager.ActiveKeys, {"b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
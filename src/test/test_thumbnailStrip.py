@@ -0,0 +1,82 @@
+# ==================================================================================
+import os
+import tempfile
+import unittest
+
+# ==================================================================================
+import av
+import numpy as np
+
+# ==================================================================================
+from vannon.videoThread import MediaIndex, ThumbnailStrip
+
+C_FRAMES: int = 60
+
+
+def _writeVideo(path: str) -> None:
+    with av.open(path, "w") as lContainer:
+        lStream = lContainer.add_stream("libx264", rate=30)
+        lStream.width, lStream.height, lStream.pix_fmt = 64, 64, "yuv420p"
+        lStream.options = {"g": "20", "bf": "2", "sc_threshold": "0"}
+        for lIndex in range(C_FRAMES):
+            lFrame = av.VideoFrame.from_ndarray(np.full((64, 64, 3), lIndex * 4, np.uint8), "bgr24")
+            lFrame.pts = lIndex
+            for lPacket in lStream.encode(lFrame):
+                lContainer.mux(lPacket)
+
+        for lPacket in lStream.encode(None):
+            lContainer.mux(lPacket)
+
+
+class TestThumbnailStrip(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "clip.mkv")
+        _writeVideo(self._path)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _build(self, index: MediaIndex = None) -> ThumbnailStrip:
+        lStrip = ThumbnailStrip(self._path, C_FRAMES, 30.0, index, step=10, width=32)
+        lStrip.Start()
+        self.assertTrue(lStrip.Wait(10.0))
+        return lStrip
+
+    def test_exact_thumbnails(self):
+        for lIndex in (MediaIndex.Load(self._path), None):
+            lStrip = self._build(lIndex)
+            self.assertEqual(lStrip.Progress, 1.0)
+            self.assertEqual(lStrip.Get(31).shape, (32, 32, 3))
+            # frame 30 is filled with 120, the thumbnail of a flat frame keeps its value
+            self.assertAlmostEqual(float(lStrip.Get(31).mean()), 120.0, delta=3.0)
+            self.assertAlmostEqual(float(lStrip.Get(0).mean()), 0.0, delta=3.0)
+            self.assertAlmostEqual(float(lStrip.Get(C_FRAMES + 100).mean()), 200.0, delta=3.0)
+            lStrip.Stop()
+            # the next pass must build again instead of reusing this strip
+            os.remove(self._path + ".thumbs.json")
+
+    def test_finished_strip_is_reused(self):
+        self._build(MediaIndex.Load(self._path)).Stop()
+        lMeta = self._path + ".thumbs.json"
+        lThumbnails = self._path + ".thumbs.npy"
+        self.assertTrue(os.path.exists(lMeta))
+        lWritten = os.stat(lThumbnails).st_mtime_ns
+
+        # a rebuild would rewrite the strip, a reused one is only mapped
+        lReused = self._build(MediaIndex.Load(self._path))
+        self.assertEqual(os.stat(lThumbnails).st_mtime_ns, lWritten)
+        self.assertAlmostEqual(float(lReused.Get(31).mean()), 120.0, delta=3.0)
+
+        # a different step does not match the saved strip and is built again
+        lRebuilt = ThumbnailStrip(self._path, C_FRAMES, 30.0, step=5, width=32)
+        lRebuilt.Start()
+        self.assertTrue(lRebuilt.Wait(10.0))
+        self.assertNotEqual(os.stat(lThumbnails).st_mtime_ns, lWritten)
+
+    def test_wait_without_start(self):
+        self.assertFalse(ThumbnailStrip(self._path, C_FRAMES, 30.0).Wait(0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
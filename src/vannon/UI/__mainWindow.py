@@ -2,8 +2,9 @@
 from time import sleep
 
 # ==================================================================================
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QCloseEvent
-from PySide6.QtWidgets import QBoxLayout
+from PySide6.QtWidgets import QBoxLayout, QSlider
 
 # ==================================================================================
 from jAGUI.components.forms import ModernWindow
@@ -33,6 +34,15 @@ class MainWindow(ModernWindow):
         self.Layout.addWidget(lVS)
         # self.Layout.addStretch()
 
+        # dragging shows thumbnails, the full frame is fetched when the handle rests or is released
+        lScrubber: QSlider = QSlider(Qt.Orientation.Horizontal)
+        self.Layout.addWidget(lScrubber)
+
+        lScrubber.sliderMoved.connect(lVT.Scrub)
+        lScrubber.sliderReleased.connect(lambda: lVT.EndScrub(lScrubber.value()))
+        lVS.OnFrameIndexChanged.connect(lambda index: lScrubber.isSliderDown() or lScrubber.setValue(index))
+        lVT.OnMediaLoaded.connect(lambda mi: lScrubber.setRange(0, max(0, mi.FrameCount - 1)))
+
         lVT.OnMediaLoaded.connect(lambda mi: lVT.play())
         lVT.setVideoFile("D:\\Training\\Data\\video\\buying_hp_postion.mp4")
 
@@ -43,6 +43,7 @@ class VideoStream(GraphicsView):
 
         self._rawImage: cv.Mat = None  # current frame in ndarray format - used for snapping feature
         self._frameIndex: int = -1
+        self._previewing: bool = False  # a scrub thumbnail is on the canvas instead of the frame
         self._tmpVT: VideoThread = vt
         self._clipboard: list[QRectF] = list[QRectF]()
 
@@ -61,7 +62,8 @@ class VideoStream(GraphicsView):
             print("Frame not available")
             return
 
-        if self.FrameIndex != frameIndex:
+        if self.FrameIndex != frameIndex or self._previewing:
+            self._previewing = False
             self._rawImage = frame
 
             for gitem in self.scene().items():
@@ -76,6 +78,20 @@ class VideoStream(GraphicsView):
             self.scene().setSceneRect(0, 0, lPixmap.width(), lPixmap.height())
             self.fitInView(self.scene().sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
 
+    def _onPreview(self, frame: ndarray, frameIndex: int):
+        if self.InvokeRequired:
+            self.invoke(frame, frameIndex)
+            return
+
+        # drawn over the current frame's size so the view does not jump, the raw image stays the full frame
+        lPixmap: QPixmap = self.ProcessImage(frame)
+        lRect: QRectF = self.scene().sceneRect()
+        if not lRect.isEmpty():
+            lPixmap = lPixmap.scaled(int(lRect.width()), int(lRect.height()), Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation)
+
+        self.Canvas.setPixmap(lPixmap)
+        self._previewing = True
+
     def setupUI(self, layout: QBoxLayout = None):
 
         def _onBoxCreated(rect: QRectF):
@@ -89,6 +105,7 @@ class VideoStream(GraphicsView):
             self.DrawingEnabled = (state & ePlaybackState.PLAYING) != ePlaybackState.PLAYING
 
         self._tmpVT.OnFrame.connect(self._onFrame)
+        self._tmpVT.OnPreview.connect(self._onPreview)
         self._tmpVT.OnPlaybackStateChanged.connect(_playbackChanged, blocking=False)
         self.OnBoxCreated.connect(_onBoxCreated)
 
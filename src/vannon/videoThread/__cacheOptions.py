@@ -1,4 +1,5 @@
 # ==================================================================================
+from dataclasses import dataclass
 
 # ==================================================================================
 from jAGFx.serializer import Serialisable
@@ -6,18 +7,43 @@ from jAGFx.serializer import Serialisable
 # ==================================================================================
 
 
+@dataclass
+class CacheStatistics:
+    Hits: int = 0
+    Misses: int = 0
+    Evictions: int = 0
+    Prefetched: int = 0
+    Seeks: int = 0
+    Frames: int = 0
+    Bytes: int = 0
+
+    @property
+    def HitRate(self) -> float:
+        lLookups: int = self.Hits + self.Misses
+        return self.Hits / lLookups if lLookups > 0 else 0.0
+
+    def Reset(self):
+        self.Hits = self.Misses = self.Evictions = self.Prefetched = self.Seeks = 0
+
+
 class CacheOptions(Serialisable):
     def __init__(self, cacheDuration: int = 20000, timerInterval: int = 10,
                  averageSeekReadTimeWindow: int = 30000, timeSeekDuration: int = 10000,
-                 enabled: bool = True):
+                 enabled: bool = True, cacheSize: int = 512, gopSize: int = 0,
+                 thumbnailStep: int = 10, thumbnailWidth: int = 160):
         super().__init__()
         self._cacheDuration: int = cacheDuration
         self._timerInterval: int = timerInterval
         self._averageSeekReadTimeWindow: int = averageSeekReadTimeWindow
         self._timeSeekDuration: int = timeSeekDuration
         self._enabled: bool = enabled
+        self._cacheSize: int = cacheSize
+        self._gopSize: int = gopSize
+        self._thumbnailStep: int = thumbnailStep
+        self._thumbnailWidth: int = thumbnailWidth
+        self._statistics: CacheStatistics = CacheStatistics()
 
-        self.Properties.append(["CacheDuration", "TimerInterval", "AverageSeekReadTimeWindow", "TimeSeekDuration", "Enabled"])
+        self.Properties.append(["CacheDuration", "TimerInterval", "AverageSeekReadTimeWindow", "TimeSeekDuration", "Enabled", "CacheSize", "GopSize", "ThumbnailStep", "ThumbnailWidth"])
 
     @property
     def CacheDuration(self) -> int:
@@ -58,3 +84,47 @@ class CacheOptions(Serialisable):
     @IsEnabled.setter
     def IsEnabled(self, value: bool):
         self._enabled = value
+
+    @property
+    def CacheSize(self) -> int:
+        """Memory budget of the frame cache in megabytes."""
+        return self._cacheSize
+
+    @CacheSize.setter
+    def CacheSize(self, value: int):
+        self._cacheSize = value
+
+    @property
+    def GopSize(self) -> int:
+        """Frames per GOP the prefetcher assumes, 0 for one second of video."""
+        return self._gopSize
+
+    @GopSize.setter
+    def GopSize(self, value: int):
+        self._gopSize = value
+
+    @property
+    def ThumbnailStep(self) -> int:
+        """Frames between two scrub thumbnails, 0 disables them."""
+        return self._thumbnailStep
+
+    @ThumbnailStep.setter
+    def ThumbnailStep(self, value: int):
+        self._thumbnailStep = value
+
+    @property
+    def ThumbnailWidth(self) -> int:
+        return self._thumbnailWidth
+
+    @ThumbnailWidth.setter
+    def ThumbnailWidth(self, value: int):
+        self._thumbnailWidth = value
+
+    @property
+    def MaximumBytes(self) -> int:
+        return int(self._cacheSize * 1024 * 1024)
+
+    @property
+    def Statistics(self) -> CacheStatistics:
+        """Hit, miss and eviction counters of the frame cache using these options."""
+        return self._statistics
@@ -0,0 +1,105 @@
+# ==================================================================================
+from collections import OrderedDict
+from threading import RLock
+
+# ==================================================================================
+from numpy import ndarray
+
+# ==================================================================================
+from .__cacheOptions import CacheOptions, CacheStatistics
+
+
+class FrameCache:
+    """
+    Decoded frames by index, bounded by ``CacheOptions.MaximumBytes``.
+
+    When the budget is exceeded, the victim is the cached frame farthest from the playhead, the least
+    recently used one among equally far frames. A frame put farther away than everything cached is
+    dropped right away, so the frames around the cursor survive any amount of prefetching elsewhere.
+    Counters go to ``CacheOptions.Statistics``.
+    """
+
+    def __init__(self, options: CacheOptions) -> None:
+        self._options: CacheOptions = options
+        self._frames: OrderedDict[int, ndarray] = OrderedDict()
+        self._bytes: int = 0
+        self._frameBytes: int = 0
+        self._playhead: int = 0
+        self._lock: RLock = RLock()
+
+    def Get(self, frameIndex: int) -> ndarray | None:
+        with self._lock:
+            lFrame: ndarray = self._frames.get(frameIndex)
+            if lFrame is None:
+                self.Statistics.Misses += 1
+                return None
+
+            self._frames.move_to_end(frameIndex)
+            self.Statistics.Hits += 1
+            return lFrame
+
+    def Peek(self, frameIndex: int) -> ndarray | None:
+        """Like ``Get`` without counting the lookup or refreshing the frame."""
+        return self._frames.get(frameIndex)
+
+    def Put(self, frameIndex: int, frame: ndarray) -> bool:
+        """Caches the frame, False when it is not kept: larger than the budget or the farthest from the playhead."""
+        if frame.nbytes > self._options.MaximumBytes:
+            return False
+
+        with self._lock:
+            lPrevious: ndarray = self._frames.pop(frameIndex, None)
+            if lPrevious is not None:
+                self._bytes -= lPrevious.nbytes
+
+            self._frames[frameIndex] = frame
+            self._bytes += frame.nbytes
+            self._frameBytes = frame.nbytes
+            self._evict()
+            self._updateStatistics()
+            return frameIndex in self._frames
+
+    def Clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+            self._updateStatistics()
+
+    def _evict(self):
+        lMaximumBytes: int = self._options.MaximumBytes
+        while self._bytes > lMaximumBytes and len(self._frames) > 1:
+            # max keeps the first of equally far frames, the least recently used one
+            lVictim: int = max(self._frames, key=lambda index: abs(index - self._playhead))
+            self._bytes -= self._frames.pop(lVictim).nbytes
+            self.Statistics.Evictions += 1
+
+    def _updateStatistics(self):
+        self.Statistics.Frames = len(self._frames)
+        self.Statistics.Bytes = self._bytes
+
+    def __contains__(self, frameIndex: int) -> bool:
+        return frameIndex in self._frames
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def Playhead(self) -> int:
+        return self._playhead
+
+    @Playhead.setter
+    def Playhead(self, value: int):
+        self._playhead = value
+
+    @property
+    def Capacity(self) -> int:
+        """Frames of the size last put that fit in the budget, None before the first frame."""
+        return self._options.MaximumBytes // self._frameBytes if self._frameBytes else None
+
+    @property
+    def Bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def Statistics(self) -> CacheStatistics:
+        return self._options.Statistics
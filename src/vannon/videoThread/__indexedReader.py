@@ -0,0 +1,68 @@
+# ==================================================================================
+from typing import Iterator
+
+# ==================================================================================
+import av
+from av.container import InputContainer
+from numpy import ndarray
+
+# ==================================================================================
+from .__mediaIndex import MediaIndex
+
+
+class IndexedReader:
+    """
+    Frame-accurate reader over a ``MediaIndex``.
+
+    Frames are identified by their PTS instead of a position estimated from the frame rate. A read
+    that does not continue where the last one stopped seeks to the key frame of its first frame and
+    decodes forward, the frames in between are decoded but never converted.
+    """
+
+    def __init__(self, filePath: str, index: MediaIndex) -> None:
+        self._index: MediaIndex = index
+        self._container: InputContainer = av.open(filePath)
+        self._stream = self._container.streams.video[0]
+        self._stream.thread_type = "AUTO"
+        self._frames: Iterator = None
+        self._position: int = -1
+        self._seeks: int = 0
+
+    def Read(self, frames: range) -> Iterator[tuple[int, ndarray]]:
+        """Yields ``(frameIndex, bgr)`` for the frames of ``frames`` in order."""
+        if self._frames is None or self._position != frames.start:
+            self._seek(frames.start)
+
+        for lFrame in self._frames:
+            lIndex: int = self._index.FrameOf(lFrame.pts) if lFrame.pts is not None else self._position
+            self._position = lIndex + 1
+            if lIndex < frames.start:
+                continue
+
+            yield lIndex, lFrame.to_ndarray(format="bgr24")
+            if self._position >= frames.stop:
+                return
+
+        self._frames = None
+
+    def Close(self):
+        self._container.close()
+
+    def _seek(self, frameIndex: int):
+        lKeyFrame: int = self._index.KeyFrameOf(frameIndex)
+        self._container.seek(self._index.PtsOf(lKeyFrame), stream=self._stream, backward=True, any_frame=False)
+        self._frames = self._container.decode(self._stream)
+        self._position = lKeyFrame
+        self._seeks += 1
+
+    # region [PROPERTIES]
+    @property
+    def Position(self) -> int:
+        """Frame the next sequential read starts at."""
+        return self._position
+
+    @property
+    def Seeks(self) -> int:
+        return self._seeks
+
+    # endregion
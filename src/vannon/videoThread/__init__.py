@@ -4,8 +4,13 @@ VideoThread Module - Video playback functionality.
 This module provides the VideoThread class for video playback operations.
 """
 
-from .__cacheOptions import CacheOptions
+from .__cacheOptions import CacheOptions, CacheStatistics
+from .__frameCache import FrameCache
+from .__indexedReader import IndexedReader
+from .__mediaIndex import MediaIndex
 from .__playbackState import ePlaybackState
+from .__prefetcher import Prefetcher
+from .__thumbnailStrip import ThumbnailStrip
 from .__videoThread import VideoThread
 
-__all__ = ["VideoThread", "ePlaybackState", 'CacheOptions']
+__all__ = ["VideoThread", "ePlaybackState", 'CacheOptions', 'CacheStatistics', 'FrameCache', 'IndexedReader', 'MediaIndex', 'Prefetcher', 'ThumbnailStrip']
@@ -0,0 +1,182 @@
+# ==================================================================================
+import os
+from fractions import Fraction
+from time import monotonic
+
+# ==================================================================================
+import av
+from numpy import arange, argsort, array, bool_, diff, flatnonzero, int64, load, maximum, ndarray, savez, searchsorted, zeros
+
+# ==================================================================================
+from jAGFx.logger import debug, warning
+
+C_INDEX_SUFFIX: str = ".index.npz"
+C_INDEX_VERSION: int = 1
+
+
+class MediaIndex:
+    """
+    Timestamps, key frames and byte offsets of every frame of a video, in presentation order.
+
+    Built by demuxing the container once without decoding anything and kept in an ``.index.npz``
+    sidecar next to the video, rebuilt when the video's size or modification time changes. Frame
+    ``n`` is the n-th smallest PTS, which also makes ``FrameCount`` exact for variable frame rate
+    files. The key frame of every frame is precomputed, so finding where to start decoding a frame is
+    a single array lookup.
+    """
+
+    def __init__(self, pts: ndarray, keyFrames: ndarray, offsets: ndarray, timeBase: Fraction, source: tuple[int, int] = (0, 0)) -> None:
+        self._pts: ndarray = pts
+        self._keyFrames: ndarray = keyFrames
+        self._offsets: ndarray = offsets
+        self._timeBase: Fraction = timeBase
+        self._source: tuple[int, int] = source
+
+        lIsKeyFrame: ndarray = zeros(len(pts), dtype=bool_)
+        lIsKeyFrame[keyFrames] = True
+        # frames before the first key frame can only be decoded from the start of the stream
+        lIsKeyFrame[:1] = True
+        self._gopStarts: ndarray = maximum.accumulate(arange(len(pts)) * lIsKeyFrame)
+
+    # region [BUILDING]
+    @classmethod
+    def Load(cls, filePath: str) -> "MediaIndex":
+        """Index of the video, read from its sidecar when still valid, built and saved otherwise."""
+        lSource: tuple[int, int] = cls._sourceOf(filePath)
+        lPath: str = filePath + C_INDEX_SUFFIX
+        if os.path.exists(lPath):
+            try:
+                with load(lPath) as lFile:
+                    if int(lFile["version"]) == C_INDEX_VERSION and tuple(lFile["source"].tolist()) == lSource:
+                        lTimeBase: Fraction = Fraction(*lFile["timeBase"].tolist())
+                        return cls(lFile["pts"], lFile["keyFrames"], lFile["offsets"], lTimeBase, lSource)
+
+            except Exception as ex:
+                warning(f"Ignoring unreadable media index {lPath}: {ex}")
+
+        lIndex: MediaIndex = cls.Build(filePath)
+        lIndex.Save(lPath)
+        return lIndex
+
+    @classmethod
+    def Build(cls, filePath: str) -> "MediaIndex":
+        lStart: float = monotonic()
+        lPts: list[int] = []
+        lKeys: list[bool] = []
+        lOffsets: list[int] = []
+        with av.open(filePath) as lContainer:
+            lStream = lContainer.streams.video[0]
+            for lPacket in lContainer.demux(lStream):
+                # the flushing packet at the end has no timestamp and no data
+                if lPacket.size == 0 or (lPacket.pts is None and lPacket.dts is None):
+                    continue
+
+                lPts.append(lPacket.pts if lPacket.pts is not None else lPacket.dts)
+                lKeys.append(lPacket.is_keyframe)
+                lOffsets.append(lPacket.pos if lPacket.pos is not None else -1)
+
+            lTimeBase: Fraction = lStream.time_base
+
+        lOrder: ndarray = argsort(array(lPts, dtype=int64), kind="stable")
+        lIndex: MediaIndex = cls(
+            array(lPts, dtype=int64)[lOrder],
+            flatnonzero(array(lKeys, dtype=bool_)[lOrder]),
+            array(lOffsets, dtype=int64)[lOrder],
+            lTimeBase,
+            cls._sourceOf(filePath),
+        )
+        debug(f"Indexed {len(lPts)} frames of {filePath} in {(monotonic() - lStart) * 1000.0:.0f}ms")
+        return lIndex
+
+    def Save(self, path: str) -> bool:
+        try:
+            with open(path, "wb") as lFile:
+                savez(
+                    lFile,
+                    version=C_INDEX_VERSION,
+                    source=array(self._source, dtype=int64),
+                    timeBase=array([self._timeBase.numerator, self._timeBase.denominator], dtype=int64),
+                    pts=self._pts,
+                    keyFrames=self._keyFrames,
+                    offsets=self._offsets,
+                )
+
+            return True
+
+        except OSError as ex:
+            warning(f"Could not save the media index {path}: {ex}")
+            return False
+
+    @staticmethod
+    def _sourceOf(filePath: str) -> tuple[int, int]:
+        lStat: os.stat_result = os.stat(filePath)
+        return lStat.st_size, lStat.st_mtime_ns
+
+    # endregion
+
+    # region [LOOKUP]
+    def KeyFrameOf(self, frameIndex: int) -> int:
+        """Key frame decoding has to start from to reach ``frameIndex``."""
+        return int(self._gopStarts[frameIndex])
+
+    def NextKeyFrame(self, frameIndex: int) -> int:
+        """First key frame after ``frameIndex``, ``FrameCount`` when there is none."""
+        lPosition: int = int(searchsorted(self._keyFrames, frameIndex, side="right"))
+        return int(self._keyFrames[lPosition]) if lPosition < len(self._keyFrames) else self.FrameCount
+
+    def FrameOf(self, pts: int) -> int:
+        """Frame showing at ``pts``, the last one starting at or before it."""
+        return max(0, int(searchsorted(self._pts, pts, side="right")) - 1)
+
+    def FrameAt(self, seconds: float) -> int:
+        return self.FrameOf(int(round(seconds / self._timeBase)) + int(self._pts[0]) if self.FrameCount else 0)
+
+    def PtsOf(self, frameIndex: int) -> int:
+        return int(self._pts[frameIndex])
+
+    def TimeOf(self, frameIndex: int) -> float:
+        """Seconds from the first frame to ``frameIndex``."""
+        return float((int(self._pts[frameIndex]) - int(self._pts[0])) * self._timeBase)
+
+    # endregion
+
+    # region [PROPERTIES]
+    @property
+    def FrameCount(self) -> int:
+        return len(self._pts)
+
+    @property
+    def KeyFrames(self) -> ndarray:
+        return self._keyFrames
+
+    @property
+    def Pts(self) -> ndarray:
+        return self._pts
+
+    @property
+    def Offsets(self) -> ndarray:
+        return self._offsets
+
+    @property
+    def TimeBase(self) -> Fraction:
+        return self._timeBase
+
+    @property
+    def Duration(self) -> float:
+        if self.FrameCount < 2:
+            return 0.0
+
+        # the last frame is shown for as long as the one before it
+        lLast: int = int(self._pts[-1] - self._pts[-2])
+        return float((int(self._pts[-1] - self._pts[0]) + lLast) * self._timeBase)
+
+    @property
+    def AverageFPS(self) -> float:
+        return self.FrameCount / self.Duration if self.Duration > 0 else 0.0
+
+    @property
+    def IsVariableFrameRate(self) -> bool:
+        lDurations: ndarray = diff(self._pts)
+        return len(lDurations) > 0 and int(lDurations.max() - lDurations.min()) > 1
+
+    # endregion
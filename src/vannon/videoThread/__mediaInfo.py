@@ -6,16 +6,21 @@ from cv2 import CAP_PROP_FPS, CAP_PROP_FRAME_COUNT, VideoCapture
 # ==================================================================================
 from jAGFx.serializer import Serialisable
 
+# ==================================================================================
+from .__mediaIndex import MediaIndex
+
 # ==================================================================================
 
 
 class MediaInfo(Serialisable):
-    def __init__(self, media: VideoCapture, filePath: str) -> None:
+    def __init__(self, media: VideoCapture, filePath: str, index: MediaIndex = None) -> None:
         super().__init__()
-        self._fps: float = media.get(CAP_PROP_FPS)
-        self._ofps: float = media.get(CAP_PROP_FPS)
-        self._frameCount: int = media.get(CAP_PROP_FRAME_COUNT)
+        self._fps: float = media.get(CAP_PROP_FPS) or (index.AverageFPS if index is not None else 0.0)
+        self._ofps: float = self._fps
+        # the container header is an estimate, the index counted every frame
+        self._frameCount: int = index.FrameCount if index is not None else media.get(CAP_PROP_FRAME_COUNT)
         self._filePath: str = filePath
+        self._index: MediaIndex = index
 
         self.Properties.append(["FPS", "FrameCount"])
 
@@ -42,5 +47,9 @@ class MediaInfo(Serialisable):
     def Filepath(self, value: str):
         self._filePath = value
 
+    @property
+    def Index(self) -> MediaIndex:
+        return self._index
+
     def resetFPS(self):
         self._fps = self._ofps
@@ -0,0 +1,294 @@
+# ==================================================================================
+from threading import Condition, Thread
+from time import monotonic
+from typing import Iterator
+
+# ==================================================================================
+from cv2 import CAP_PROP_POS_FRAMES, VideoCapture
+from numpy import ndarray
+
+# ==================================================================================
+from jAGFx.logger import debug, error, warning
+
+# ==================================================================================
+from .__cacheOptions import CacheOptions
+from .__frameCache import FrameCache
+from .__indexedReader import IndexedReader
+from .__mediaIndex import MediaIndex
+
+
+class Prefetcher:
+    """
+    Fills the frame cache from its own decoder on a worker thread, the playback capture is never shared.
+
+    Frames are decoded in runs of consecutive frames inside one GOP. Each run costs one seek to the
+    key frame it starts on, then only sequential reads. Ahead of the playhead a run starts at the
+    first missing frame. Behind it, when playing backwards, the whole GOP holding the missing frame
+    is decoded forward and the playback serves it from the cache in reverse. ``WaitFor`` moves a
+    frame to the front of the queue for a playback that jumped. With a ``MediaIndex`` the GOPs are
+    the real ones and frames are read by timestamp through an ``IndexedReader``. Without one, the
+    decoder is an OpenCV capture and a GOP is taken as ``CacheOptions.GopSize`` frames, or one second
+    of video when that is 0.
+    """
+
+    def __init__(self, cache: FrameCache, options: CacheOptions) -> None:
+        self._cache: FrameCache = cache
+        self._options: CacheOptions = options
+        self._gopSize: int = 1
+
+        self._filePath: str = None
+        self._index: MediaIndex = None
+        self._frameCount: int = 0
+        self._fps: float = 0.0
+        self._generation: int = 0
+        self._playhead: int = 0
+        self._backward: bool = False
+        self._request: int = -1
+        self._unreadable: set[int] = set()
+
+        self._capture: VideoCapture = None
+        self._reader: IndexedReader = None
+        self._position: int = -1
+        self._condition: Condition = Condition()
+        self._thread: Thread = None
+        self._running: bool = False
+
+    # region [CONTROL]
+    def Open(self, filePath: str, frameCount: int, fps: float, index: MediaIndex = None):
+        with self._condition:
+            self._filePath = filePath
+            self._index = index
+            # an index counted the frames, the count of the container header is only an estimate
+            self._frameCount = min(frameCount, index.FrameCount) if index is not None else frameCount
+            self._fps = fps
+            self._gopSize = max(1, self._options.GopSize or round(fps) or 1)
+            self._generation += 1
+            self._request = -1
+            self._unreadable = set()
+            self._condition.notify_all()
+
+    def Start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._running = True
+        self._thread = Thread(target=self._run, daemon=True, name="Prefetcher")
+        self._thread.start()
+
+    def Stop(self, timeout: float = 1.0):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+        self._thread = None
+
+    def Move(self, playhead: int, backward: bool):
+        with self._condition:
+            self._playhead = playhead
+            self._backward = backward
+            self._condition.notify_all()
+
+    def WaitFor(self, frameIndex: int, timeout: float) -> bool:
+        """Decodes ``frameIndex`` before anything else, True once it is cached."""
+        if not self.IsRunning:
+            return False
+
+        lDeadline: float = monotonic() + timeout
+        with self._condition:
+            self._request = frameIndex
+            self._condition.notify_all()
+            while frameIndex not in self._cache and frameIndex not in self._unreadable and self._running and (lLeft := lDeadline - monotonic()) > 0:
+                self._condition.wait(lLeft)
+
+            if self._request == frameIndex:
+                self._request = -1
+
+            return frameIndex in self._cache
+
+    # endregion
+
+    # region [PLANNING]
+    def Plan(self, playhead: int, frameCount: int, fps: float, backward: bool) -> range | None:
+        """
+        Next run to decode around ``playhead``, the playback direction first. None when the window is cached.
+
+        The window spans ``CacheDuration`` but never more frames than the cache holds. Cut to the
+        budget it is the set of frames nearest the playhead, exactly what the cache keeps, so filling
+        it never evicts a frame of it and the planning comes to an end.
+        """
+        lTotalFrames: int = int((self._options.CacheDuration / 1000) * fps)
+        lCapacity: int = self._cache.Capacity
+        if lCapacity is not None and lTotalFrames >= lCapacity:
+            # an even count keeps the window symmetric, the frames on either edge are equally far
+            lTotalFrames = max(0, (lCapacity - 1) // 2 * 2)
+
+        lLeftFrames: int = min(lTotalFrames // 2, playhead)
+        lStart: int = max(0, playhead - lLeftFrames)
+        lEnd: int = min(frameCount - 1, playhead + lTotalFrames - lLeftFrames)
+
+        lAhead: range = range(playhead + 1, lEnd + 1)
+        lBehind: range = range(playhead - 1, lStart - 1, -1)
+        for lFrames in ((lBehind, lAhead) if backward else (lAhead, lBehind)):
+            lMissing: int = next((lFrame for lFrame in lFrames if lFrame not in self._cache and lFrame not in self._unreadable), -1)
+            if lMissing < 0:
+                continue
+
+            lGopStart: int = self.GopStart(lMissing)
+            if lFrames is lBehind:
+                return range(lGopStart, lMissing + 1)
+
+            return range(lMissing, min(self.NextGopStart(lMissing), lEnd + 1))
+
+        return None
+
+    def GopStart(self, frameIndex: int) -> int:
+        if self._index is not None:
+            return self._index.KeyFrameOf(frameIndex)
+
+        return frameIndex - frameIndex % self._gopSize
+
+    def NextGopStart(self, frameIndex: int) -> int:
+        if self._index is not None:
+            return self._index.NextKeyFrame(frameIndex)
+
+        return self.GopStart(frameIndex) + self._gopSize
+
+    def _next(self) -> range | None:
+        if self._request >= self._frameCount:
+            self._unreadable.add(self._request)
+
+        if self._request >= 0:
+            if self._request not in self._cache and self._request not in self._unreadable:
+                return range(self.GopStart(self._request), self._request + 1)
+
+            self._request = -1
+
+        return self.Plan(self._playhead, self._frameCount, self._fps, self._backward)
+
+    # endregion
+
+    # region [DECODING]
+    def _run(self):
+        lOpened: int = -1
+        try:
+            while self._running:
+                with self._condition:
+                    if self._generation != lOpened:
+                        lOpened = self._generation
+                        self._open(self._filePath, self._index)
+
+                    lGeneration: int = self._generation
+                    lReady: bool = self._capture is not None or self._reader is not None
+                    lRun: range = self._next() if lReady and self._options.IsEnabled else None
+                    if lRun is None:
+                        self._condition.wait(self._options.TimerInterval / 1000)
+                        continue
+
+                if not self._decode(lRun, lGeneration):
+                    # nothing came out of the run, give the decoder a tick before planning the next one
+                    with self._condition:
+                        self._condition.wait(self._options.TimerInterval / 1000)
+
+        except Exception as ex:
+            error("Prefetcher stopped", ex)
+
+        finally:
+            self._close()
+
+    def _open(self, filePath: str, index: MediaIndex):
+        self._close()
+        if filePath and index is not None:
+            try:
+                self._reader = IndexedReader(filePath, index)
+                debug(f"Prefetching {filePath} by index")
+                return
+
+            except Exception as ex:
+                warning(f"Prefetcher falls back to OpenCV for {filePath}: {ex}")
+
+        self._capture = VideoCapture(filePath) if filePath else None
+        self._position = 0
+        if self._capture is not None and not self._capture.isOpened():
+            error(f"Prefetcher could not open {filePath}")
+            self._capture = None
+
+        debug(f"Prefetching {filePath}")
+
+    def _close(self):
+        if self._reader is not None:
+            self._reader.Close()
+            self._reader = None
+
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def _decode(self, run: range, generation: int) -> int:
+        """
+        Reads ``run`` sequentially into the cache, stops when the media changes or a frame is waited for elsewhere.
+
+        A run that ends early marks the frame it could not read, so the planning skips it instead of
+        seeking to it again. That is how an overstated frame count or a damaged frame ends up.
+        """
+        lDecoded: int = 0
+        lNext: int = run.start
+        lStopped: bool = False
+        for lPosition, lFrame in self._read(run):
+            lDecoded += 1
+            lNext = lPosition + 1
+            if lPosition not in self._cache:
+                self._cache.Put(lPosition, lFrame)
+
+                with self._condition:
+                    self._condition.notify_all()
+
+            if generation != self._generation or not self._running or (self._request >= 0 and self._request not in run):
+                lStopped = True
+                break
+
+        if not lStopped and lNext < run.stop and generation == self._generation:
+            with self._condition:
+                self._unreadable.add(lNext)
+                self._condition.notify_all()
+
+            debug(f"Prefetcher could not read frame {lNext} of {self._filePath}")
+
+        self._options.Statistics.Prefetched += lDecoded
+        return lDecoded
+
+    def _read(self, run: range) -> Iterator[tuple[int, ndarray]]:
+        if self._reader is not None:
+            if self._reader.Position != run.start:
+                self._options.Statistics.Seeks += 1
+
+            yield from self._reader.Read(run)
+            return
+
+        for lPosition in run:
+            if self._position != lPosition:
+                self._capture.set(CAP_PROP_POS_FRAMES, lPosition)
+                self._options.Statistics.Seeks += 1
+
+            lRet, lFrame = self._capture.read()
+            if not lRet or lFrame is None or lFrame.ndim == 0:
+                self._position = -1
+                return
+
+            self._position = lPosition + 1
+            yield lPosition, lFrame
+
+    # endregion
+
+    # region [PROPERTIES]
+    @property
+    def GopSize(self) -> int:
+        return self._gopSize
+
+    @property
+    def IsRunning(self) -> bool:
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    # endregion
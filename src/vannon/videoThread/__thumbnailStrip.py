@@ -0,0 +1,202 @@
+# ==================================================================================
+import json
+import os
+from threading import Event, Thread
+from time import monotonic
+
+# ==================================================================================
+import av
+from numpy import flatnonzero, int8, load, ndarray, searchsorted, uint8, zeros
+from numpy.lib.format import open_memmap
+
+# ==================================================================================
+from jAGFx.logger import debug, error, warning
+
+# ==================================================================================
+from .__mediaIndex import MediaIndex
+
+C_THUMBNAIL_SUFFIX: str = ".thumbs.npy"
+C_THUMBNAIL_META_SUFFIX: str = ".thumbs.json"
+C_DEFAULT_THUMBNAIL_STEP: int = 10
+C_DEFAULT_THUMBNAIL_WIDTH: int = 160
+
+C_LEVEL_EMPTY: int = 0
+C_LEVEL_KEYFRAME: int = 1
+C_LEVEL_EXACT: int = 2
+
+
+class ThumbnailStrip:
+    """
+    Small BGR thumbnails of every ``step``-th frame, kept in a memory-mapped ``.thumbs.npy`` next to the video.
+
+    The strip is built in the background as a two-level pyramid. A first pass decodes only the key
+    frames, which is fast and soon covers the whole video coarsely. A second pass decodes every frame
+    and replaces each slot with its exact frame. ``Get`` answers from the finest slot available near
+    the frame, so a scrub has a picture from the first seconds on. A finished strip is reused as long
+    as the video is unchanged.
+    """
+
+    def __init__(self, filePath: str, frameCount: int, fps: float, index: MediaIndex = None,
+                 step: int = C_DEFAULT_THUMBNAIL_STEP, width: int = C_DEFAULT_THUMBNAIL_WIDTH) -> None:
+        self._filePath: str = filePath
+        self._frameCount: int = frameCount
+        self._fps: float = fps
+        self._index: MediaIndex = index
+        self._step: int = max(1, step)
+        self._width: int = width
+        self._slots: int = (frameCount + self._step - 1) // self._step
+
+        self._thumbnails: ndarray = None
+        self._levels: ndarray = zeros(self._slots, dtype=int8)
+        self._filled: ndarray = zeros(0, dtype=int8)
+        self._thread: Thread = None
+        self._done: Event = Event()
+        self._running: bool = False
+
+    def Start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._running = True
+        self._done.clear()
+        self._thread = Thread(target=self._run, daemon=True, name="Thumbnails")
+        self._thread.start()
+
+    def Stop(self, timeout: float = 1.0):
+        self._running = False
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+        self._thread = None
+
+    def Wait(self, timeout: float = None) -> bool:
+        """Blocks until the builder finished or was stopped, True when the strip is complete."""
+        if self._thread is not None:
+            self._done.wait(timeout)
+
+        return self.IsComplete
+
+    def Get(self, frameIndex: int) -> ndarray | None:
+        """Thumbnail closest to ``frameIndex``, None while nothing near it is decoded yet."""
+        lFilled: ndarray = self._filled
+        if self._thumbnails is None or len(lFilled) == 0:
+            return None
+
+        lSlot: int = min(self._slots - 1, max(0, round(frameIndex / self._step)))
+        if self._levels[lSlot] == C_LEVEL_EXACT:
+            return self._thumbnails[lSlot]
+
+        lPosition: int = int(searchsorted(lFilled, lSlot))
+        lNearest: list[int] = [int(lFilled[lIndex]) for lIndex in (lPosition - 1, lPosition) if 0 <= lIndex < len(lFilled)]
+        return self._thumbnails[min(lNearest, key=lambda slot: abs(slot - lSlot))]
+
+    # region [BUILDING]
+    def _run(self):
+        lStart: float = monotonic()
+        try:
+            if self._load():
+                return
+
+            with av.open(self._filePath) as lContainer:
+                lStream = lContainer.streams.video[0]
+                lStream.thread_type = "AUTO"
+                self._create(lStream.codec_context.width, lStream.codec_context.height)
+
+                lStream.codec_context.skip_frame = "NONKEY"
+                self._decode(lContainer, lStream, C_LEVEL_KEYFRAME)
+                debug(f"Key frame thumbnails of {self._filePath} in {(monotonic() - lStart) * 1000.0:.0f}ms")
+
+                lContainer.seek(0, stream=lStream)
+                lStream.codec_context.skip_frame = "DEFAULT"
+                if self._decode(lContainer, lStream, C_LEVEL_EXACT):
+                    self._save()
+                    debug(f"Thumbnails of {self._filePath} in {(monotonic() - lStart) * 1000.0:.0f}ms")
+
+        except Exception as ex:
+            error(f"Failed to build the thumbnails of {self._filePath}", ex)
+
+        finally:
+            self._done.set()
+
+    def _decode(self, container, stream, level: int) -> bool:
+        """Fills the slots below ``level`` from one decoding pass, False when stopped on the way."""
+        lWidth, lHeight = self._thumbnails.shape[2], self._thumbnails.shape[1]
+        for lFrame in container.decode(stream):
+            if not self._running:
+                return False
+
+            lFrameIndex: int = self._frameOf(lFrame)
+            if level == C_LEVEL_EXACT and lFrameIndex % self._step != 0:
+                continue
+
+            lSlot: int = min(self._slots - 1, round(lFrameIndex / self._step))
+            if self._levels[lSlot] >= level:
+                continue
+
+            self._thumbnails[lSlot] = lFrame.reformat(width=lWidth, height=lHeight, format="bgr24").to_ndarray()
+            self._levels[lSlot] = level
+            self._filled = flatnonzero(self._levels)
+
+        return True
+
+    def _frameOf(self, frame: av.VideoFrame) -> int:
+        if self._index is not None and frame.pts is not None:
+            return self._index.FrameOf(frame.pts)
+
+        return round((frame.time or 0.0) * self._fps)
+
+    def _create(self, width: int, height: int):
+        lHeight: int = max(2, round(height * self._width / width) // 2 * 2)
+        lShape: tuple[int, ...] = (self._slots, lHeight, self._width, 3)
+        try:
+            self._thumbnails = open_memmap(self._filePath + C_THUMBNAIL_SUFFIX, mode="w+", dtype=uint8, shape=lShape)
+
+        except OSError as ex:
+            warning(f"Keeping the thumbnails of {self._filePath} in memory: {ex}")
+            self._thumbnails = zeros(lShape, dtype=uint8)
+
+    def _load(self) -> bool:
+        lPath: str = self._filePath + C_THUMBNAIL_META_SUFFIX
+        if not os.path.exists(lPath):
+            return False
+
+        with open(lPath, "r", encoding="utf-8") as lFile:
+            lMeta: dict = json.load(lFile)
+
+        if lMeta != self._meta():
+            return False
+
+        self._thumbnails = load(self._filePath + C_THUMBNAIL_SUFFIX, mmap_mode="r")
+        self._levels[:] = C_LEVEL_EXACT
+        self._filled = flatnonzero(self._levels)
+        return True
+
+    def _save(self):
+        if not hasattr(self._thumbnails, "flush"):
+            return
+
+        self._thumbnails.flush()
+        with open(self._filePath + C_THUMBNAIL_META_SUFFIX, "w", encoding="utf-8") as lFile:
+            json.dump(self._meta(), lFile)
+
+    def _meta(self) -> dict:
+        lStat: os.stat_result = os.stat(self._filePath)
+        return {"source": [lStat.st_size, lStat.st_mtime_ns], "step": self._step, "width": self._width, "slots": self._slots}
+
+    # endregion
+
+    # region [PROPERTIES]
+    @property
+    def Step(self) -> int:
+        return self._step
+
+    @property
+    def Progress(self) -> float:
+        """Share of the slots holding their exact frame."""
+        return float((self._levels == C_LEVEL_EXACT).mean()) if self._slots else 1.0
+
+    @property
+    def IsComplete(self) -> bool:
+        return self._slots > 0 and bool((self._levels == C_LEVEL_EXACT).all())
+
+    # endregion
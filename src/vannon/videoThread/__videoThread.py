@@ -1,29 +1,41 @@
 # ==================================================================================
-from threading import RLock, Thread
-from time import monotonic, sleep, time
+from collections import deque
+from threading import RLock, Timer
+from time import monotonic, sleep
 
 # ==================================================================================
 from cv2 import CAP_PROP_FPS, CAP_PROP_FRAME_COUNT, CAP_PROP_POS_FRAMES, VideoCapture
-from numpy import ndarray
+from numpy import array, float64, ndarray, percentile
 
 # ==================================================================================
 from jAGFx.exceptions import jAGException
-from jAGFx.logger import debug
+from jAGFx.logger import debug, warning
 from jAGFx.serializer import Serialisable
 from jAGFx.signal import Signal
 from streamer import Streamer, StreamerOptions
 
 # ==================================================================================
 from .__cacheOptions import CacheOptions
+from .__frameCache import FrameCache
+from .__mediaIndex import MediaIndex
 from .__mediaInfo import MediaInfo
 from .__mediaState import eMediaState
 from .__playbackState import ePlaybackState
+from .__prefetcher import Prefetcher
+from .__thumbnailStrip import ThumbnailStrip
+
+C_PREFETCH_WAIT: float = 0.5
+C_SCRUB_SETTLE: float = 0.15
+C_JITTER_WINDOW: int = 600
+C_DEFAULT_PERCENTILES: tuple[int, ...] = (50, 95, 99)
 
 
 class VideoThread(Streamer):
     OnPlaybackStateChanged: Signal = Signal(ePlaybackState)
     OnMediaLoaded: Signal = Signal(MediaInfo)
     OnMediaStateChanged: Signal = Signal(eMediaState)
+    # low resolution frame while scrubbing, the full frame follows on OnFrame once the cursor settles
+    OnPreview: Signal = Signal(ndarray, int)
 
     def __init__(self, options: StreamerOptions = None, cacheOptions: CacheOptions = None):
         super().__init__(options)
@@ -36,14 +48,14 @@ class VideoThread(Streamer):
         self._mediaState: eMediaState = eMediaState.UNLOADED
         self._playbackSpeed: float = 1.0
         self._targetFrameTime: float = 0.0
+        self._jitter: deque[float] = deque(maxlen=C_JITTER_WINDOW)
 
         # region [CACHE]
-        self._cache: dict[int, ndarray] = {}
         self._cacheOptions: CacheOptions = cacheOptions or CacheOptions()
-        self._timeSeeks: dict[float, tuple[float, float]] = {}
-        self._averageSeekReadTime: float = 0.0
-        self._frameTimeTimeLeft: float = 0.0
-        self._cacheTimer: Thread = None
+        self._cache: FrameCache = FrameCache(self._cacheOptions)
+        self._prefetcher: Prefetcher = Prefetcher(self._cache, self._cacheOptions)
+        self._thumbnails: ThumbnailStrip = None
+        self._scrubTimer: Timer = None
         # endregion
 
         # region [LOCKS]
@@ -53,7 +65,6 @@ class VideoThread(Streamer):
         self._playLock: RLock = RLock()
         self._mediLock: RLock = RLock()
         self._cacheLock: RLock = RLock()
-        self._frameTimeLock: RLock = RLock()
         self._speedLock: RLock = RLock()
         # endregion
 
@@ -63,34 +74,36 @@ class VideoThread(Streamer):
     def _getFrame(self, position: int = -1)-> ndarray:
         lFrame: ndarray = None
         lRet: bool = False
-        lSeekTime: float = 0.0
-        lReadTime: float = 0.0
 
         # Check cache first (if enabled)
         if position >= 0 and self._cacheOptions.IsEnabled:
+            # the frame asked for is where the cursor goes, eviction must not drop it or its neighbours
+            self._cache.Playhead = position
             lFrame = self.GetCachedFrame(position)
             if lFrame is not None:
                 return lFrame
 
+            # the playback capture only reads sequentially, a jump is served by the prefetcher's decoder
+            with self._vcapLock:
+                lJumped: bool = self._vcap is not None and position != int(self._vcap.get(CAP_PROP_POS_FRAMES))
+
+            if lJumped and self._prefetcher.WaitFor(position, C_PREFETCH_WAIT):
+                lFrame = self._cache.Peek(position)
+                if lFrame is not None:
+                    return lFrame
+
         with self._vcapLock:
             if self._vcap is not None:
                 if int(position) != int(self._vcap.get(CAP_PROP_POS_FRAMES)):
-                    lStartSeek = monotonic() * 1000
                     self._vcap.set(CAP_PROP_POS_FRAMES, position)
-                    lSeekTime = (monotonic() * 1000) - lStartSeek
+                    self._cacheOptions.Statistics.Seeks += 1
 
-                lStartRead = monotonic() * 1000
                 lRet, lFrame = self._vcap.read()
-                lReadTime = (monotonic() * 1000) - lStartRead
-
-                # Track seek/read times (only non-zero values)
-                if lSeekTime > 0 or lReadTime > 0:
-                    self._updateAverageSeekReadTime(lSeekTime, lReadTime)
 
         lFrame = lFrame if lRet else None
         lFrame = None if lFrame is not None and lFrame.ndim == 0 else lFrame
 
-        # Track seek/read times and cache frame (if enabled)
+        # Cache frame (if enabled)
         if self._cacheOptions.IsEnabled:
             # Cache the frame if retrieved
             if lFrame is not None and position >= 0:
@@ -100,6 +113,8 @@ class VideoThread(Streamer):
 
     def _setNextFrame(self):
         self.CurrentFrame = self.NextFrame
+        self._cache.Playhead = self.CurrentFrame
+        self.UpdateCache()
 
         if self.PlaybackState & ePlaybackState.BACKWARD == ePlaybackState.BACKWARD:
             self.NextFrame -= 1
@@ -116,7 +131,8 @@ class VideoThread(Streamer):
             lFrame: ndarray = None
             try:
                 if self.IsSeeking:
-                    lFrame = self._getFrame(self.SeekRequest)
+                    self.NextFrame = self.SeekRequest
+                    lFrame = self._getFrame(self.NextFrame)
                     self._setNextFrame()
                     self.SeekRequest = -1
 
@@ -132,6 +148,10 @@ class VideoThread(Streamer):
                                 self.ResetFrameId()
                                 self.PlaybackState = ePlaybackState.STOPPED
 
+                        elif self.NextFrame < 0:
+                            self.NextFrame = 0
+                            self.PlaybackState = ePlaybackState.PAUSED
+
                 # Precise timing with target timestamps
                 if self._targetFrameTime == 0.0:
                     self._targetFrameTime = monotonic()
@@ -145,6 +165,10 @@ class VideoThread(Streamer):
                 lSleepDuration = max(0.0, self._targetFrameTime - lCurrentTime)
                 sleep(lSleepDuration)
 
+                # how late the frame goes out against its slot, decoding that outruns the frame time shows here
+                if lFrame is not None and self.PlaybackState & ePlaybackState.PLAYING:
+                    self._jitter.append(monotonic() - self._targetFrameTime)
+
                 lStartTime = monotonic() * 1000
 
                 return lFrame
@@ -218,6 +242,18 @@ class VideoThread(Streamer):
         with self._speedLock:
             return self._playbackSpeed
 
+    def PlaybackJitter(self, percentiles: tuple[int, ...] = C_DEFAULT_PERCENTILES) -> dict[int, float]:
+        """Lateness of the recently played frames against their frame slot in milliseconds."""
+        if not self._jitter:
+            return {}
+
+        lSamples = array(self._jitter, dtype=float64)
+        return dict(zip(percentiles, (percentile(lSamples, percentiles) * 1000.0).tolist()))
+
+    @property
+    def MaxPlaybackJitter(self) -> float:
+        return max(self._jitter, default=0.0) * 1000.0
+
     def setPlaybackSpeed(self, speed: float):
         with self._speedLock:
             self._playbackSpeed = max(0.1, speed)  # Minimum 0.1x speed
@@ -227,7 +263,7 @@ class VideoThread(Streamer):
 
     def EnableCache(self):
         if not self._cacheOptions.IsEnabled:
-            self._startCacheTimer()
+            self._startCache()
             self._cacheOptions.IsEnabled = True
 
     def DisableCache(self):
@@ -252,10 +288,19 @@ class VideoThread(Streamer):
         if not lVidCap.isOpened():
             raise Exception(f"VideoThread: Could not open video file: {filePath}")
 
+        lIndex: MediaIndex = None
+        try:
+            lIndex = MediaIndex.Load(filePath)
+
+        except Exception as ex:
+            warning(f"VideoThread: No media index for {filePath}, seeking through OpenCV: {ex}")
+
         with self._vcapLock:
             self.ClearCache()  # Clear cache when unloading media
-            self._mediaInfo = MediaInfo(lVidCap, filePath)
+            self._mediaInfo = MediaInfo(lVidCap, filePath, lIndex)
             self._vcap = lVidCap
+            self._prefetcher.Open(filePath, self._mediaInfo.FrameCount, self._mediaInfo.FPS, lIndex)
+            self._startThumbnails(lIndex)
 
             self.OnMediaLoaded.emit(self.MediaInfo)
 
@@ -267,7 +312,7 @@ class VideoThread(Streamer):
 
             if not self.is_alive():
                 if self._cacheOptions.IsEnabled:
-                    self._startCacheTimer()
+                    self._startCache()
 
                 self.start()
 
@@ -278,128 +323,68 @@ class VideoThread(Streamer):
                 # Reset timing on seek
                 self._targetFrameTime = monotonic()
 
-    def GetCachedFrame(self, frameIndex: int) -> ndarray | None:
-        with self._cacheLock:
-            return self._cache.get(frameIndex, None)
-
-    def AddToCache(self, frameIndex: int, frame: ndarray):
-        with self._cacheLock:
-            self._cache[frameIndex] = frame
-
-    def ClearCache(self):
-        with self._cacheLock:
-            self._cache.clear()
-            self._timeSeeks.clear()
-            self._averageSeekReadTime = 0.0
-
-    def UpdateCache(self):
-        if not self._cacheOptions.IsEnabled or self.MediaInfo is None or self._vcap is None:
+    def Scrub(self, frameIndex: int):
+        """Shows the nearest thumbnail right away, the exact frame is only fetched once the cursor rests."""
+        if self.MediaInfo is None or not 0 <= frameIndex < self.MediaInfo.FrameCount:
             return
 
-        lTotalCacheFrames = int((self._cacheOptions.CacheDuration / 1000) * self.MediaInfo.FPS)
-        lCurrentFrame = self.CurrentFrame
-
-        lLeftFrames = min(lTotalCacheFrames // 2, lCurrentFrame)
-        lRightFrames = lTotalCacheFrames - lLeftFrames
-
-        lStartFrame = max(0, lCurrentFrame - lLeftFrames)
-        lEndFrame = min(self.MediaInfo.FrameCount - 1, lCurrentFrame + lRightFrames)
-
-        # Determine priority direction
-        lPriorityDirection = 1  # Default forward
-        if self.PlaybackState & ePlaybackState.BACKWARD:
-            lPriorityDirection = -1
-
-        # Find next uncached frame in priority direction
-        lFrameToCache = -1
-        if lPriorityDirection > 0:
-            # Forward priority: cache right first
-            for lFrame in range(lCurrentFrame + 1, lEndFrame + 1):
-                if lFrame not in self._cache:
-                    lFrameToCache = lFrame
-                    break
-            if lFrameToCache == -1:
-                # No right frames, cache left
-                for lFrame in range(lCurrentFrame - 1, lStartFrame - 1, -1):
-                    if lFrame not in self._cache:
-                        lFrameToCache = lFrame
-                        break
-        else:
-            # Backward priority: cache left first
-            for lFrame in range(lCurrentFrame - 1, lStartFrame - 1, -1):
-                if lFrame not in self._cache:
-                    lFrameToCache = lFrame
-                    break
-            if lFrameToCache == -1:
-                # No left frames, cache right
-                for lFrame in range(lCurrentFrame + 1, lEndFrame + 1):
-                    if lFrame not in self._cache:
-                        lFrameToCache = lFrame
-                        break
-
-        # Cache the frame if found
-        if lFrameToCache >= 0:
-            lFrame = self._getFrame(lFrameToCache)
-            if lFrame is not None:
-                self.AddToCache(lFrameToCache, lFrame)
-
-    def _updateAverageSeekReadTime(self, seekTime: int, readTime: int):
-        lCurrentTime = time() * 1000
-        self._timeSeeks[lCurrentTime] = (seekTime, readTime)
+        if self._scrubTimer is not None:
+            self._scrubTimer.cancel()
 
-        lCutoffTime = lCurrentTime - self._cacheOptions.TimeSeekDuration
+        lThumbnail: ndarray = self._thumbnails.Get(frameIndex) if self._thumbnails is not None else None
+        if lThumbnail is not None:
+            self.OnPreview.emit(lThumbnail, frameIndex)
 
-        # Clean old entries
-        self._timeSeeks = {k: v for k, v in self._timeSeeks.items() if k >= lCutoffTime}
+        self._scrubTimer = Timer(C_SCRUB_SETTLE, self.seek, (frameIndex,))
+        self._scrubTimer.daemon = True
+        self._scrubTimer.start()
 
-        if not self._timeSeeks:
-            self._averageSeekReadTime = 1000 / self.MediaInfo.FPS if self.MediaInfo else 0.0
-            return
+    def EndScrub(self, frameIndex: int):
+        if self._scrubTimer is not None:
+            self._scrubTimer.cancel()
+            self._scrubTimer = None
 
-        # Calculate average of non-zero seek+read times
-        lTotalSeekTime = 0.0
-        lSeekCount = 0
-        lTotalReadTime = 0.0
-        lReadCount = 0
-        for lSeekTime, lReadTime in self._timeSeeks.values():
+        self.seek(frameIndex)
 
-            if lSeekTime > 0:
-                lTotalSeekTime += lSeekTime
-                lSeekCount += 1
+    def _startThumbnails(self, index: MediaIndex):
+        if self._thumbnails is not None:
+            self._thumbnails.Stop()
+            self._thumbnails = None
 
-            if lReadTime > 0:
-                lTotalReadTime += lReadTime
-                lReadCount += 1
+        if self._cacheOptions.ThumbnailStep > 0:
+            self._thumbnails = ThumbnailStrip(self.MediaInfo.Filepath, self.MediaInfo.FrameCount, self.MediaInfo.FPS, index,
+                                              self._cacheOptions.ThumbnailStep, self._cacheOptions.ThumbnailWidth)
+            self._thumbnails.Start()
 
-        lAvgSeekTime = lTotalSeekTime / lSeekCount if lSeekCount > 0 else 0
-        lAvgReadTime = lTotalReadTime / lReadCount if lReadCount > 0 else 0
+    @property
+    def Thumbnails(self) -> ThumbnailStrip:
+        return self._thumbnails
 
-        self._averageSeekReadTime = lAvgSeekTime + lAvgReadTime if lAvgSeekTime > 0 or lAvgReadTime > 0 else (1000 / self.MediaInfo.FPS if self.MediaInfo else 0.0)
+    def GetCachedFrame(self, frameIndex: int) -> ndarray | None:
+        return self._cache.Get(frameIndex)
 
-    def _startCacheTimer(self):
-        if self._cacheTimer is not None and self._cacheTimer.is_alive():
-            return
+    def AddToCache(self, frameIndex: int, frame: ndarray):
+        self._cache.Put(frameIndex, frame)
 
-        def _cacheTimerLoop():
-            while self.MediaState == eMediaState.LOADED and self._cacheOptions.IsEnabled:
-                with self._frameTimeLock:
-                    if self._frameTimeTimeLeft > self._averageSeekReadTime:
-                        self.UpdateCache()
+    def ClearCache(self):
+        with self._cacheLock:
+            self._cache.Clear()
+            self._cacheOptions.Statistics.Reset()
 
-                sleep(self._cacheOptions.TimerInterval / 1000)
+    def UpdateCache(self):
+        """Tells the prefetcher where the playhead is, the frames around it are decoded on its own thread."""
+        lBackward: bool = self.PlaybackState & ePlaybackState.BACKWARD == ePlaybackState.BACKWARD
+        self._prefetcher.Move(self.CurrentFrame, lBackward)
 
-        debug("starting cache timer")
-        self._cacheTimer = Thread(target=_cacheTimerLoop, daemon=True)
-        self._cacheTimer.start()
-        debug(f"cache timer started ({self._cacheTimer.ident})")
+    def _startCache(self):
+        self._prefetcher.Start()
 
     def _stopCache(self):
-        # Stop cache timer
-        if self._cacheTimer and self._cacheTimer.is_alive():
-            self._cacheTimer.join(0.001)
-
-        self._cacheTimer = None  # Daemon thread will stop with main thread
+        self._prefetcher.Stop()
 
     def Stop(self, timeout: float = -1):
         self._stopCache()
+        if self._thumbnails is not None:
+            self._thumbnails.Stop()
+
         return super().Stop(timeout)